@@ -1,7 +1,9 @@
 #Calcula o peso das arestas em segundos considerando a distância percorrida por uma pessoa a pé e o tempo de serviço para cada casa da rua
 
 
-import pandas as pd
+import csv
+import os
+import sys
 
 # Arquivo de entrada
 ARQUIVO_ENTRADA = "dados_processados/arestas_calc_com_casas.csv"
@@ -17,28 +19,73 @@ TEMPO_POR_CASA = 20
 
 # ------------------------------------------------------
 
-# Carregar arquivo
-df = pd.read_csv(ARQUIVO_ENTRADA)
+def calcular_peso(distancia_m, numero_de_casas, velocidade=VELOCIDADE, tempo_por_casa=TEMPO_POR_CASA):
+    """Peso (segundos) de uma aresta: tempo a pé + tempo de atendimento das casas."""
+    return distancia_m / velocidade + numero_de_casas * tempo_por_casa
 
-# Garantir que as colunas existam
-esperadas = ["origem", "destino", "distancia_m", "numero_de_casas"]
-for coluna in esperadas:
-    if coluna not in df.columns:
-        raise ValueError(f"Coluna obrigatória ausente: {coluna}")
+def ler_arestas_csv(caminho):
+    """Percorre o CSV de arestas: (origem, destino, linha) para cada rua, sem laços (origem == destino)."""
+    with open(caminho, newline="", encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            u, v = int(r["origem"]), int(r["destino"])
+            if u == v:
+                continue
+            yield u, v, r
 
-# Calcular tempo a pé
-df["tempo_a_pe_s"] = df["distancia_m"] / VELOCIDADE
+def peso_da_linha(r, velocidade=VELOCIDADE, tempo_por_casa=TEMPO_POR_CASA):
+    """Coluna 'peso' se existir; senão calcular_peso(distancia_m, numero_de_casas)."""
+    if r.get("peso") not in (None, ""):
+        return float(r["peso"])
+    return calcular_peso(float(r["distancia_m"]), float(r["numero_de_casas"]), velocidade, tempo_por_casa)
 
-# Calcular tempo de atendimento
-df["tempo_casas_s"] = df["numero_de_casas"] * TEMPO_POR_CASA
+def grafo_de_arestas(caminho, velocidade=VELOCIDADE, tempo_por_casa=TEMPO_POR_CASA):
+    """Grafo {u: {v: peso}} do CSV de arestas, sem arestas de peso 0 (como resolver_cpp.read_adjacency_csv)."""
+    adj = {}
+    for u, v, r in ler_arestas_csv(caminho):
+        w = peso_da_linha(r, velocidade, tempo_por_casa)
+        if w == 0.0:
+            continue
+        adj.setdefault(u, {})[v] = w
+        adj.setdefault(v, {})[u] = w
+    return {u: dict(sorted(adj[u].items())) for u in sorted(adj)}
 
-# Peso total
-df["peso"] = df["tempo_a_pe_s"] + df["tempo_casas_s"]
+def calcular_pesos(df, velocidade=VELOCIDADE, tempo_por_casa=TEMPO_POR_CASA):
+    """Adiciona as colunas de tempo e o peso total ao DataFrame de arestas."""
+    # Garantir que as colunas existam
+    esperadas = ["origem", "destino", "distancia_m", "numero_de_casas"]
+    for coluna in esperadas:
+        if coluna not in df.columns:
+            raise ValueError(f"Coluna obrigatória ausente: {coluna}")
 
-# Montar CSV final (somente colunas desejadas)
-df_saida = df[["origem", "destino", "peso"]]
+    # Calcular tempo a pé
+    df["tempo_a_pe_s"] = df["distancia_m"] / velocidade
 
-# Salvar
-df_saida.to_csv(ARQUIVO_SAIDA, index=False)
+    # Calcular tempo de atendimento
+    df["tempo_casas_s"] = df["numero_de_casas"] * tempo_por_casa
 
-print("Gerado:", ARQUIVO_SAIDA)
+    # Peso total
+    df["peso"] = df["tempo_a_pe_s"] + df["tempo_casas_s"]
+    return df
+
+def main():
+    import pandas as pd
+
+    # Carregar arquivo
+    df = pd.read_csv(ARQUIVO_ENTRADA)
+
+    df = calcular_pesos(df)
+
+    # Montar CSV final (somente colunas desejadas)
+    df_saida = df[["origem", "destino", "peso"]]
+
+    # Salvar (temporário + rename, seguro com execuções paralelas)
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "codigo_fonte", "algoritmo_cpp"))
+    from saida_tour import gravacao_atomica
+
+    with gravacao_atomica(ARQUIVO_SAIDA) as tmp_saida:
+        df_saida.to_csv(tmp_saida, index=False)
+
+    print("Gerado:", ARQUIVO_SAIDA)
+
+if __name__ == "__main__":
+    main()
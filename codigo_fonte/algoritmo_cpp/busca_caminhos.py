@@ -0,0 +1,349 @@
+"""
+CAMINHOS MÍNIMOS: DIJKSTRA E BUSCA DIRECIONADA (A* / ALT)
+
+Módulo compartilhado por resolver_cpp.py (Dijkstra de um-para-todos ou
+limitado aos k nós ímpares mais próximos, usado no emparelhamento) e
+route2.py (consultas ponto-a-ponto, como as ligações base <-> ponto de corte).
+
+Com o snapshot binário, TabelasCSR roda o Dijkstra dos nós ímpares direto
+sobre os arrays CSR memory-mapped (scipy.sparse.csgraph), sem passar pelo
+grafo em dict-de-dicts.
+
+Para consultas ponto-a-ponto a busca é guiada por uma heurística admissível:
+- Geográfica: distância haversine / VELOCIDADE. Como o peso de toda aresta
+  é (distância / VELOCIDADE + tempo das casas) e a distância da rua nunca é
+  menor que a linha reta, a estimativa nunca supera o custo real.
+- Landmarks (ALT): com d(L, .) pré-calculado a partir de alguns vértices
+  "marco", |d(L, t) - d(L, v)| é um limite inferior para d(v, t)
+  (desigualdade triangular; grafo não-direcionado).
+A heurística usada é o máximo das duas, que continua admissível e consistente.
+"""
+
+import heapq
+import math
+import os
+import sys
+from collections.abc import Mapping
+from typing import Dict, List, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Velocidade média de caminhada (m/s): a mesma dos pesos, senão o A* deixa de ser admissível
+from calcular_peso_com_casas import VELOCIDADE
+
+# Margem para absorver arredondamentos de 'distancia_m' e do raio da Terra
+FATOR_ADMISSIVEL = 0.999
+
+RAIO_TERRA_M = 6371008.8
+
+def dijkstra(graph: Dict[int, Dict[int, float]], source: int) -> Tuple[Dict[int, float], Dict[int, List[int]]]:
+    """
+    Implementação clássica do algoritmo de Dijkstra usando uma fila de prioridade (heapq).
+    Saídas: Retorna (dist, paths) onde dist[v]=distância, paths[v]=caminho do source até v (lista de nós).
+    """
+    dist = {source: 0.0}
+    prev = {}
+    pq = [(0.0, source)]
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d > dist.get(u, float('inf')):
+            continue
+        for v, w in graph[u].items():
+            nd = d + w
+            if nd < dist.get(v, float('inf')):
+                dist[v] = nd
+                prev[v] = u
+                heapq.heappush(pq, (nd, v))
+
+    paths = {}
+    for v in dist:
+        cur = v
+        path = [cur]
+        if cur == source:
+            paths[v] = path
+            continue
+
+        # Reconstrói o caminho
+        while cur in prev:
+             cur = prev[cur]
+             path.append(cur)
+             if cur == source:
+                 break
+        path.reverse()
+        paths[v] = path
+    return dist, paths
+
+def distancias_de(graph: Dict[int, Dict[int, float]], source: int) -> Dict[int, float]:
+    """Dijkstra de um-para-todos devolvendo apenas as distâncias."""
+    dist = {source: 0.0}
+    pq = [(0.0, source)]
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d > dist[u]:
+            continue
+        for v, w in graph[u].items():
+            nd = d + w
+            if nd < dist.get(v, float('inf')):
+                dist[v] = nd
+                heapq.heappush(pq, (nd, v))
+    return dist
+
+def deposito_mais_proximo(graph: Dict[int, Dict[int, float]], depositos) -> Tuple[Dict[int, float], Dict[int, int]]:
+    """
+    Dijkstra de múltiplas origens (todas as bases de uma vez).
+    Saídas: (dist, dono) onde dist[v] é a distância até a base mais próxima
+    e dono[v] é essa base.
+    """
+    dist = {}
+    dono = {}
+    pq = []
+    for s in depositos:
+        dist[s] = 0.0
+        dono[s] = s
+        pq.append((0.0, s))
+    heapq.heapify(pq)
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d > dist[u]:
+            continue
+        for v, w in graph[u].items():
+            nd = d + w
+            if nd < dist.get(v, float('inf')):
+                dist[v] = nd
+                dono[v] = dono[u]
+                heapq.heappush(pq, (nd, v))
+    return dist, dono
+
+def dijkstra_limitado(graph: Dict[int, Dict[int, float]], source: int, alvos, k: int):
+    """
+    Dijkstra a partir de 'source' que para ao assentar os k alvos mais próximos
+    (excluindo o próprio source).
+    Saídas: (dist, prev, encontrados) onde 'encontrados' é a lista dos alvos
+    assentados em ordem crescente de distância.
+    """
+    dist = {source: 0.0}
+    prev = {}
+    encontrados = []
+    fechados = set()
+    pq = [(0.0, source)]
+    while pq and len(encontrados) < k:
+        d, u = heapq.heappop(pq)
+        if u in fechados:
+            continue
+        fechados.add(u)
+        if u != source and u in alvos:
+            encontrados.append(u)
+        for v, w in graph[u].items():
+            nd = d + w
+            if nd < dist.get(v, float('inf')):
+                dist[v] = nd
+                prev[v] = u
+                heapq.heappush(pq, (nd, v))
+    return dist, prev, encontrados
+
+class _LinhaCSR(Mapping):
+    """dist[v] de uma linha do Dijkstra em CSR, indexada pelos IDs originais (só os alcançáveis)."""
+
+    def __init__(self, dist, tabelas: "TabelasCSR"):
+        self.dist = dist
+        self.tabelas = tabelas
+
+    def __getitem__(self, v) -> float:
+        d = self.dist[self.tabelas.indice[v]]
+        if d == math.inf:
+            raise KeyError(v)
+        return float(d)
+
+    def __iter__(self):
+        ids = self.tabelas.ids
+        return (ids[i] for i, d in enumerate(self.dist.tolist()) if d != math.inf)
+
+    def __len__(self) -> int:
+        return int((self.dist != math.inf).sum())
+
+
+class _CaminhosCSR(Mapping):
+    """paths[v] reconstruído dos predecessores do csgraph (como CaminhosLazy do cache)."""
+
+    def __init__(self, linha: _LinhaCSR, pred):
+        self.linha = linha
+        self.pred = pred
+
+    def __getitem__(self, v) -> List[int]:
+        self.linha[v]  # KeyError se inalcançável
+        ids, manter = self.linha.tabelas.ids, self.linha.tabelas.vertices
+        i = self.linha.tabelas.indice[v]
+        caminho = []
+        while i >= 0:
+            if manter is None or ids[i] in manter:
+                caminho.append(ids[i])
+            i = int(self.pred[i])
+        caminho.reverse()
+        return caminho
+
+    def __iter__(self):
+        return iter(self.linha)
+
+    def __len__(self) -> int:
+        return len(self.linha)
+
+
+class TabelasCSR:
+    """
+    'tabelas' de resolver_cpp_memoria (origem -> (dist, paths)) calculadas
+    sobre os arrays CSR do snapshot, uma linha por consulta, em C
+    (scipy.sparse.csgraph.dijkstra).
+    'vertices' (opcional) são os vértices do grafo usado pelo resto do
+    solver, ex.: o reduzido de contracao_cadeias. As distâncias entre eles
+    são as mesmas; os caminhos omitem os demais vértices (internos das
+    cadeias, que o caminho sempre atravessa por inteiro).
+    """
+
+    def __init__(self, snapshot, vertices=None):
+        self.matriz = snapshot.matriz_csr()
+        self.ids = snapshot.ids.tolist()
+        self.indice = {u: i for i, u in enumerate(self.ids)}
+        self.vertices = vertices
+        self.linhas = {}
+
+    def __contains__(self, source) -> bool:
+        if source in self.linhas:
+            return True
+        if source not in self.indice:
+            return False
+        from scipy.sparse.csgraph import dijkstra as dijkstra_csgraph
+        dist, pred = dijkstra_csgraph(self.matriz, directed=True, indices=self.indice[source],
+                                      return_predecessors=True)
+        linha = _LinhaCSR(dist, self)
+        self.linhas[source] = (linha, _CaminhosCSR(linha, pred))
+        return True
+
+    def __getitem__(self, source):
+        if source not in self:
+            raise KeyError(source)
+        return self.linhas[source]
+
+    def __setitem__(self, source, valor):
+        self.linhas[source] = valor
+
+    def __len__(self) -> int:
+        return len(self.linhas)
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distância de círculo máximo (metros) entre dois pontos lat/lon."""
+    la1, lo1, la2, lo2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    h = math.sin((la2 - la1) / 2) ** 2 + math.cos(la1) * math.cos(la2) * math.sin((lo2 - lo1) / 2) ** 2
+    return 2 * RAIO_TERRA_M * math.asin(min(1.0, math.sqrt(h)))
+
+class BuscaDirecionada:
+    """
+    Consultas ponto-a-ponto com A* sobre um grafo dict-de-dicts fixo.
+
+    coords:      {nó: (lat, lon)} para a heurística geográfica (opcional)
+    n_landmarks: número de marcos ALT (0 desativa); escolhidos pelo
+                 critério "mais distante" a partir de um nó qualquer.
+    velocidade:  m/s usada para converter distância em segundos (None
+                 desativa a heurística geográfica, p.ex. pesos em metros).
+    """
+
+    def __init__(self, graph: Dict[int, Dict[int, float]], coords: Dict[int, Tuple[float, float]] = None,
+                 n_landmarks: int = 0, velocidade: float = VELOCIDADE):
+        self.graph = graph
+        self.coords = coords or {}
+        self.velocidade = velocidade
+        self.landmarks = []
+        self.dist_landmarks = []
+        if n_landmarks > 0:
+            self._escolher_landmarks(n_landmarks)
+
+    def _escolher_landmarks(self, k: int):
+        nos = [u for u in self.graph if self.graph[u]]
+        if not nos:
+            return
+        atual = nos[0]
+        dist_min = None
+        for _ in range(k):
+            d = distancias_de(self.graph, atual)
+            self.landmarks.append(atual)
+            self.dist_landmarks.append(d)
+            # Próximo marco: o nó mais distante de todos os marcos já escolhidos
+            if dist_min is None:
+                dist_min = dict(d)
+            else:
+                for v, dv in d.items():
+                    if dv < dist_min.get(v, float('inf')):
+                        dist_min[v] = dv
+            atual = max(dist_min, key=dist_min.get)
+            if dist_min[atual] == 0.0:
+                break
+
+    def _heuristica(self, destino: int):
+        """Devolve h(v) -> limite inferior de d(v, destino)."""
+        funcs = []
+        if self.velocidade and destino in self.coords:
+            lat_t, lon_t = self.coords[destino]
+            coords = self.coords
+            escala = FATOR_ADMISSIVEL / self.velocidade
+
+            def h_geo(v):
+                c = coords.get(v)
+                if c is None:
+                    return 0.0
+                return haversine_m(c[0], c[1], lat_t, lon_t) * escala
+            funcs.append(h_geo)
+
+        tabelas = [(d, d[destino]) for d in self.dist_landmarks if destino in d]
+        if tabelas:
+            def h_alt(v):
+                melhor = 0.0
+                for d, dt in tabelas:
+                    dv = d.get(v)
+                    if dv is not None:
+                        lb = abs(dt - dv)
+                        if lb > melhor:
+                            melhor = lb
+                return melhor
+            funcs.append(h_alt)
+
+        if not funcs:
+            return lambda v: 0.0
+        if len(funcs) == 1:
+            return funcs[0]
+        return lambda v: max(f(v) for f in funcs)
+
+    def caminho(self, origem: int, destino: int) -> Tuple[List[int], float, int]:
+        """
+        A* de origem até destino.
+        Saída: (lista de nós do caminho, custo, nós assentados). Caminho vazio se não houver.
+        """
+        if origem == destino:
+            return [origem], 0.0, 0
+        if origem not in self.graph or destino not in self.graph:
+            return [], 0.0, 0
+
+        h = self._heuristica(destino)
+        graph = self.graph
+        dist = {origem: 0.0}
+        prev = {}
+        fechados = set()
+        pq = [(h(origem), 0.0, origem)]
+        while pq:
+            _, d, u = heapq.heappop(pq)
+            if u in fechados:
+                continue
+            fechados.add(u)
+            if u == destino:
+                caminho = [u]
+                while caminho[-1] != origem:
+                    caminho.append(prev[caminho[-1]])
+                caminho.reverse()
+                return caminho, d, len(fechados)
+            for v, w in graph[u].items():
+                nd = d + w
+                if nd < dist.get(v, float('inf')):
+                    dist[v] = nd
+                    prev[v] = u
+                    heapq.heappush(pq, (nd + h(v), nd, v))
+        return [], 0.0, len(fechados)
@@ -0,0 +1,164 @@
+"""
+CACHE PERSISTENTE DE DISTÂNCIAS (DIJKSTRA POR NÓ DE ORIGEM)
+
+Guarda em disco o resultado do Dijkstra de cada nó ímpar, indexado por
+(hash do grafo, nó de origem). Execuções repetidas sobre o mesmo grafo
+(ou sobre a mesma matriz de cluster) reaproveitam as linhas já calculadas
+em vez de refazer o Dijkstra.
+
+- Cada linha é um arquivo '<hash>_<origem>.pkl' com (dist, prev).
+- A política de despejo é LRU pelo mtime dos arquivos (tocado a cada
+  leitura) e respeita um orçamento total em bytes.
+- As escritas são atômicas (arquivo temporário + os.replace), então
+  vários processos podem compartilhar o mesmo diretório. A consulta
+  ('in') já carrega a linha para a memória: se outro processo despejar ou
+  estiver gravando o arquivo, a linha conta como ausente e é recalculada.
+- O despejo roda a cada DESPEJO_A_CADA gravações (e em despejar()).
+
+Segurança: as linhas são lidas com pickle, que executa código ao carregar
+um arquivo malicioso. Use um diretório de cache que só o(s) usuário(s) do
+pipeline possam gravar (não um diretório compartilhado com escrita livre).
+
+Uso (como 'tabelas' de resolver_cpp_memoria):
+    cache = CacheDistancias(G, "dados_processados/cache_distancias")
+    sol = resolver_cpp_memoria(G, cache)
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Dict, List
+
+DIR_CACHE = os.path.join("dados_processados", "cache_distancias")
+LIMITE_BYTES = 512 * 1024 * 1024
+# Gravações entre dois despejos automáticos
+DESPEJO_A_CADA = 64
+
+def hash_grafo(G: Dict[int, Dict[int, float]]) -> str:
+    """Hash estável do conjunto de arestas (u < v) e seus pesos."""
+    h = hashlib.sha1()
+    for u in sorted(G):
+        for v in sorted(G[u]):
+            if u < v:
+                h.update(f"{u},{v},{G[u][v]!r};".encode())
+    return h.hexdigest()
+
+class CaminhosLazy:
+    """
+    Mapeamento v -> caminho (lista de nós) reconstruído sob demanda a partir
+    da árvore de predecessores; equivale ao dicionário 'paths' do dijkstra().
+    """
+
+    def __init__(self, source: int, dist: Dict[int, float], prev: Dict[int, int]):
+        self.source = source
+        self.dist = dist
+        self.prev = prev
+
+    def __contains__(self, v) -> bool:
+        return v in self.dist
+
+    def __getitem__(self, v) -> List[int]:
+        if v not in self.dist:
+            raise KeyError(v)
+        path = [v]
+        while path[-1] != self.source:
+            path.append(self.prev[path[-1]])
+        path.reverse()
+        return path
+
+def _prev_de_caminhos(source: int, paths) -> Dict[int, int]:
+    if isinstance(paths, CaminhosLazy):
+        return paths.prev
+    return {v: p[-2] for v, p in paths.items() if v != source and len(p) >= 2}
+
+class CacheDistancias:
+    """Tabela origem -> (dist, paths) com camada em memória e persistência em disco."""
+
+    def __init__(self, G: Dict[int, Dict[int, float]], diretorio: str = DIR_CACHE,
+                 limite_bytes: int = LIMITE_BYTES):
+        self.diretorio = diretorio
+        self.limite_bytes = limite_bytes
+        self.hash = hash_grafo(G)
+        self.memoria = {}
+        self.acertos = 0
+        self.faltas = 0
+        self.gravacoes = 0
+        self.despejados = 0
+        os.makedirs(diretorio, exist_ok=True)
+
+    def _arquivo(self, source: int) -> str:
+        return os.path.join(self.diretorio, f"{self.hash}_{source}.pkl")
+
+    def _carregar(self, source) -> bool:
+        """Lê a linha do disco para a memória; False se não existe ou está ilegível."""
+        arquivo = self._arquivo(source)
+        try:
+            with open(arquivo, "rb") as f:
+                dist, prev = pickle.load(f)
+            os.utime(arquivo)  # marca como usado recentemente (LRU)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            return False
+        self.acertos += 1
+        self.memoria[source] = (dist, CaminhosLazy(source, dist, prev))
+        return True
+
+    def __contains__(self, source) -> bool:
+        # Carrega já na consulta: um despejo concorrente entre 'in' e '[]' não derruba quem chamou
+        if source in self.memoria or self._carregar(source):
+            return True
+        self.faltas += 1
+        return False
+
+    def __getitem__(self, source):
+        if source in self.memoria or self._carregar(source):
+            return self.memoria[source]
+        raise KeyError(source)
+
+    def __setitem__(self, source, valor):
+        dist, paths = valor
+        prev = _prev_de_caminhos(source, paths)
+        self.memoria[source] = (dist, CaminhosLazy(source, dist, prev))
+
+        fd, tmp = tempfile.mkstemp(dir=self.diretorio, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((dist, prev), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._arquivo(source))
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        self.gravacoes += 1
+        if self.gravacoes % DESPEJO_A_CADA == 0:
+            self.despejados += self.despejar()
+
+    def __len__(self) -> int:
+        return len(self.memoria)
+
+    def despejar(self):
+        """Remove as linhas menos usadas recentemente até caber no orçamento."""
+        entradas = []
+        total = 0
+        for nome in os.listdir(self.diretorio):
+            if not nome.endswith(".pkl"):
+                continue
+            caminho = os.path.join(self.diretorio, nome)
+            try:
+                st = os.stat(caminho)
+            except OSError:
+                continue
+            entradas.append((st.st_mtime, st.st_size, caminho))
+            total += st.st_size
+
+        removidos = 0
+        for _, tamanho, caminho in sorted(entradas):
+            if total <= self.limite_bytes:
+                break
+            try:
+                os.remove(caminho)
+            except OSError:
+                continue
+            total -= tamanho
+            removidos += 1
+        return removidos
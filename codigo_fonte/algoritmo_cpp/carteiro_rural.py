@@ -0,0 +1,244 @@
+"""
+CARTEIRO RURAL: ATENDER SÓ AS RUAS COM CASAS
+
+No CPP comum toda aresta é obrigatória e cada travessia é cobrada pelo peso
+completo (caminhada + casas). Muitas ruas têm numero_de_casas == 0 e servem
+só de ligação. No modo rural:
+- ruas obrigatórias: numero_de_casas > 0 (custo de atendimento =
+  calcular_peso(distância, casas), cobrado uma única vez);
+- qualquer outra travessia (ruas sem casas, repetições de ruas já
+  atendidas) é deslocamento e custa só a caminhada (calcular_peso(distância, 0)).
+
+Algoritmo (heurística de Frederickson, o problema é NP-difícil):
+1. Componentes das ruas obrigatórias (union-find).
+2. Se houver mais de uma, liga as componentes por uma árvore geradora
+   mínima sobre as distâncias de deslocamento entre elas (Dijkstra de
+   múltiplas origens por componente) e acrescenta os caminhos da árvore.
+3. Emparelha os vértices ímpares do multigrafo resultante pelos caminhos
+   de deslocamento mínimos (mesmo emparelhamento do resolver_cpp).
+4. Circuito de Euler (Hierholzer) sobre o multigrafo.
+
+Uso: python resolver_cpp.py --arestas dados_processados/arestas_calc_com_casas.csv --rural
+"""
+
+import heapq
+import os
+import sys
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+from resolver_cpp import LIMITE_EXATO, emparelhar_impares, hierholzer_multigraph
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Vértice artificial que liga o fim ao início nas rotas abertas (IDs reais são >= 0)
+_VIRTUAL = -1
+
+# =====================================
+# LEITURA
+# =====================================
+
+def ler_ruas(path: str) -> List[Tuple[int, int, float, float, bool]]:
+    """
+    Lê o CSV de arestas. Saída: lista de (origem, destino, peso_atendimento,
+    peso_deslocamento, obrigatoria). Ruas repetidas ficam com a última linha.
+    """
+    from calcular_peso_com_casas import calcular_peso, ler_arestas_csv
+
+    ruas = {}
+    for u, v, r in ler_arestas_csv(path):
+        distancia = float(r["distancia_m"])
+        casas = float(r["numero_de_casas"])
+        ruas[(min(u, v), max(u, v))] = (u, v, calcular_peso(distancia, casas),
+                                        calcular_peso(distancia, 0), casas > 0)
+    return list(ruas.values())
+
+# =====================================
+# SOLUÇÃO
+# =====================================
+
+class _UniaoBusca:
+    def __init__(self):
+        self.pai = {}
+
+    def achar(self, x):
+        pai = self.pai
+        pai.setdefault(x, x)
+        raiz = x
+        while pai[raiz] != raiz:
+            raiz = pai[raiz]
+        while pai[x] != raiz:
+            pai[x], x = raiz, pai[x]
+        return raiz
+
+    def unir(self, a, b) -> bool:
+        ra, rb = self.achar(a), self.achar(b)
+        if ra == rb:
+            return False
+        self.pai[ra] = rb
+        return True
+
+def _dijkstra_multiplas_origens(G: Dict[int, Dict[int, float]], origens) -> Tuple[Dict[int, float], Dict[int, int]]:
+    dist = {s: 0.0 for s in origens}
+    prev = {}
+    pq = [(0.0, s) for s in origens]
+    heapq.heapify(pq)
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d > dist[u]:
+            continue
+        for v, w in G[u].items():
+            nd = d + w
+            if nd < dist.get(v, float('inf')):
+                dist[v] = nd
+                prev[v] = u
+                heapq.heappush(pq, (nd, v))
+    return dist, prev
+
+def _ligar_componentes(G_desloc: Dict[int, Dict[int, float]], componentes: List[List[int]]) -> List[List[int]]:
+    """
+    Árvore geradora mínima (Kruskal) entre as componentes obrigatórias, com
+    custo = menor distância de deslocamento entre elas. Devolve os caminhos
+    (listas de vértices) das ligações escolhidas.
+    """
+    comp_de = {x: i for i, comp in enumerate(componentes) for x in comp}
+    candidatos = []
+    arvores = []
+    for i, comp in enumerate(componentes):
+        dist, prev = _dijkstra_multiplas_origens(G_desloc, comp)
+        arvores.append(prev)
+        melhor = {}
+        for x, d in dist.items():
+            j = comp_de.get(x)
+            if j is not None and j != i and d < melhor.get(j, (float('inf'),))[0]:
+                melhor[j] = (d, x)
+        for j, (d, x) in melhor.items():
+            candidatos.append((d, i, j, x))
+
+    uf = _UniaoBusca()
+    caminhos = []
+    for d, i, j, x in sorted(candidatos):
+        if uf.unir(i, j):
+            prev = arvores[i]
+            caminho = [x]
+            while caminho[-1] in prev:
+                caminho.append(prev[caminho[-1]])
+            caminho.reverse()
+            caminhos.append(caminho)
+    if len(caminhos) < len(componentes) - 1:
+        raise ValueError("Ruas obrigatórias em partes desconexas da malha.")
+    return caminhos
+
+def resolver_carteiro_rural(ruas: List[Tuple[int, int, float, float, bool]], emparelhamento: str = "denso",
+                            k_vizinhos: int = 10, limite_exato: int = LIMITE_EXATO, inicio: int = None,
+                            fim: int = None, tabelas=None, orcamento_s: float = None):
+    """
+    Carteiro rural em memória. Devolve o dicionário de resolver_cpp_memoria
+    (tour_vertices, euler_edges, total_cost, MG_counts, matching_pairs,
+    paths_between, odd_nodes) mais 'grafo' (pesos de deslocamento), 'pesos' e
+    'servico' (custo e tipo de cada travessia do circuito, para as saídas).
+    'inicio' (opcional) é a base: o circuito começa nela se ela for tocada.
+    Com 'fim', a rota é aberta: sai de 'inicio', atende as ruas obrigatórias e
+    termina em 'fim' (ex.: replanejamento a partir da posição atual do agente).
+    'tabelas' (opcional) guarda o Dijkstra de deslocamento dos nós ímpares
+    entre chamadas sobre a mesma malha (ver emparelhar_impares);
+    'orcamento_s' é o tempo da heurística de emparelhamento.
+    """
+    if fim is not None and inicio is None:
+        raise ValueError("Rota aberta ('fim') exige o vértice de 'inicio'.")
+    G_desloc = defaultdict(dict)
+    atendimento = {}
+    for u, v, w_atend, w_desloc, obrigatoria in ruas:
+        G_desloc[u][v] = G_desloc[v][u] = w_desloc
+        if obrigatoria:
+            atendimento[(min(u, v), max(u, v))] = w_atend
+    G_desloc = dict(G_desloc)
+
+    print("3.1. Separando ruas obrigatorias (com casas)...")
+    print(f"   -> {len(atendimento)} obrigatorias, {len(ruas) - len(atendimento)} apenas de deslocamento.")
+    if not atendimento and fim is None:
+        return {"tour_vertices": [], "euler_edges": [], "total_cost": 0.0, "MG_counts": {},
+                "matching_pairs": [], "paths_between": {}, "odd_nodes": [], "grafo": G_desloc,
+                "pesos": [], "servico": []}
+
+    MG = defaultdict(Counter)
+    uf = _UniaoBusca()
+    for a, b in atendimento:
+        MG[a][b] += 1
+        MG[b][a] += 1
+        uf.unir(a, b)
+    if fim is not None:
+        # Rota aberta: fim -> _VIRTUAL -> inicio fecha o circuito e garante que os
+        # dois vértices façam parte dele; as duas arestas saem no final.
+        for x in (inicio, fim):
+            MG[_VIRTUAL][x] += 1
+            MG[x][_VIRTUAL] += 1
+            uf.unir(_VIRTUAL, x)
+        G_desloc[_VIRTUAL] = {}
+    grupos = defaultdict(list)
+    for x in list(MG):
+        grupos[uf.achar(x)].append(x)
+    componentes = sorted((sorted(c) for c in grupos.values()), key=lambda c: c[0])
+
+    # ---- Ligação das componentes ----
+    print(f"3.2. Ligando {len(componentes)} componente(s) de ruas obrigatorias...")
+    for caminho in _ligar_componentes(G_desloc, componentes) if len(componentes) > 1 else []:
+        for a, b in zip(caminho[:-1], caminho[1:]):
+            MG[a][b] += 1
+            MG[b][a] += 1
+
+    # ---- Emparelhamento dos ímpares ----
+    odd_nodes = sorted(u for u, c in MG.items() if sum(c.values()) % 2)
+    print(f"3.3. Emparelhando {len(odd_nodes)} vertices de grau impar (deslocamento)...")
+    matching_pairs, paths_between = emparelhar_impares(G_desloc, odd_nodes, emparelhamento,
+                                                       k_vizinhos, limite_exato, tabelas, orcamento_s)
+    for u, v in matching_pairs:
+        caminho = paths_between[(u, v)]
+        if (v, u) not in paths_between:
+            paths_between[(v, u)] = list(reversed(caminho))
+        for a, b in zip(caminho[:-1], caminho[1:]):
+            MG[a][b] += 1
+            MG[b][a] += 1
+
+    # ---- Circuito ----
+    print("3.4. Extraindo circuito euleriano (Hierholzer)...")
+    if fim is None:
+        euler_edges = hierholzer_multigraph(MG, inicio)
+    else:
+        euler_edges = hierholzer_multigraph(MG, _VIRTUAL)
+        if euler_edges[0][1] != inicio:
+            euler_edges = [(b, a) for a, b in reversed(euler_edges)]
+        euler_edges = euler_edges[1:-1]
+        del G_desloc[_VIRTUAL]
+        for x in (inicio, fim):
+            MG[x].pop(_VIRTUAL, None)
+        del MG[_VIRTUAL]
+    tour_vertices = [euler_edges[0][0]] + [v for (_, v) in euler_edges] if euler_edges else []
+
+    # A primeira passagem por uma rua obrigatória é o atendimento; as demais, deslocamento
+    pendentes = set(atendimento)
+    pesos, servico = [], []
+    for a, b in euler_edges:
+        chave = (min(a, b), max(a, b))
+        if chave in pendentes:
+            pendentes.discard(chave)
+            pesos.append(atendimento[chave])
+            servico.append(1)
+        else:
+            pesos.append(G_desloc[a][b])
+            servico.append(0)
+
+    return {
+        "tour_vertices": tour_vertices,
+        "euler_edges": euler_edges,
+        "total_cost": sum(pesos),
+        "MG_counts": MG,
+        "matching_pairs": matching_pairs,
+        "paths_between": paths_between,
+        "odd_nodes": odd_nodes,
+        "grafo": G_desloc,
+        "pesos": pesos,
+        "servico": servico,
+    }
@@ -0,0 +1,111 @@
+"""
+CONTRAÇÃO DE CADEIAS DE GRAU 2
+
+Malhas viárias têm longas sequências de vértices de grau 2 (curvas e
+pontos intermediários de uma mesma rua). Esses vértices são pares, nunca
+entram no emparelhamento e só aumentam o trabalho do Dijkstra e do
+Hierholzer. Antes de resolver o CPP, cada cadeia a - x1 - ... - xk - b
+(x1..xk de grau 2) vira uma única super-aresta a-b com a soma dos pesos;
+o mapeamento guardado permite expandir o tour de volta aos vértices
+originais na hora de gravar as saídas.
+
+O grafo reduzido continua simples: se a super-aresta duplicaria uma
+aresta a-b já existente (ou formaria um laço a-a), o primeiro vértice
+interno (e, no laço, também o último) é mantido como extremidade.
+Ciclos formados só por vértices de grau 2 ficam como estão.
+
+Os nós ímpares, as distâncias entre eles e o custo do tour são os mesmos
+no grafo original e no reduzido.
+"""
+
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+class ContracaoCadeias:
+    """Grafo reduzido (self.reduzido) e o mapeamento super-aresta -> vértices internos."""
+
+    def __init__(self, G: Dict[int, Dict[int, float]], manter: Iterable[int] = ()):
+        """'manter': vértices que não podem ser contraídos (ex.: a base do agente)."""
+        self.grafo = G
+        manter = {x for x in manter if x is not None}
+        interno = {u for u in G if len(G[u]) == 2 and u not in G[u] and u not in manter}
+
+        reduzido = {u: {} for u in G if u not in interno}
+        # (a, b) -> vértices internos de a até b (e o inverso em (b, a))
+        self.expansao: Dict[Tuple[int, int], List[int]] = {}
+
+        for u in reduzido:
+            for v, w in G[u].items():
+                if v not in interno:
+                    reduzido[u][v] = w
+
+        visitados = set()
+        for a in list(reduzido):
+            for x in G[a]:
+                if x not in interno or x in visitados:
+                    continue
+                cadeia, pesos = [], [G[a][x]]
+                anterior, atual = a, x
+                while atual in interno:
+                    visitados.add(atual)
+                    cadeia.append(atual)
+                    proximo = next(y for y in G[atual] if y != anterior)
+                    pesos.append(G[atual][proximo])
+                    anterior, atual = atual, proximo
+                self._ligar(reduzido, [a] + cadeia + [atual], pesos)
+
+        # Ciclos isolados de vértices de grau 2: mantidos sem contração
+        for u in interno - visitados:
+            reduzido[u] = dict(G[u])
+
+        self.reduzido = {u: dict(sorted(reduzido[u].items())) for u in sorted(reduzido)}
+        self.removidos = len(G) - len(self.reduzido)
+
+    def _ligar(self, reduzido, vertices: List[int], pesos: List[float]):
+        """Liga as extremidades da cadeia 'vertices', mantendo internos só para evitar laço/aresta paralela."""
+        a, b = vertices[0], vertices[-1]
+        if a == b:
+            if len(vertices) < 4:
+                return
+            ancoras = [0, 1, len(vertices) - 2, len(vertices) - 1]
+        elif b in reduzido[a]:
+            ancoras = [0, 1, len(vertices) - 1]
+        else:
+            ancoras = [0, len(vertices) - 1]
+        for i, j in zip(ancoras, ancoras[1:]):
+            u, v = vertices[i], vertices[j]
+            reduzido.setdefault(u, {})[v] = sum(pesos[i:j])
+            reduzido.setdefault(v, {})[u] = reduzido[u][v]
+            if j - i > 1:
+                self.expansao[(u, v)] = vertices[i + 1:j]
+                self.expansao[(v, u)] = vertices[j - 1:i:-1]
+
+    # ---------------------------------
+    # EXPANSÃO
+    # ---------------------------------
+    def expandir_caminho(self, vertices: Sequence[int]) -> List[int]:
+        """Sequência de vértices do grafo reduzido -> sequência no grafo original."""
+        if not vertices:
+            return []
+        saida = [vertices[0]]
+        for u, v in zip(vertices, vertices[1:]):
+            saida.extend(self.expansao.get((u, v), ()))
+            saida.append(v)
+        return saida
+
+    def expandir_solucao(self, sol: dict) -> dict:
+        """Solução de resolver_cpp_memoria no grafo reduzido -> tour e caminhos no grafo original."""
+        tour = self.expandir_caminho(sol["tour_vertices"])
+        expandida = dict(sol)
+        expandida["tour_vertices"] = tour
+        expandida["euler_edges"] = list(zip(tour, tour[1:]))
+        expandida["paths_between"] = {par: self.expandir_caminho(p) for par, p in sol["paths_between"].items()}
+        expandida.pop("MG_counts", None)
+        return expandida
+
+    def subgrafo_original(self, G_reduzido: Dict[int, Dict[int, float]]) -> Dict[int, Dict[int, float]]:
+        """Parte do grafo original representada por um subgrafo do reduzido (ex.: uma componente)."""
+        vertices = set(G_reduzido)
+        for (u, v), internos in self.expansao.items():
+            if u in G_reduzido and v in G_reduzido[u]:
+                vertices.update(internos)
+        return {u: self.grafo[u] for u in sorted(vertices)}
@@ -0,0 +1,440 @@
+"""
+CARTEIRO CHINÊS MISTO (RUAS DE MÃO ÚNICA E DE MÃO DUPLA)
+
+A matriz de adjacência é simétrica e não guarda o sentido das ruas, então
+o resolver_cpp.py padrão pode mandar o agente percorrer uma rua de mão
+única na contramão. Este módulo resolve o CPP sobre um grafo misto lido
+diretamente do CSV de arestas:
+
+    origem,destino,distancia_m,numero_de_casas[,mao_unica][,peso]
+
+- mao_unica = 1/true/sim: a rua só pode ser percorrida de origem -> destino;
+  ausente ou 0: mão dupla (pode ser percorrida nos dois sentidos).
+- peso: se a coluna não existir, é calculado por calcular_peso().
+
+Algoritmo (heurística no estilo MIXED1 de Frederickson; o CPP misto é
+NP-difícil):
+1. Paridade: emparelhamento de custo mínimo dos vértices de grau ímpar do
+   grafo subjacente, como no CPP comum; as ruas dos caminhos são duplicadas.
+2. Entrada/saída: fluxo de custo mínimo que equilibra as ruas de mão única;
+   cada cópia de rua de mão dupla pode ser orientada sem custo ou repetida
+   pelo seu peso, em qualquer sentido.
+3. As cópias de mão dupla não usadas pelo fluxo são orientadas seguindo
+   circuitos de Euler, e um último fluxo corrige o desequilíbrio residual.
+O circuito é então extraído por Hierholzer direcionado.
+
+O fluxo (FluxoCustoMinimo) usa a rede residual em listas planas (arco i e
+seu reverso i ^ 1), Dijkstra com potenciais e, a cada rodada, um fluxo
+bloqueante sobre os arcos de custo reduzido zero, o que mantém o número de
+Dijkstras pequeno mesmo com milhares de unidades de desequilíbrio.
+"""
+
+import heapq
+import os
+import sys
+from collections import Counter, defaultdict, deque
+from typing import Dict, List, Tuple
+
+from resolver_cpp import LIMITE_EXATO, componentes_conexas, emparelhar_impares
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Custos do fluxo em inteiros (milissegundos) para comparações exatas
+ESCALA_CUSTO = 1000
+
+_VERDADEIRO = frozenset(("1", "true", "sim", "s", "yes", "y", "t"))
+
+# =====================================
+# FLUXO DE CUSTO MÍNIMO
+# =====================================
+
+class FluxoCustoMinimo:
+    """Rede residual em arrays planos com custos inteiros não-negativos."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.cabeca = [-1] * n
+        self.prox = []
+        self.destino = []
+        self.cap = []
+        self.custo = []
+
+    def adicionar_arco(self, u: int, v: int, cap: int, custo: int) -> int:
+        """Adiciona u -> v e o reverso; devolve o índice do arco direto."""
+        i = len(self.destino)
+        self.destino += (v, u)
+        self.cap += (cap, 0)
+        self.custo += (custo, -custo)
+        self.prox += (self.cabeca[u], self.cabeca[v])
+        self.cabeca[u] = i
+        self.cabeca[v] = i + 1
+        return i
+
+    def fluxo(self, arco: int) -> int:
+        return self.cap[arco ^ 1]
+
+    def resolver(self, s: int, t: int) -> Tuple[int, int]:
+        """Fluxo máximo de custo mínimo de s para t. Devolve (fluxo, custo)."""
+        n = self.n
+        cabeca, prox, destino, cap, custo = self.cabeca, self.prox, self.destino, self.cap, self.custo
+        pot = [0] * n
+        INF = float('inf')
+        total_fluxo = 0
+        total_custo = 0
+
+        while True:
+            # Dijkstra com custos reduzidos (sempre >= 0)
+            dist = [INF] * n
+            dist[s] = 0
+            pq = [(0, s)]
+            while pq:
+                d, u = heapq.heappop(pq)
+                if d > dist[u]:
+                    continue
+                pu = pot[u]
+                e = cabeca[u]
+                while e != -1:
+                    if cap[e] > 0:
+                        v = destino[e]
+                        nd = d + custo[e] + pu - pot[v]
+                        if nd < dist[v]:
+                            dist[v] = nd
+                            heapq.heappush(pq, (nd, v))
+                    e = prox[e]
+            if dist[t] == INF:
+                break
+            dt = dist[t]
+            for x in range(n):
+                pot[x] += dist[x] if dist[x] < dt else dt
+
+            # Fluxo bloqueante (Dinic) no subgrafo de custo reduzido zero
+            while True:
+                nivel = [-1] * n
+                nivel[s] = 0
+                fila = deque([s])
+                while fila:
+                    u = fila.popleft()
+                    e = cabeca[u]
+                    while e != -1:
+                        v = destino[e]
+                        if cap[e] > 0 and nivel[v] < 0 and custo[e] + pot[u] - pot[v] == 0:
+                            nivel[v] = nivel[u] + 1
+                            fila.append(v)
+                        e = prox[e]
+                if nivel[t] < 0:
+                    break
+                it = list(cabeca)
+                caminho = []
+                u = s
+                while True:
+                    if u == t:
+                        f = min(cap[e] for e in caminho)
+                        for e in caminho:
+                            cap[e] -= f
+                            cap[e ^ 1] += f
+                            total_custo += f * custo[e]
+                        total_fluxo += f
+                        caminho = []
+                        u = s
+                        continue
+                    e = it[u]
+                    while e != -1:
+                        v = destino[e]
+                        if cap[e] > 0 and nivel[v] == nivel[u] + 1 and custo[e] + pot[u] - pot[v] == 0:
+                            break
+                        e = prox[e]
+                    it[u] = e
+                    if e != -1:
+                        caminho.append(e)
+                        u = destino[e]
+                        continue
+                    # Beco sem saída: recua e descarta o arco usado para chegar aqui
+                    if u == s:
+                        break
+                    nivel[u] = -1
+                    e = caminho.pop()
+                    u = destino[e ^ 1]
+                    it[u] = prox[it[u]]
+        return total_fluxo, total_custo
+
+# =====================================
+# LEITURA
+# =====================================
+
+def ler_arestas(path: str) -> List[Tuple[int, int, float, bool]]:
+    """
+    Lê o CSV de arestas. Saída: lista de (origem, destino, peso, mao_unica).
+    Ruas de mão dupla repetidas (em qualquer sentido) ficam com a última linha.
+    """
+    from calcular_peso_com_casas import ler_arestas_csv, peso_da_linha
+
+    ruas = {}
+    for u, v, r in ler_arestas_csv(path):
+        w = peso_da_linha(r)
+        if w <= 0:
+            continue
+        mao_unica = str(r.get("mao_unica") or "0").strip().lower() in _VERDADEIRO
+        chave = (u, v, True) if mao_unica else (min(u, v), max(u, v), False)
+        ruas[chave] = (u, v, w, mao_unica)
+    return list(ruas.values())
+
+def grafo_direcionado(arcos) -> Dict[int, Dict[int, float]]:
+    """G[u][v] = peso para cada sentido permitido (usado nas saídas do tour)."""
+    G = defaultdict(dict)
+    for u, v, w, mao_unica in arcos:
+        G[u][v] = w
+        if mao_unica:
+            G.setdefault(v, {})
+        else:
+            G[v][u] = w
+    return dict(G)
+
+# =====================================
+# SOLUÇÃO
+# =====================================
+
+# Vértice auxiliar ligado aos vértices ímpares na orientação por Euler
+_FANTASMA = object()
+
+def _fortemente_conexo(G: Dict[int, Dict[int, float]], nos: List[int]) -> bool:
+    if not nos:
+        return True
+    reverso = defaultdict(list)
+    for u in G:
+        for v in G[u]:
+            reverso[v].append(u)
+    for adj in (lambda x: G.get(x, ()), lambda x: reverso.get(x, ())):
+        vistos = {nos[0]}
+        pilha = [nos[0]]
+        while pilha:
+            x = pilha.pop()
+            for y in adj(x):
+                if y not in vistos:
+                    vistos.add(y)
+                    pilha.append(y)
+        if len(vistos) < len(nos):
+            return False
+    return True
+
+def hierholzer_direcionado(MG: Dict[int, Counter], start: int) -> List[Tuple[int, int]]:
+    """Circuito euleriano de um multigrafo direcionado, em ordem de percurso."""
+    saidas = {u: [v for v, c in cnts.items() for _ in range(c)] for u, cnts in MG.items()}
+    ponteiro = {u: 0 for u in saidas}
+    circuito = []
+    pilha = [start]
+    while pilha:
+        v = pilha[-1]
+        lista = saidas.get(v, ())
+        if ponteiro.get(v, 0) < len(lista):
+            pilha.append(lista[ponteiro[v]])
+            ponteiro[v] += 1
+        else:
+            pilha.pop()
+            if pilha:
+                circuito.append((pilha[-1], v))
+    circuito.reverse()
+    return circuito
+
+def _orientar_por_euler(restantes: Counter) -> Counter:
+    """
+    Orienta cópias não-direcionadas {(a, b): k} seguindo circuitos de Euler
+    (vértices ímpares ligados a um vértice fantasma), o que deixa cada
+    vértice com desequilíbrio no máximo 1. Devolve {(origem, destino): k}.
+    """
+    mg = defaultdict(Counter)
+    for (a, b), k in restantes.items():
+        if k:
+            mg[a][b] += k
+            mg[b][a] += k
+    for x in [x for x, c in mg.items() if sum(c.values()) % 2]:
+        mg[x][_FANTASMA] += 1
+        mg[_FANTASMA][x] += 1
+
+    orientadas = Counter()
+    for inicio in list(mg):
+        pilha = [inicio]
+        while pilha:
+            v = pilha[-1]
+            if mg[v]:
+                u = next(iter(mg[v]))
+                for a, b in ((v, u), (u, v)):
+                    mg[a][b] -= 1
+                    if not mg[a][b]:
+                        del mg[a][b]
+                if v is not _FANTASMA and u is not _FANTASMA:
+                    orientadas[(v, u)] += 1
+                pilha.append(u)
+            else:
+                pilha.pop()
+    return orientadas
+
+def _fluxo_de_copias(direcionadas: Counter, ruas, idx, copias_mao_dupla=None):
+    """
+    Min-cost flow que equilibra 'direcionadas' usando repetições de ruas
+    (custo = peso) e, opcionalmente, a orientação gratuita de
+    'copias_mao_dupla' {(a, b): k}. Devolve (novas_direcionadas, repetidas, usadas)
+    onde 'usadas' são as cópias de mão dupla orientadas pelo fluxo.
+    """
+    n = len(idx)
+    e = [0] * n
+    for (u, v), c in direcionadas.items():
+        e[idx[u]] += c
+        e[idx[v]] -= c
+    total = sum(x for x in e if x > 0)
+    s, t = n, n + 1
+    fluxo = FluxoCustoMinimo(n + 2)
+    inf = total + sum((copias_mao_dupla or {}).values()) + 1
+
+    orientacao = []
+    for (a, b), k in (copias_mao_dupla or {}).items():
+        if k:
+            orientacao.append((a, b, k, fluxo.adicionar_arco(idx[a], idx[b], k, 0),
+                               fluxo.adicionar_arco(idx[b], idx[a], k, 0)))
+    repeticoes = []
+    for u, v, w, mao_unica in ruas:
+        c = round(w * ESCALA_CUSTO)
+        repeticoes.append((u, v, fluxo.adicionar_arco(idx[u], idx[v], inf, c)))
+        if not mao_unica:
+            repeticoes.append((v, u, fluxo.adicionar_arco(idx[v], idx[u], inf, c)))
+    for i, x in enumerate(e):
+        # e < 0: entra mais do que sai -> precisa de saídas extras (origem do fluxo)
+        if x < 0:
+            fluxo.adicionar_arco(s, i, -x, 0)
+        elif x > 0:
+            fluxo.adicionar_arco(i, t, x, 0)
+    enviado, _ = fluxo.resolver(s, t)
+    if enviado < total:
+        raise ValueError("Não foi possível equilibrar o grafo (fluxo insuficiente).")
+
+    novas = Counter(direcionadas)
+    usadas = Counter()
+    for a, b, k, ida, volta in orientacao:
+        f_ida, f_volta = fluxo.fluxo(ida), fluxo.fluxo(volta)
+        anula = min(f_ida, f_volta)  # ida e volta gratuitas se cancelam
+        f_ida -= anula
+        f_volta -= anula
+        if f_ida:
+            novas[(a, b)] += f_ida
+        if f_volta:
+            novas[(b, a)] += f_volta
+        if f_ida + f_volta:
+            usadas[(a, b)] += f_ida + f_volta
+    repetidas = Counter()
+    for u, v, a in repeticoes:
+        f = fluxo.fluxo(a)
+        if f:
+            novas[(u, v)] += f
+            repetidas[(u, v)] += f
+    return novas, repetidas, usadas
+
+def resolver_cpp_direcionado(arcos: List[Tuple[int, int, float, bool]], inicio: int = None,
+                             emparelhamento: str = "denso", k_vizinhos: int = 10,
+                             limite_exato: int = LIMITE_EXATO, orcamento_s: float = None):
+    """
+    CPP misto em memória. Devolve o mesmo dicionário de resolver_cpp_memoria
+    (tour_vertices, euler_edges, total_cost, MG_counts, matching_pairs,
+    paths_between, odd_nodes) mais 'grafo' (G direcionado, para as saídas)
+    e 'repeticoes' (travessias extras escolhidas pelos fluxos).
+
+    1. Paridade: emparelha os vértices de grau ímpar do grafo subjacente
+       (como no CPP não-direcionado); as ruas dos caminhos são duplicadas.
+    2. Fluxo: equilibra entrada/saída das ruas de mão única; cada cópia de
+       rua de mão dupla pode ser orientada de graça ou repetida pelo peso.
+    3. As cópias de mão dupla restantes são orientadas por circuitos de Euler.
+    4. Um último fluxo corrige o desequilíbrio residual da etapa 3.
+    Com todas as ruas de mão dupla, o resultado coincide com o CPP comum.
+    """
+    G = grafo_direcionado(arcos)
+    nos = sorted({x for u, v, _, _ in arcos for x in (u, v)})
+
+    print("3.1. Analisando sentidos e conectividade...")
+    subjacente = defaultdict(dict)
+    for u, v, w, _ in arcos:
+        subjacente[u][v] = subjacente[v][u] = w
+    componentes = componentes_conexas(subjacente)
+    if len(componentes) > 1:
+        raise ValueError(f"Grafo não é conexo: {len(componentes)} componentes "
+                         f"({', '.join(str(len(c)) for c in componentes[:10])} nos); "
+                         "resolva cada componente com um CSV próprio.")
+    if not _fortemente_conexo(G, nos):
+        raise ValueError("Grafo não é fortemente conexo (alguma rua de mão única não tem volta).")
+    n_unica = sum(1 for a in arcos if a[3])
+    print(f"   -> {n_unica} ruas de mão única, {len(arcos) - n_unica} de mão dupla.")
+    if not nos:
+        return {"tour_vertices": [], "euler_edges": [], "total_cost": 0.0, "MG_counts": {},
+                "matching_pairs": [], "paths_between": {}, "odd_nodes": [], "grafo": G,
+                "repeticoes": Counter()}
+    idx = {u: i for i, u in enumerate(nos)}
+
+    # Cópias de cada rua: direcionadas (mão única) e não-direcionadas (mão dupla)
+    direcionadas = Counter()
+    mao_dupla = Counter()
+    G_und = defaultdict(dict)
+    grau = Counter()
+    rua_entre = {}
+    for u, v, w, mao_unica in arcos:
+        if mao_unica:
+            direcionadas[(u, v)] += 1
+        else:
+            mao_dupla[(min(u, v), max(u, v))] += 1
+        grau[u] += 1
+        grau[v] += 1
+        if w < G_und[u].get(v, float('inf')):
+            G_und[u][v] = G_und[v][u] = w
+        chave = (min(u, v), max(u, v))
+        atual = rua_entre.get(chave)
+        # Prefere duplicar a rua de mão dupla; entre mãos únicas, a mais leve
+        if atual is None or (atual[3] and (not mao_unica or w < atual[2])):
+            rua_entre[chave] = (u, v, w, mao_unica)
+
+    # ---- 1. Paridade ----
+    impares = [u for u in nos if grau[u] % 2]
+    print(f"3.2. Emparelhando {len(impares)} vertices de grau impar...")
+    matching_pairs, paths_between = emparelhar_impares(dict(G_und), impares, emparelhamento,
+                                                        k_vizinhos, limite_exato, orcamento_s=orcamento_s)
+    for a, b in matching_pairs:
+        caminho = paths_between[(a, b)]
+        for x, y in zip(caminho[:-1], caminho[1:]):
+            u, v, _, mao_unica = rua_entre[(min(x, y), max(x, y))]
+            if mao_unica:
+                direcionadas[(u, v)] += 1
+            else:
+                mao_dupla[(min(x, y), max(x, y))] += 1
+
+    # ---- 2. Equilíbrio das mãos únicas ----
+    print("3.3. Equilibrando entrada/saida (fluxo de custo minimo)...")
+    direcionadas, repetidas, usadas = _fluxo_de_copias(direcionadas, arcos, idx, mao_dupla)
+    mao_dupla.subtract(usadas)
+
+    # ---- 3 e 4. Orientação do restante e correção final ----
+    print("3.4. Orientando ruas de mao dupla restantes...")
+    direcionadas.update(_orientar_por_euler(mao_dupla))
+    direcionadas, repetidas_fim, _ = _fluxo_de_copias(direcionadas, arcos, idx)
+    repetidas.update(repetidas_fim)
+    print(f"   -> {sum(repetidas.values())} travessias repetidas pelos fluxos.")
+
+    MG = defaultdict(Counter)
+    for (u, v), c in direcionadas.items():
+        if c:
+            MG[u][v] += c
+
+    print("3.5. Extraindo circuito euleriano direcionado (Hierholzer)...")
+    if inicio is None or inicio not in idx:
+        inicio = nos[0]
+    euler_edges = hierholzer_direcionado(MG, inicio)
+    tour_vertices = [inicio] + [v for _, v in euler_edges] if euler_edges else []
+    total_cost = sum(G[u][v] * c for u in MG for v, c in MG[u].items())
+
+    return {
+        "tour_vertices": tour_vertices,
+        "euler_edges": euler_edges,
+        "total_cost": total_cost,
+        "MG_counts": MG,
+        "matching_pairs": matching_pairs,
+        "paths_between": paths_between,
+        "odd_nodes": impares,
+        "grafo": G,
+        "repeticoes": repetidas,
+    }
@@ -0,0 +1,115 @@
+"""
+EMPARELHAMENTO PERFEITO DE CUSTO MÍNIMO PARA CONJUNTOS GRANDES DE NÓS ÍMPARES
+
+Alternativa ao 'min_weight_perfect_matching' denso do resolver_cpp.py, que
+monta a matriz m×m completa (e, para m > 20, ordena todos os m²/2 pares).
+
+Modo esparso (grafo de candidatos):
+1. Para cada nó ímpar roda um Dijkstra limitado que para ao encontrar os
+   k nós ímpares mais próximos; só esses pares viram arestas candidatas.
+2. Roda o emparelhamento de custo mínimo exato (Blossom, networkx) sobre
+   o grafo de candidatos, que é esparso (~k·m arestas).
+3. Se o emparelhamento não for perfeito, apenas os nós que ficaram
+   descobertos ganham mais candidatos (k dobra para eles) e o passo 2 é
+   repetido. No limite todos os pares são candidatos, então sempre termina.
+Como os pares ótimos são quase sempre geograficamente próximos, o
+resultado coincide com o ótimo global na prática, com memória O(k·m).
+"""
+
+from typing import Dict, List
+
+from busca_caminhos import dijkstra_limitado
+
+K_VIZINHOS = 10
+
+class _ArvoresLimitadas:
+    """Árvores de Dijkstra limitadas por nó ímpar, ampliadas sob demanda."""
+
+    def __init__(self, G: Dict[int, Dict[int, float]], odd_nodes: List[int]):
+        self.G = G
+        self.alvos = set(odd_nodes)
+        self.arvores = {}
+        self.k = {}
+
+    def expandir(self, u: int, k: int):
+        """Garante que a árvore de u alcance seus k ímpares mais próximos."""
+        if self.k.get(u, 0) >= k:
+            return self.arvores[u][2]
+        dist, prev, encontrados = dijkstra_limitado(self.G, u, self.alvos, k)
+        self.arvores[u] = (dist, prev, encontrados)
+        self.k[u] = k
+        return encontrados
+
+    def distancia(self, u: int, v: int) -> float:
+        for a, b in ((u, v), (v, u)):
+            arv = self.arvores.get(a)
+            if arv is not None and b in arv[0] and b in arv[2]:
+                return arv[0][b]
+        raise KeyError((u, v))
+
+    def caminho(self, u: int, v: int) -> List[int]:
+        for a, b in ((u, v), (v, u)):
+            arv = self.arvores.get(a)
+            if arv is not None and b in arv[2]:
+                prev = arv[1]
+                path = [b]
+                while path[-1] != a:
+                    path.append(prev[path[-1]])
+                path.reverse()
+                return path if a == u else list(reversed(path))
+        raise KeyError((u, v))
+
+def emparelhamento_esparso(G: Dict[int, Dict[int, float]], odd_nodes: List[int], k: int = K_VIZINHOS):
+    """
+    Emparelhamento perfeito de custo mínimo sobre o grafo de k-vizinhos.
+    Saídas: (matching_pairs, paths_between, custo_emparelhamento), no mesmo
+    formato usado por resolver_cpp.
+    """
+    import networkx as nx
+
+    m = len(odd_nodes)
+    assert m % 2 == 0, "Para que haja correspondência perfeita, o número de nós deve ser par."
+    if m == 0:
+        return [], {}, 0.0
+
+    arvores = _ArvoresLimitadas(G, odd_nodes)
+    H = nx.Graph()
+    H.add_nodes_from(odd_nodes)
+
+    def adicionar_candidatos(u, k_u):
+        for v in arvores.expandir(u, k_u):
+            d = arvores.distancia(u, v)
+            if not H.has_edge(u, v) or d < H[u][v]["weight"]:
+                H.add_edge(u, v, weight=d)
+
+    k = max(1, min(k, m - 1))
+    for u in odd_nodes:
+        adicionar_candidatos(u, k)
+    print(f"   -> Grafo de candidatos: {m} nós, {H.number_of_edges()} arestas (k={k})")
+
+    k_no = {u: k for u in odd_nodes}
+    while True:
+        emparelhamento = nx.min_weight_matching(H, weight="weight")
+        cobertos = {x for par in emparelhamento for x in par}
+        descobertos = [u for u in odd_nodes if u not in cobertos]
+        if not descobertos:
+            break
+        if all(k_no[u] >= m - 1 for u in descobertos):
+            raise ValueError("Não existe emparelhamento perfeito (grafo não é conexo?).")
+        # Adensa apenas ao redor dos nós descobertos
+        for u in descobertos:
+            k_no[u] = min(2 * k_no[u], m - 1)
+            adicionar_candidatos(u, k_no[u])
+        print(f"   -> {len(descobertos)} nó(s) sem par; adensando candidatos "
+              f"({H.number_of_edges()} arestas)")
+
+    matching_pairs = []
+    paths_between = {}
+    custo = 0.0
+    for u, v in emparelhamento:
+        p = arvores.caminho(u, v)
+        matching_pairs.append((u, v))
+        paths_between[(u, v)] = p
+        paths_between[(v, u)] = list(reversed(p))
+        custo += H[u][v]["weight"]
+    return matching_pairs, paths_between, custo
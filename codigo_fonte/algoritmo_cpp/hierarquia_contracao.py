@@ -0,0 +1,247 @@
+"""
+HIERARQUIA DE CONTRAÇÃO (CONTRACTION HIERARCHIES) PARA CAMINHOS MÍNIMOS
+
+Pré-processamento opcional, feito uma vez por grafo e persistido em disco,
+que acelera consultas repetidas de caminho mínimo sobre a mesma malha:
+- resolver_cpp.py (--ch): tabela de distâncias entre os nós ímpares
+  (consulta muitos-para-muitos por "buckets") e caminhos dos pares
+  emparelhados;
+- route2.py (--ch): ligações base <-> pontos de corte dos clusters.
+
+Construção: os nós são contraídos em ordem de importância (diferença de
+arestas + vizinhos já contraídos, com atualização preguiçosa). Ao contrair
+v, cada par de vizinhos (u, w) recebe um atalho u-w com peso
+d(u,v)+d(v,w), a menos que uma busca local de testemunha encontre um
+caminho tão curto quanto que não passe por v.
+
+Consulta: buscas de Dijkstra apenas "para cima" (rumo a nós de rank maior)
+a partir de s e de t; d(s,t) = min sobre os nós comuns de ds[x] + dt[x].
+Os atalhos guardam o nó contraído do meio, o que permite desempacotar o
+caminho original.
+"""
+
+import heapq
+import os
+import pickle
+import tempfile
+from typing import Dict, List, Tuple
+
+from cache_distancias import hash_grafo
+
+# Limite de nós assentados na busca de testemunha (troca qualidade da ordem por tempo)
+LIMITE_TESTEMUNHA = 200
+
+class HierarquiaContracao:
+    """Grafo "para cima" da hierarquia: up[u][v] = (peso, meio) para rank[v] > rank[u]."""
+
+    def __init__(self, rank: Dict[int, int], up: Dict[int, Dict[int, Tuple[float, int]]], hash_g: str):
+        self.rank = rank
+        self.up = up
+        self.hash = hash_g
+        self.graph = None  # grafo original (não persistido), usado por route2
+
+    # ---------------------------------
+    # CONSTRUÇÃO
+    # ---------------------------------
+    @classmethod
+    def construir(cls, G: Dict[int, Dict[int, float]]) -> "HierarquiaContracao":
+        adj = {u: {v: (w, None) for v, w in G[u].items() if v != u} for u in G}
+        contraidos_viz = {u: 0 for u in G}
+        rank = {}
+        up = {u: {} for u in G}
+
+        def testemunha(origem, excluido, alvos, limite):
+            """Dijkstra local a partir de 'origem' sem passar por 'excluido'."""
+            dist = {origem: 0.0}
+            pq = [(0.0, origem)]
+            assentados = 0
+            restantes = set(alvos)
+            while pq and restantes and assentados < LIMITE_TESTEMUNHA:
+                d, x = heapq.heappop(pq)
+                if d > dist[x]:
+                    continue
+                if d > limite:
+                    break
+                assentados += 1
+                restantes.discard(x)
+                for y, (w, _) in adj[x].items():
+                    if y == excluido:
+                        continue
+                    nd = d + w
+                    if nd < dist.get(y, float('inf')):
+                        dist[y] = nd
+                        heapq.heappush(pq, (nd, y))
+            return dist
+
+        def atalhos_necessarios(v):
+            viz = list(adj[v].items())
+            atalhos = []
+            for i, (u, (wu, _)) in enumerate(viz):
+                outros = viz[i + 1:]
+                if not outros:
+                    continue
+                limite = wu + max(ww for _, (ww, _) in outros)
+                dist = testemunha(u, v, [w for w, _ in outros], limite)
+                for w, (ww, _) in outros:
+                    via = wu + ww
+                    if dist.get(w, float('inf')) > via:
+                        atalhos.append((u, w, via))
+            return atalhos
+
+        def prioridade(v):
+            return len(atalhos_necessarios(v)) - len(adj[v]) + contraidos_viz[v]
+
+        fila = [(prioridade(v), v) for v in G]
+        heapq.heapify(fila)
+        proximo_rank = 0
+        while fila:
+            _, v = heapq.heappop(fila)
+            if v in rank:
+                continue
+            # Atualização preguiçosa: recalcula e devolve à fila se piorou
+            p = prioridade(v)
+            if fila and p > fila[0][0]:
+                heapq.heappush(fila, (p, v))
+                continue
+
+            for u, w, via in atalhos_necessarios(v):
+                atual = adj[u].get(w)
+                if atual is None or via < atual[0]:
+                    adj[u][w] = (via, v)
+                    adj[w][u] = (via, v)
+
+            rank[v] = proximo_rank
+            proximo_rank += 1
+            for u, aresta in adj[v].items():
+                up[v][u] = aresta
+                del adj[u][v]
+                contraidos_viz[u] += 1
+            adj[v] = {}
+
+        ch = cls(rank, up, hash_grafo(G))
+        ch.graph = G
+        return ch
+
+    # ---------------------------------
+    # PERSISTÊNCIA
+    # ---------------------------------
+    def salvar(self, caminho: str):
+        diretorio = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(diretorio, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=diretorio, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump({"hash": self.hash, "rank": self.rank, "up": self.up}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, caminho)
+
+    @classmethod
+    def carregar_ou_construir(cls, G: Dict[int, Dict[int, float]], caminho: str) -> "HierarquiaContracao":
+        """Reaproveita o índice salvo se for do mesmo grafo; senão constrói e salva."""
+        h = hash_grafo(G)
+        if os.path.exists(caminho):
+            try:
+                with open(caminho, "rb") as f:
+                    dados = pickle.load(f)
+                if dados.get("hash") == h:
+                    ch = cls(dados["rank"], dados["up"], h)
+                    ch.graph = G
+                    print(f"Hierarquia de contração carregada: {caminho}")
+                    return ch
+            except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+                pass
+        print("Construindo hierarquia de contração...")
+        ch = cls.construir(G)
+        ch.salvar(caminho)
+        n_atalhos = sum(1 for u in ch.up for _, meio in ch.up[u].values() if meio is not None)
+        print(f"Hierarquia salva em {caminho} ({n_atalhos} atalhos).")
+        return ch
+
+    # ---------------------------------
+    # CONSULTAS
+    # ---------------------------------
+    def _busca_para_cima(self, origem: int):
+        dist = {origem: 0.0}
+        prev = {}
+        pq = [(0.0, origem)]
+        up = self.up
+        while pq:
+            d, u = heapq.heappop(pq)
+            if d > dist[u]:
+                continue
+            for v, (w, _) in up[u].items():
+                nd = d + w
+                if nd < dist.get(v, float('inf')):
+                    dist[v] = nd
+                    prev[v] = u
+                    heapq.heappush(pq, (nd, v))
+        return dist, prev
+
+    def _aresta(self, a: int, b: int) -> Tuple[float, int]:
+        return self.up[a][b] if self.rank[a] < self.rank[b] else self.up[b][a]
+
+    def _desempacotar(self, a: int, b: int, saida: List[int]):
+        """Acrescenta a 'saida' os nós originais de a até b (exclusive a)."""
+        pilha = [(a, b)]
+        while pilha:
+            x, y = pilha.pop()
+            _, meio = self._aresta(x, y)
+            if meio is None:
+                saida.append(y)
+            else:
+                pilha.append((meio, y))
+                pilha.append((x, meio))
+
+    def distancia(self, s: int, t: int) -> float:
+        if s == t:
+            return 0.0
+        ds, _ = self._busca_para_cima(s)
+        dt, _ = self._busca_para_cima(t)
+        return min((d + dt[x] for x, d in ds.items() if x in dt), default=float('inf'))
+
+    def caminho(self, s: int, t: int) -> Tuple[List[int], float, int]:
+        """Mesma interface de BuscaDirecionada.caminho: (nós, custo, nós assentados)."""
+        if s == t:
+            return [s], 0.0, 0
+        if s not in self.up or t not in self.up:
+            return [], 0.0, 0
+        ds, ps = self._busca_para_cima(s)
+        dt, pt = self._busca_para_cima(t)
+        assentados = len(ds) + len(dt)
+        melhor, meio = float('inf'), None
+        for x, d in ds.items():
+            if x in dt and d + dt[x] < melhor:
+                melhor, meio = d + dt[x], x
+        if meio is None:
+            return [], 0.0, assentados
+
+        # Sequência de arestas da hierarquia s -> meio -> t
+        subida = [meio]
+        while subida[-1] != s:
+            subida.append(ps[subida[-1]])
+        subida.reverse()
+        descida = [meio]
+        while descida[-1] != t:
+            descida.append(pt[descida[-1]])
+
+        nos = [s]
+        for a, b in zip(subida[:-1], subida[1:]):
+            self._desempacotar(a, b, nos)
+        for a, b in zip(descida[:-1], descida[1:]):
+            self._desempacotar(a, b, nos)
+        return nos, melhor, assentados
+
+    def tabela_distancias(self, nos: List[int]) -> Dict[int, Dict[int, float]]:
+        """Distâncias muitos-para-muitos entre 'nos' (algoritmo de buckets)."""
+        espacos = {u: self._busca_para_cima(u)[0] for u in nos}
+        buckets = {}
+        for u, ds in espacos.items():
+            for x, d in ds.items():
+                buckets.setdefault(x, []).append((u, d))
+        tabela = {u: {u: 0.0} for u in nos}
+        for v, dv in espacos.items():
+            linha = tabela[v]
+            for x, d in dv.items():
+                for u, du in buckets.get(x, ()):
+                    total = du + d
+                    if total < linha.get(u, float('inf')):
+                        linha[u] = total
+        return tabela
@@ -7,34 +7,53 @@ de Edmonds-Johnson ("Chinese Postman Problem") em Python puro.
 O script é otimizado:
 1. Usa Dijkstra *apenas* a partir dos nós ímpares.
 2. Implementa um 'min_weight_perfect_matching' híbrido (DP exato
-   para grafos pequenos, heurística para grafos maiores).
+   iterativo para poucos nós ímpares, heurística para grafos maiores).
 3. Calcula o custo total de forma otimizada (Custo(G) + Custo(Matching)).
 4. Usa o algoritmo de Hierholzer para extrair o circuito.
 
 Entrada: (via argumento) dados_processados/matriz_adjacencia.csv
-Saídas:  4_resultados_finais/relatorio_tour/
-         ├─ tour.csv
+         ou o snapshot binário dados_processados/snapshot_grafo/
+Saídas:  resultados_finais/relatorio_tour/ (ou a pasta de --saida)
+         ├─ tour.npz            (colunar; ver saida_tour.py)
          ├─ tour_cost.txt
-         ├─ tour_detalhado.csv
-         └─ matching_paths.csv
+         └─ tour.csv, tour_detalhado.csv, matching_paths.csv
+            (opcionais, com --formatos npz,csv; ou .parquet com --formatos parquet)
+
+Grafo desconexo (ex.: bairro cortado por uma rodovia): cada componente é
+resolvida separadamente, em paralelo, com as saídas em componente_K/ e o
+resumo em componentes.csv. A pasta de saída não recebe tour próprio: os
+circuitos das componentes não formam um percurso único.
 """
 
+import argparse
+import contextlib
 import csv
-import heapq
-import json
+import io
 import math
+import random
 import sys
 import os # Necessário para os caminhos de saída
+import time
 from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Tuple
 
+from busca_caminhos import dijkstra
+from saida_tour import ARQUIVO_COMPONENTES, ARQUIVOS_TOUR, FORMATOS_PADRAO, gravacao_atomica, parse_formatos, salvar_tour
+
 # ---------------------------------
 # 1. LEITURA DO GRAFO
 # ---------------------------------
+# Células que representam "sem aresta" na matriz (descartadas sem float())
+_CELULAS_VAZIAS = frozenset(("", "0", "0.0", "-0.0", "0.00"))
+
 def read_adjacency_csv(path: str) -> Tuple[Dict[int, Dict[int, float]], List[int]]:
     """
     Função de leitura. Constrói o grafo como um dicionário de dicionários!
     Lê uma matriz de adjacência CSV com index_col=0. Valores 0.0 ou vazios = sem aresta.
+    A matriz é processada em streaming, linha a linha: apenas a linha corrente
+    fica em memória como texto e só as células não-nulas são convertidas,
+    de modo que o pico de memória é o tamanho do grafo, não o do arquivo.
     Saída: Retorna (G, nodes) onde G[u][v]=peso e lista ordenada de nós.
     """
     G = {}
@@ -42,78 +61,263 @@ def read_adjacency_csv(path: str) -> Tuple[Dict[int, Dict[int, float]], List[int
     print(f"Lendo {path}...")
     with open(path, newline='', encoding='utf-8') as f:
         reader = csv.reader(f)
-        rows = list(reader)
-    if not rows:
-        return {}, []
+        header = next(reader, None)
+        if not header:
+            return {}, []
 
-    header = rows[0][1:]
-    nodes = [int(x) for x in header]
+        nodes = [int(x) for x in header[1:]]
+        for n in nodes:
+            G[n] = {}
 
-    for n in nodes:
-        G[n] = {}
-
-    for r in rows[1:]:
-        i = int(r[0])
-        for j, cell in enumerate(r[1:]):
-            col_node = nodes[j]
-            if cell is None or cell == "":
-                continue
-            try:
-                w = float(cell)
-            except Exception:
+        vazias = _CELULAS_VAZIAS
+        for r in reader:
+            if not r:
                 continue
-            if math.isfinite(w) and w != 0.0:
-                prev = G[i].get(col_node)
-                if prev is None or w < prev:
-                    G[i][col_node] = w
-                    G[col_node][i] = w
+            i = int(r[0])
+            Gi = G[i]
+            for j, cell in enumerate(r[1:]):
+                if cell in vazias:
+                    continue
+                try:
+                    w = float(cell)
+                except ValueError:
+                    continue
+                if math.isfinite(w) and w != 0.0:
+                    col_node = nodes[j]
+                    prev = Gi.get(col_node)
+                    if prev is None or w < prev:
+                        Gi[col_node] = w
+                        G[col_node][i] = w
     print(f"Grafo lido: {len(nodes)} nós.")
     return G, nodes
 
+def read_graph(path: str) -> Tuple[Dict[int, Dict[int, float]], List[int]]:
+    """
+    Lê o grafo a partir do snapshot binário (diretório, via memory-map)
+    ou, caso contrário, da matriz de adjacência CSV.
+    """
+    if os.path.isdir(path):
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "setup_grafo"))
+        from snapshot_grafo import carregar_snapshot, snapshot_para_dict
+        print(f"Lendo snapshot {path}...")
+        G, nodes = snapshot_para_dict(carregar_snapshot(path))
+        print(f"Grafo lido: {len(nodes)} nós.")
+        return G, nodes
+    return read_adjacency_csv(path)
+
 # ---------------------------------
 # 2. ALGORITMOS DE GRAFO
 # ---------------------------------
-def dijkstra(graph: Dict[int, Dict[int, float]], source: int) -> Tuple[Dict[int, float], Dict[int, List[int]]]:
+# Maior número de nós ímpares resolvido pelo DP exato (acima disso, heurística).
+# Custo do DP cresce com 2^m: m=20 -> ~0,3 s / ~20 MB; m=24 -> ~4 s / ~330 MB.
+# Ver codigo_fonte/benchmarks/benchmark_emparelhamento_exato.py.
+LIMITE_EXATO = 20
+
+# Candidatos (vizinhos mais próximos) por nó na busca local do emparelhamento heurístico
+K_CANDIDATOS = 10
+# Candidatos tentados em cada nível da cadeia de trocas (o tamanho é a profundidade máxima)
+LARGURA_BUSCA = (10, 10, 5, 5, 3, 3, 2, 2, 2, 2, 1, 1, 1, 1, 1, 1)
+
+def emparelhamento_exato_dp(C) -> List[Tuple[int, int]]:
     """
-    Implementação clássica do algoritmo de Dijkstra usando uma fila de prioridade (heapq).
-    Saídas: Retorna (dist, paths) onde dist[v]=distância, paths[v]=caminho do source até v (lista de nós).
+    Emparelhamento perfeito ótimo por programação dinâmica em bitmask,
+    iterativa e sobre tabelas NumPy pré-alocadas (sem recursão nem dicts).
+
+    dp[mask] = custo mínimo para emparelhar os nós de 'mask'. O nó de menor
+    índice i de 'mask' é sempre pareado com algum j de 'mask'. As máscaras são
+    processadas por número de bits (2, 4, ..., m) e, dentro de cada nível,
+    de forma vetorizada: para cada j, todas as máscaras que contêm j são
+    relaxadas de uma só vez.
+    Saída: lista de pares de índices (i, j) de C.
     """
-    dist = {source: 0.0}
-    prev = {}
-    pq = [(0.0, source)]
-    while pq:
-        d, u = heapq.heappop(pq)
-        if d > dist.get(u, float('inf')):
-            continue
-        for v, w in graph[u].items():
-            nd = d + w
-            if nd < dist.get(v, float('inf')):
-                dist[v] = nd
-                prev[v] = u
-                heapq.heappush(pq, (nd, v))
-
-    paths = {}
-    for v in dist:
-        cur = v
-        path = [cur]
-        if cur == source:
-            paths[v] = path
+    import numpy as np
+
+    C = np.asarray(C, dtype=np.float64)
+    m = C.shape[0]
+    if m == 0:
+        return []
+    total = 1 << m
+
+    # popcount de todas as máscaras por duplicação (sem arange de 2^m)
+    pc = np.zeros(total, dtype=np.uint8)
+    for b in range(m):
+        pc[1 << b: 1 << (b + 1)] = pc[: 1 << b] + 1
+
+    dp = np.full(total, np.inf, dtype=np.float64)
+    dp[0] = 0.0
+    escolha = np.full(total, -1, dtype=np.int8)
+
+    for nivel in range(2, m + 1, 2):
+        masks = np.flatnonzero(pc == nivel)
+        low = masks & -masks
+        i = np.log2(low).astype(np.intp)
+        sem_i = masks ^ low
+        melhor = np.full(len(masks), np.inf, dtype=np.float64)
+        melhor_j = np.full(len(masks), -1, dtype=np.int8)
+        for j in range(1, m):
+            bit = 1 << j
+            sel = np.flatnonzero(sem_i & bit)
+            if sel.size == 0:
+                continue
+            cand = C[i[sel], j] + dp[sem_i[sel] ^ bit]
+            melhora = cand < melhor[sel]
+            alvo = sel[melhora]
+            melhor[alvo] = cand[melhora]
+            melhor_j[alvo] = j
+        dp[masks] = melhor
+        escolha[masks] = melhor_j
+        del masks, low, i, sem_i, melhor, melhor_j
+
+    pairs = []
+    mask = total - 1
+    while mask:
+        i = (mask & -mask).bit_length() - 1
+        j = int(escolha[mask])
+        pairs.append((i, j))
+        mask ^= (1 << i) | (1 << j)
+    return pairs
+
+def emparelhamento_anytime(C, orcamento_s: float = None, k: int = K_CANDIDATOS, semente: int = 0):
+    """
+    Emparelhamento perfeito heurístico "anytime", para m acima do limite do DP.
+
+    1. Guloso sobre as listas de candidatos (os k nós mais próximos de cada
+       nó); quem sobrar é pareado pelo guloso sobre todos os pares restantes.
+    2. Busca local por cadeias de trocas (como no Lin-Kernighan): a partir
+       do nó a (par b), liga a ao candidato c1 (par d1), d1 ao candidato c2
+       (par d2), ... e fecha com (dk, b):
+           (a,b),(c1,d1),...,(ck,dk) -> (a,c1),(d1,c2),...,(dk,b)
+       Só segue enquanto o ganho parcial é positivo, com LARGURA_BUSCA
+       candidatos por nível; aplica a melhor cadeia (com um só c, é o 2-opt).
+       Bits "não olhe": um nó sai da fila quando não melhora e só volta se
+       o seu par mudar.
+    3. Com 'orcamento_s' (segundos), enquanto houver tempo: perturbação (troca
+       forçada de 3 pares vizinhos escolhidos ao acaso) seguida de busca
+       local, mantida só se o custo cair. Ao fim do prazo devolve a melhor
+       solução.
+    Sem orçamento, para no ótimo local da etapa 2.
+    Devolve (pares de índices de C, curva [(segundos, custo)], limite inferior);
+    o limite inferior é metade da soma, por nó, da distância ao mais próximo.
+    """
+    import numpy as np
+
+    inicio = time.perf_counter()
+    prazo = None if orcamento_s is None else inicio + orcamento_s
+    Cn = np.array(C, dtype=np.float64)
+    m = Cn.shape[0]
+    np.fill_diagonal(Cn, np.inf)
+    limite_inferior = float(Cn.min(axis=1).sum()) / 2
+    k = min(k, m - 1)
+    viz = np.argpartition(Cn, k - 1, axis=1)[:, :k]
+    viz = np.take_along_axis(viz, np.take_along_axis(Cn, viz, axis=1).argsort(axis=1), axis=1)
+    cand = viz.tolist()
+    C = Cn.tolist()
+
+    # 1. Guloso
+    par = [-1] * m
+    for i, j in sorted({(min(i, j), max(i, j)) for i in range(m) for j in cand[i]}, key=lambda e: C[e[0]][e[1]]):
+        if par[i] < 0 and par[j] < 0:
+            par[i], par[j] = j, i
+    sobra = [i for i in range(m) if par[i] < 0]
+    for _, i, j in sorted((C[i][j], i, j) for x, i in enumerate(sobra) for j in sobra[x + 1:]):
+        if par[i] < 0 and par[j] < 0:
+            par[i], par[j] = j, i
+    custo = sum(C[i][par[i]] for i in range(m) if i < par[i])
+    curva = [(time.perf_counter() - inicio, custo)]
+
+    # 2. Busca local com bits "não olhe"
+    ativo = [False] * m
+
+    def trocar(a, b, cadeia):
+        """Aplica a cadeia [c1, ..., ck] a partir de a (par b); devolve os nós afetados."""
+        afetados = [a, b]
+        x = a
+        for c in cadeia:
+            d = par[c]
+            par[x], par[c] = c, x
+            afetados += [c, d]
+            x = d
+        par[x], par[b] = b, x
+        return afetados
+
+    def melhor_cadeia(a, b):
+        melhor, cadeia, usados = [1e-9, None], [], {a, b}
+
+        def estender(x, ganho, nivel):
+            for c in cand[x][:LARGURA_BUSCA[nivel]]:
+                g = ganho - C[x][c]
+                if g <= 0:
+                    break
+                if c in usados:
+                    continue
+                d = par[c]
+                g += C[c][d]
+                cadeia.append(c)
+                if g - C[d][b] > melhor[0]:
+                    melhor[:] = [g - C[d][b], list(cadeia)]
+                if nivel + 1 < len(LARGURA_BUSCA):
+                    usados.update((c, d))
+                    estender(d, g, nivel + 1)
+                    usados.difference_update((c, d))
+                cadeia.pop()
+
+        estender(a, C[a][b], 0)
+        return melhor
+
+    def busca_local(fila):
+        ganho_total = 0.0
+        for x in fila:
+            ativo[x] = True
+        passos = 0
+        while fila:
+            passos += 1
+            if prazo is not None and passos % 256 == 0 and time.perf_counter() > prazo:
+                for x in fila:
+                    ativo[x] = False
+                break
+            a = fila.pop()
+            ativo[a] = False
+            ganho, cadeia = melhor_cadeia(a, par[a])
+            if cadeia is not None:
+                ganho_total += ganho
+                for x in trocar(a, par[a], cadeia):
+                    if not ativo[x]:
+                        ativo[x] = True
+                        fila.append(x)
+        return ganho_total
+
+    custo -= busca_local(list(range(m - 1, -1, -1)))
+    curva.append((time.perf_counter() - inicio, custo))
+
+    # 3. Perturbação + busca local até o fim do orçamento
+    rng = random.Random(semente)
+    while prazo is not None and time.perf_counter() < prazo:
+        a = rng.randrange(m)
+        c = cand[a][rng.randrange(k)]
+        b, d = par[a], par[c]
+        e = cand[d][rng.randrange(k)]
+        if c == b or e in (a, b, c, d):
             continue
-        
-        # Reconstrói o caminho
-        while cur in prev:
-             cur = prev[cur]
-             path.append(cur)
-             if cur == source:
-                 break
-        path.reverse()
-        paths[v] = path
-    return dist, paths
-
-def min_weight_perfect_matching(nodes: List[int], weight_func) -> List[Tuple[int,int]]:
+        f = par[e]
+        salvo = par[:]
+        novo = custo + C[a][c] + C[d][e] + C[b][f] - C[a][b] - C[c][d] - C[e][f]
+        novo -= busca_local(trocar(a, b, [c, e]))
+        if novo < custo - 1e-9:
+            custo = novo
+            curva.append((time.perf_counter() - inicio, custo))
+        else:
+            par[:] = salvo
+
+    pares = [(i, par[i]) for i in range(m) if i < par[i]]
+    return pares, curva, limite_inferior
+
+def min_weight_perfect_matching(nodes: List[int], weight_func, limite_exato: int = LIMITE_EXATO,
+                                orcamento_s: float = None) -> List[Tuple[int,int]]:
     """
     Min-weight perfect matching (Blossom-like): Pega a lista de nós ímpares (nodes)
     e encontra a forma mais barata de agrupá-los em pares.
+    Até 'limite_exato' nós usa o DP exato; acima disso, a heurística anytime
+    (emparelhamento_anytime), que usa até 'orcamento_s' segundos se informado.
     """
     m = len(nodes)
     assert m % 2 == 0, "Para que haja correspondência perfeita, o número de nós deve ser par."
@@ -128,85 +332,47 @@ def min_weight_perfect_matching(nodes: List[int], weight_func) -> List[Tuple[int
             C[i][j] = w
             C[j][i] = w
 
-    # CASO 1 — DP EXATO (m <= 20)
-    if m <= 20:
-        FULL = (1 << m) - 1
-        memo = {}
-        pair_choice = {}
-
-        def dp(mask):
-            if mask == 0:
-                return 0.0
-            if mask in memo:
-                return memo[mask]
-
-            i = (mask & -mask).bit_length() - 1
-            mask2 = mask ^ (1 << i)
-            best = float('inf')
-            bestj = -1
-            mm = mask2
-            while mm:
-                jbit = (mm & -mm)
-                j = jbit.bit_length() - 1
-                val = C[i][j] + dp(mask2 ^ (1 << j))
-                if val < best:
-                    best = val
-                    bestj = j
-                mm ^= jbit
-            memo[mask] = best
-            pair_choice[mask] = (i, bestj)
-            return best
-
-        dp(FULL)
-        mask = FULL
-        pairs = []
-        while mask:
-            i, j = pair_choice[mask]
-            pairs.append((inv[i], inv[j]))
-            mask ^= (1 << i)
-            mask ^= (1 << j)
-        return pairs
-
-    # CASO 2 — HEURÍSTICA GREEDY + LOCAL IMPROVEMENT (m > 20)
-    pairs = []
-    used = [False]*m
-    all_pairs = [(C[i][j], i, j) for i in range(m) for j in range(i+1, m)]
-    all_pairs.sort()
-    for w,i,j in all_pairs:
-        if not used[i] and not used[j]:
-            used[i] = used[j] = True
-            pairs.append((i,j))
-    matching = pairs
-
-    improved = True
-    iters = 0
-    while improved and iters < 1000:
-        improved = False
-        iters += 1
-        nmatch = len(matching)
-        for p in range(nmatch):
-            a,b = matching[p]
-            for q in range(p+1, nmatch):
-                c,d = matching[q]
-                cur = C[a][b] + C[c][d]
-                new1 = C[a][c] + C[b][d]
-                new2 = C[a][d] + C[b][c]
-                if new1 + 1e-12 < cur:
-                    matching[p] = (a,c)
-                    matching[q] = (b,d)
-                    improved = True
-                    break
-                elif new2 + 1e-12 < cur:
-                    matching[p] = (a,d)
-                    matching[q] = (b,c)
-                    improved = True
-                    break
-            if improved:
-                break
-    result = []
-    for i,j in matching:
-        result.append((inv[i], inv[j]))
-    return result
+    # CASO 1 — DP EXATO (m <= limite_exato)
+    if m <= limite_exato:
+        return [(inv[i], inv[j]) for i, j in emparelhamento_exato_dp(C)]
+
+    # CASO 2 — HEURÍSTICA ANYTIME (m > limite_exato)
+    pares, curva, limite_inferior = emparelhamento_anytime(C, orcamento_s)
+    custo = curva[-1][1]
+    gap = (custo - limite_inferior) / custo if custo > 0 else 0.0
+    print(f"   -> Heuristica: custo {custo:.2f} (guloso {curva[0][1]:.2f}), limite inferior "
+          f"{limite_inferior:.2f} (gap <= {gap:.2%}), {len(curva) - 1} melhoria(s)"
+          + (f", orcamento {orcamento_s:g}s" if orcamento_s is not None else ""))
+    passo = max(1, len(curva) // 8)
+    for t, c in curva[::passo] + ([curva[-1]] if (len(curva) - 1) % passo else []):
+        print(f"      t={t:8.3f}s  custo={c:.2f}")
+    return [(inv[i], inv[j]) for i, j in pares]
+
+def emparelhar_impares(G: Dict[int, Dict[int, float]], impares: List[int], emparelhamento: str = "denso",
+                       k_vizinhos: int = 10, limite_exato: int = LIMITE_EXATO, tabelas=None,
+                       orcamento_s: float = None):
+    """
+    Emparelhamento dos nós ímpares de G com caminhos mínimos, para os modos
+    que montam o próprio multigrafo (CPP misto, carteiro rural).
+    'tabelas' (opcional, modo denso) é lido e preenchido com o Dijkstra de
+    cada nó ímpar, como em resolver_cpp_memoria; 'orcamento_s' é o tempo da
+    heurística de emparelhamento (ver min_weight_perfect_matching).
+    Saídas: (matching_pairs, paths_between).
+    """
+    if not impares:
+        return [], {}
+    if emparelhamento == "esparso":
+        from emparelhamento import emparelhamento_esparso
+        pares, caminhos, _ = emparelhamento_esparso(G, impares, k_vizinhos)
+        return pares, caminhos
+    if tabelas is None:
+        tabelas = {}
+    for u in impares:
+        if u not in tabelas:
+            tabelas[u] = dijkstra(G, u)
+    pares = min_weight_perfect_matching(
+        impares, lambda a, b: tabelas[a][0].get(b, float('inf')), limite_exato, orcamento_s)
+    return pares, {(a, b): tabelas[a][1][b] for a, b in pares}
 
 def build_multigraph_with_counts(graph: Dict[int, Dict[int, float]], matching_pairs: List[Tuple[int,int]], paths_between: Dict[Tuple[int,int], List[int]]):
     """
@@ -228,9 +394,12 @@ def build_multigraph_with_counts(graph: Dict[int, Dict[int, float]], matching_pa
 def hierholzer_multigraph(MG: Dict[int, Counter], start=None) -> List[Tuple[int,int]]:
     """
     Implementação clássica do algoritmo de Hierholzer usando uma pilha (stack).
+    Saída: arestas (u, v) em ordem de percurso, com v de cada aresta igual
+    ao u da seguinte. 'start' fora do multigrafo (ou isolado) é ignorado.
     """
-    if start is None:
+    if start is not None and not MG.get(start):
         start = None
+    if start is None:
         for u, cnts in MG.items():
             deg = sum(cnts.values())
             if deg > 0:
@@ -260,18 +429,34 @@ def hierholzer_multigraph(MG: Dict[int, Counter], start=None) -> List[Tuple[int,
             stack.pop()
             if stack:
                 circuit.append((stack[-1], v))
+    # As arestas saem da pilha do fim para o começo do circuito
+    circuit.reverse()
     return circuit
 
 # ---------------------------------
 # 3. FLUXO PRINCIPAL (PIPELINE)
 # ---------------------------------
-def solve_cpp_puro(G: Dict[int, Dict[int, float]], nodes: List[int], out_dir: str):
+def resolver_cpp_memoria(G: Dict[int, Dict[int, float]], tabelas: Dict[int, Tuple[Dict[int, float], Dict[int, List[int]]]] = None,
+                         ch=None, emparelhamento: str = "denso", k_vizinhos: int = 10,
+                         limite_exato: int = LIMITE_EXATO, inicio: int = None, orcamento_s: float = None):
     """
-    Fluxo Principal (Pipeline) que executa a solução do CPP.
+    Executa a solução do CPP inteiramente em memória e devolve um dicionário com
+    tour_vertices, euler_edges, total_cost, MG_counts, matching_pairs, paths_between
+    e odd_nodes.
+    'tabelas' (opcional) guarda os resultados de Dijkstra por nó ímpar
+    (u -> (dist, paths)); é lido e preenchido, permitindo reaproveitar as
+    distâncias entre execuções sobre o mesmo grafo.
+    'ch' (opcional) é uma HierarquiaContracao do grafo: substitui o Dijkstra
+    de cada nó ímpar por consultas muitos-para-muitos na hierarquia.
+    emparelhamento="esparso" usa o grafo de k_vizinhos candidatos (módulo
+    emparelhamento) em vez da matriz m×m completa; 'limite_exato' é o maior
+    número de nós ímpares resolvido pelo DP exato no modo denso.
+    'inicio' (opcional) é o vértice onde o circuito começa e termina (a base do agente).
+    'orcamento_s' (opcional) limita o tempo da heurística de emparelhamento
+    (acima de 'limite_exato'), que devolve a melhor solução achada no prazo.
     """
-    if not G:
-        print("Grafo vazio.")
-        return
+    if tabelas is None:
+        tabelas = {}
 
     print("3.1. Analisando graus e conectividade...")
     degrees = {u: len(G[u]) for u in G}
@@ -294,6 +479,8 @@ def solve_cpp_puro(G: Dict[int, Dict[int, float]], nodes: List[int], out_dir: st
             raise ValueError("Grafo não é conexo entre vértices com arestas.")
     print(f"   -> Encontrados {len(odd_nodes)} nos de grau impar.")
 
+    cost_original = sum(w for u in G for v,w in G[u].items() if u < v)
+
     # Caso 1: Grafo já é Euleriano
     if not odd_nodes:
         print("3.2. Grafo já é Euleriano. Extraindo circuito...")
@@ -303,147 +490,371 @@ def solve_cpp_puro(G: Dict[int, Dict[int, float]], nodes: List[int], out_dir: st
                 if u < v:
                     MG_counts[u][v] += 1
                     MG_counts[v][u] += 1
-        euler_edges = hierholzer_multigraph(MG_counts)
+        euler_edges = hierholzer_multigraph(MG_counts, inicio)
         tour_vertices = []
         if euler_edges:
             tour_vertices = [euler_edges[0][0]] + [v for (_, v) in euler_edges]
-        cost_original = sum(w for u in G for v,w in G[u].items() if u < v)
-        
-        print("3.3. Salvando resultados...")
-        save_outputs(out_dir, tour_vertices, euler_edges, cost_original, MG_counts, {}, {})
-        return
+        return {
+            "tour_vertices": tour_vertices,
+            "euler_edges": euler_edges,
+            "total_cost": cost_original,
+            "MG_counts": MG_counts,
+            "matching_pairs": {},
+            "paths_between": {},
+            "odd_nodes": odd_nodes,
+        }
 
     # Caso 2: Grafo não-Euleriano (precisa de emparelhamento)
-    print("3.2. Calculando caminhos mínimos (Dijkstra) a partir de nós ímpares...")
-    length = {}
-    paths = {}
-    for i, u in enumerate(odd_nodes):
-        print(f"   -> Processando no impar {i+1}/{len(odd_nodes)} (ID: {u})")
-        dist, p = dijkstra(G, u)
-        length[u] = dist
-        paths[u] = p
-
-    def dist_uv(a,b):
-        return length[a][b]
-
-    print("3.3. Calculando emparelhamento perfeito de custo mínimo...")
     if len(odd_nodes) % 2 != 0:
         raise ValueError("Contagem de nós ímpares não é par. Isso não deveria acontecer.")
-    matching_pairs = min_weight_perfect_matching(odd_nodes, dist_uv)
-    print("   -> Emparelhamento concluido.")
 
-    paths_between = {}
-    for u,v in matching_pairs:
-        if v in paths[u]:
-            p = paths[u][v]
+    if emparelhamento == "esparso":
+        from emparelhamento import emparelhamento_esparso
+        print(f"3.2-3.3. Emparelhamento esparso ({k_vizinhos} vizinhos impares por no)...")
+        matching_pairs, paths_between, cost_matching = emparelhamento_esparso(G, odd_nodes, k_vizinhos)
+        print("   -> Emparelhamento concluido.")
+    else:
+        length = {}
+        paths = {}
+        if ch is not None:
+            print("3.2. Calculando distancias entre nos impares (hierarquia de contracao)...")
+            length = ch.tabela_distancias(odd_nodes)
         else:
-            p = list(reversed(paths[v][u]))
-        paths_between[(u,v)] = p
-        paths_between[(v,u)] = list(reversed(p))
+            print("3.2. Calculando caminhos mínimos (Dijkstra) a partir de nós ímpares...")
+            for i, u in enumerate(odd_nodes):
+                if u in tabelas:
+                    dist, p = tabelas[u]
+                else:
+                    print(f"   -> Processando no impar {i+1}/{len(odd_nodes)} (ID: {u})")
+                    dist, p = dijkstra(G, u)
+                    tabelas[u] = (dist, p)
+                length[u] = dist
+                paths[u] = p
+
+        def dist_uv(a,b):
+            return length[a][b]
+
+        print("3.3. Calculando emparelhamento perfeito de custo mínimo...")
+        matching_pairs = min_weight_perfect_matching(odd_nodes, dist_uv, limite_exato, orcamento_s)
+        print("   -> Emparelhamento concluido.")
+
+        paths_between = {}
+        for u,v in matching_pairs:
+            if ch is not None:
+                p = ch.caminho(u, v)[0]
+            elif v in paths[u]:
+                p = paths[u][v]
+            else:
+                p = list(reversed(paths[v][u]))
+            paths_between[(u,v)] = p
+            paths_between[(v,u)] = list(reversed(p))
+        cost_matching = sum(dist_uv(u,v) for u,v in matching_pairs)
 
     print("3.4. Construindo multigrafo aumentado...")
     MG_counts = build_multigraph_with_counts(G, matching_pairs, paths_between)
 
     print("3.5. Extraindo circuito Euleriano (Hierholzer)...")
-    euler_edges = hierholzer_multigraph(MG_counts)
+    euler_edges = hierholzer_multigraph(MG_counts, inicio)
     tour_vertices = []
     if euler_edges:
         tour_vertices = [euler_edges[0][0]] + [v for (_, v) in euler_edges]
 
     print("3.6. Calculando custo total (otimizado)...")
-    cost_original = sum(w for u in G for v,w in G[u].items() if u < v)
-    cost_matching = sum(dist_uv(u,v) for u,v in matching_pairs)
     total_cost = cost_original + cost_matching
 
+    return {
+        "tour_vertices": tour_vertices,
+        "euler_edges": euler_edges,
+        "total_cost": total_cost,
+        "MG_counts": MG_counts,
+        "matching_pairs": matching_pairs,
+        "paths_between": paths_between,
+        "odd_nodes": odd_nodes,
+    }
+
+def componentes_conexas(G: Dict[int, Dict[int, float]]) -> List[List[int]]:
+    """Componentes dos vértices com arestas (união-busca), da maior para a menor."""
+    pai = {}
+
+    def achar(x):
+        raiz = x
+        while pai[raiz] != raiz:
+            raiz = pai[raiz]
+        while pai[x] != raiz:
+            pai[x], x = raiz, pai[x]
+        return raiz
+
+    for u in G:
+        if G[u]:
+            pai.setdefault(u, u)
+        for v in G[u]:
+            pai.setdefault(v, v)
+            ru, rv = achar(u), achar(v)
+            if ru != rv:
+                pai[ru] = rv
+    grupos = defaultdict(list)
+    for x in pai:
+        grupos[achar(x)].append(x)
+    return sorted((sorted(c) for c in grupos.values()), key=lambda c: (-len(c), c[0]))
+
+def _resolver_componente(args):
+    """Executado no pool de processos: CPP de uma componente, sem as mensagens de progresso."""
+    G_comp, inicio, emparelhamento, k_vizinhos, limite_exato, orcamento_s = args
+    with contextlib.redirect_stdout(io.StringIO()):
+        sol = resolver_cpp_memoria(G_comp, None, None, emparelhamento, k_vizinhos, limite_exato, inicio,
+                                   orcamento_s)
+    sol.pop("MG_counts")
+    return sol
+
+def resolver_por_componentes(G: Dict[int, Dict[int, float]], componentes: List[List[int]],
+                             emparelhamento: str = "denso", k_vizinhos: int = 10,
+                             limite_exato: int = LIMITE_EXATO, inicio: int = None, processos: int = None,
+                             orcamento_s: float = None):
+    """
+    Resolve o CPP de cada componente de forma independente (em paralelo se
+    houver mais de uma). 'inicio' vale para a componente que o contém; nas
+    demais o circuito começa no menor vértice. Devolve [(G_comp, solução)].
+    """
+    subgrafos = [{u: G[u] for u in comp} for comp in componentes]
+    tarefas = [(Gc, inicio if inicio in Gc else None, emparelhamento, k_vizinhos, limite_exato, orcamento_s)
+               for Gc in subgrafos]
+    if processos == 1 or len(tarefas) == 1:
+        solucoes = [_resolver_componente(t) for t in tarefas]
+    else:
+        trabalhadores = min(processos or os.cpu_count() or 1, len(tarefas))
+        with ProcessPoolExecutor(max_workers=trabalhadores) as pool:
+            # Maiores primeiro (componentes já vêm ordenadas por tamanho)
+            solucoes = list(pool.map(_resolver_componente, tarefas))
+    return list(zip(subgrafos, solucoes))
+
+def salvar_componentes(out_dir: str, resultados, formatos=FORMATOS_PADRAO):
+    """
+    Grava cada componente em out_dir/componente_K/ e o resumo componentes.csv.
+    Na própria out_dir não fica tour: os circuitos das componentes não formam
+    um único percurso (route2.py e jornadas.py esperam um tour contíguo).
+    """
+    linhas = []
+    for k, (Gc, sol) in enumerate(resultados):
+        dir_comp = os.path.join(out_dir, f"componente_{k}")
+        save_outputs(dir_comp, Gc, sol["tour_vertices"], sol["euler_edges"], sol["total_cost"],
+                     sol["matching_pairs"], sol["paths_between"], formatos)
+        linhas.append([k, len(Gc), sum(len(viz) for viz in Gc.values()) // 2, len(sol["odd_nodes"]),
+                       sol["tour_vertices"][0] if sol["tour_vertices"] else "", sol["total_cost"],
+                       f"componente_{k}"])
+
+    with gravacao_atomica(os.path.join(out_dir, ARQUIVO_COMPONENTES)) as tmp:
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            wr = csv.writer(f)
+            wr.writerow(["componente", "nos", "arestas", "nos_impares", "inicio", "custo", "pasta"])
+            wr.writerows(linhas)
+
+    # Tour de uma execução anterior (grafo conexo) na mesma pasta não vale mais
+    for nome in ARQUIVOS_TOUR:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(out_dir, nome))
+    return linhas
+
+def solve_cpp_puro(G: Dict[int, Dict[int, float]], nodes: List[int], out_dir: str, tabelas=None, ch=None,
+                   emparelhamento: str = "denso", k_vizinhos: int = 10, limite_exato: int = LIMITE_EXATO,
+                   formatos=FORMATOS_PADRAO, inicio: int = None, processos: int = None, contracao=None,
+                   orcamento_s: float = None):
+    """
+    Fluxo Principal (Pipeline) que executa a solução do CPP e grava as saídas
+    nos 'formatos' pedidos (npz, parquet, csv).
+    'tabelas' pode ser um CacheDistancias para reaproveitar o Dijkstra dos nós ímpares;
+    'ch' uma HierarquiaContracao para as distâncias do emparelhamento.
+    Se o grafo for desconexo, cada componente é resolvida à parte em um pool
+    de 'processos' (ver resolver_por_componentes / salvar_componentes).
+    'contracao' (opcional) é a ContracaoCadeias de que G é o grafo reduzido:
+    o tour é expandido para os vértices originais antes de ser gravado.
+    'orcamento_s' é o tempo da heurística de emparelhamento (por componente).
+    """
+    if not G:
+        print("Grafo vazio.")
+        return
+
+    componentes = componentes_conexas(G)
+    if len(componentes) > 1:
+        print(f"3.0. Grafo desconexo: {len(componentes)} componentes "
+              f"({', '.join(str(len(c)) for c in componentes[:10])}{', ...' if len(componentes) > 10 else ''} nos).")
+        if tabelas is not None or ch is not None:
+            print("   -> Cache de distancias/hierarquia nao usados no modo por componente.")
+        resultados = resolver_por_componentes(G, componentes, emparelhamento, k_vizinhos, limite_exato,
+                                              inicio, processos, orcamento_s)
+        if contracao is not None:
+            resultados = [(contracao.subgrafo_original(Gc), contracao.expandir_solucao(sol))
+                          for Gc, sol in resultados]
+        print("3.7. Salvando resultados...")
+        linhas = salvar_componentes(out_dir, resultados, formatos)
+        print(f"{'Componente':>11}{'Nos':>7}{'Arestas':>9}{'Impares':>9}{'Inicio':>8}{'Custo (s)':>14}")
+        for k, nos, arestas, impares, ini, custo, _ in linhas:
+            print(f"{k:>11}{nos:>7}{arestas:>9}{impares:>9}{ini:>8}{custo:>14.2f}")
+        return
+
+    sol = resolver_cpp_memoria(G, tabelas, ch, emparelhamento, k_vizinhos, limite_exato, inicio, orcamento_s)
+    if contracao is not None:
+        print("3.6b. Expandindo o tour para os vertices originais...")
+        G, sol = contracao.grafo, contracao.expandir_solucao(sol)
+
     print("3.7. Salvando resultados...")
-    save_outputs(out_dir, tour_vertices, euler_edges, total_cost, MG_counts, matching_pairs, paths_between)
+    save_outputs(out_dir, G, sol["tour_vertices"], sol["euler_edges"], sol["total_cost"],
+                 sol["matching_pairs"], sol["paths_between"], formatos)
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(os.path.join(out_dir, ARQUIVO_COMPONENTES))
 
 # ---------------------------------
 # 4. SALVAR SAÍDAS
 # ---------------------------------
 
-# Variável global para 'save_outputs' acessar os pesos do grafo lido no 'main'
-GLOBAL_G = {}
-
-def save_outputs(out_dir: str, tour_vertices, euler_edges, total_cost, MG_counts, matching_pairs, paths_between):
+def save_outputs(out_dir: str, G: Dict[int, Dict[int, float]], tour_vertices, euler_edges, total_cost,
+                 matching_pairs, paths_between, formatos=FORMATOS_PADRAO, pesos=None, servico=None):
     """
-    Função de utilidade para gravar os 4 arquivos de saída na pasta 'out_dir'.
+    Grava as saídas do tour na pasta 'out_dir' (colunar, ver saida_tour.py).
+    'pesos'/'servico' (opcionais) dão o custo e o tipo de cada travessia.
     """
-    # Garante que o diretório de saída exista
-    os.makedirs(out_dir, exist_ok=True)
-    
-    # Define os caminhos completos
-    path_tour = os.path.join(out_dir, "tour.csv")
-    path_cost = os.path.join(out_dir, "tour_cost.txt")
-    path_detailed = os.path.join(out_dir, "tour_detalhado.csv")
-    path_matching = os.path.join(out_dir, "matching_paths.csv")
-
-    if tour_vertices:
-        with open(path_tour, "w", newline="", encoding="utf-8") as f:
-            wr = csv.writer(f)
-            wr.writerow(["order","vertex"])
-            for i,v in enumerate(tour_vertices):
-                wr.writerow([i, v])
+    gravados = salvar_tour(out_dir, G, tour_vertices, euler_edges, total_cost,
+                           matching_pairs, paths_between, formatos, pesos, servico)
 
-    with open(path_cost, "w", encoding="utf-8") as f:
-        f.write(str(total_cost))
-
-    if euler_edges:
-        cum = 0.0
-        with open(path_detailed, "w", newline="", encoding="utf-8") as f:
-            wr = csv.writer(f)
-            wr.writerow(["order","u","v","weight","cumulative_cost"])
-            for i,(u,v) in enumerate(euler_edges):
-                w = 1.0
-                try:
-                    # Usa GLOBAL_G para pegar o peso original da aresta
-                    w = GLOBAL_G[u][v]
-                except Exception:
-                    # Fallback caso a aresta (u,v) não exista (improvável)
-                    try:
-                        w = GLOBAL_G[v][u]
-                    except Exception:
-                        pass # Mantém w=1.0
-                cum += w
-                wr.writerow([i, u, v, w, cum])
-
-    if matching_pairs:
-        with open(path_matching, "w", newline="", encoding="utf-8") as f:
-            wr = csv.writer(f)
-            wr.writerow(["u","v","path_vertices","path_edges"])
-            for pair in (matching_pairs if isinstance(matching_pairs, list) else list(matching_pairs)):
-                u, v = pair[0], pair[1]
-                p = paths_between.get((u,v)) or []
-                edges = ";".join(f"{a}-{b}" for a,b in zip(p[:-1], p[1:]))
-                wr.writerow([u, v, json.dumps(p, ensure_ascii=False), edges])
-
-    print(f"Resultados salvos em: {out_dir}")
+    print(f"Resultados salvos em: {out_dir} ({', '.join(gravados)})")
     print(f"Custo total final: {total_cost}")
 
 # ---------------------------------
 # 5. EXECUÇÃO
 # ---------------------------------
+def _tem_scipy() -> bool:
+    try:
+        from scipy.sparse import csgraph
+        return csgraph is not None
+    except ImportError:
+        return False
+
 def main():
     if len(sys.argv) < 2:
         print("Erro: Forneça o caminho para a matriz de adjacência.")
         print("Uso: python resolver_cpp.py dados_processados/matriz_adjacencia.csv")
+        print("  ou: python resolver_cpp.py dados_processados/snapshot_grafo")
+        print("  ou: python resolver_cpp.py --arestas dados_processados/arestas_calc_com_casas.csv (ruas de mão única)")
+        print("  ou: python resolver_cpp.py --arestas dados_processados/arestas_calc_com_casas.csv --rural")
         sys.exit(1)
     
-    path = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Solução do Problema do Carteiro Chinês")
+    parser.add_argument("path", nargs="?", help="Matriz de adjacência CSV ou diretório do snapshot")
+    parser.add_argument("--arestas", metavar="CSV",
+                        help="CPP misto: lê as arestas (com a coluna opcional 'mao_unica') em vez da matriz")
+    parser.add_argument("--rural", action="store_true",
+                        help="Com --arestas: atende só as ruas com casas e usa as demais para deslocamento")
+    parser.add_argument("--cache-distancias", default=os.path.join("dados_processados", "cache_distancias"),
+                        help="Diretório do cache persistente de distâncias")
+    parser.add_argument("--cache-limite-mb", type=float, default=512.0,
+                        help="Orçamento de disco do cache de distâncias (MB)")
+    parser.add_argument("--sem-cache", action="store_true", help="Não usa o cache de distâncias")
+    parser.add_argument("--ch", nargs="?", const="", default=None, metavar="ARQUIVO",
+                        help="Usa hierarquia de contração (construída uma vez e salva em ARQUIVO; "
+                             "padrão: ch.pkl no snapshot ou <matriz>.ch.pkl; "
+                             "ch_reduzido.pkl com a contração de cadeias ativa)")
+    parser.add_argument("--emparelhamento", choices=["denso", "esparso"], default="denso",
+                        help="denso: matriz m×m completa; esparso: grafo de k vizinhos candidatos")
+    parser.add_argument("--vizinhos-k", type=int, default=10,
+                        help="Candidatos por nó ímpar no emparelhamento esparso")
+    parser.add_argument("--limite-exato", type=int, default=LIMITE_EXATO,
+                        help="Maior número de nós ímpares resolvido pelo DP exato")
+    parser.add_argument("--orcamento-tempo", "--time-budget", dest="orcamento_tempo", type=float, default=None,
+                        metavar="SEGUNDOS",
+                        help="Tempo da heurística de emparelhamento acima do limite exato; devolve a melhor "
+                             "solução achada no prazo (padrão: para no primeiro ótimo local)")
+    parser.add_argument("--formatos", type=parse_formatos, default=FORMATOS_PADRAO,
+                        help="Formatos das saídas, separados por vírgula: npz, parquet, csv (padrão: npz)")
+    parser.add_argument("--inicio", type=int, default=None, metavar="VERTICE",
+                        help="Vértice onde o circuito começa e termina (base do agente)")
+    parser.add_argument("--saida", default=os.path.join("resultados_finais", "relatorio_tour"), metavar="PASTA",
+                        help="Pasta das saídas do tour (uma por execução, para rodar planos em paralelo)")
+    parser.add_argument("--sem-contracao", action="store_true",
+                        help="Não contrai as cadeias de vértices de grau 2 antes de resolver")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="Processos para resolver as componentes de um grafo desconexo (padrão: CPUs)")
+    args = parser.parse_args()
+    if args.path is None and args.arestas is None:
+        parser.error("informe a matriz/snapshot ou --arestas")
+    if args.rural and not args.arestas:
+        parser.error("--rural requer --arestas (o número de casas não está na matriz)")
+    
+    path = args.path
     
     # Define o diretório de saída
-    OUT_DIR = r"resultados_finais/relatorio_tour" 
+    OUT_DIR = args.saida
+    
+    if args.arestas and args.rural:
+        from carteiro_rural import ler_ruas, resolver_carteiro_rural
+        print("1. Lendo as arestas (ruas com e sem casas)...")
+        ruas = ler_ruas(args.arestas)
+        print("\n2. Iniciando a solução do carteiro rural...")
+        sol = resolver_carteiro_rural(ruas, args.emparelhamento, args.vizinhos_k, args.limite_exato,
+                                      args.inicio, orcamento_s=args.orcamento_tempo)
+        print("3.7. Salvando resultados...")
+        save_outputs(OUT_DIR, sol["grafo"], sol["tour_vertices"], sol["euler_edges"], sol["total_cost"],
+                     sol["matching_pairs"], sol["paths_between"], args.formatos, sol["pesos"], sol["servico"])
+        print("\n[OK] Processo concluido com sucesso.")
+        return
+    
+    if args.arestas:
+        from cpp_direcionado import ler_arestas, resolver_cpp_direcionado
+        print("1. Lendo as arestas (com sentido das ruas)...")
+        arcos = ler_arestas(args.arestas)
+        print("\n2. Iniciando a solução do CPP misto...")
+        try:
+            sol = resolver_cpp_direcionado(arcos, inicio=args.inicio, emparelhamento=args.emparelhamento,
+                                           k_vizinhos=args.vizinhos_k, limite_exato=args.limite_exato,
+                                           orcamento_s=args.orcamento_tempo)
+        except ValueError as e:
+            print(f"Erro: {e}")
+            sys.exit(1)
+        print("3.7. Salvando resultados...")
+        save_outputs(OUT_DIR, sol["grafo"], sol["tour_vertices"], sol["euler_edges"], sol["total_cost"],
+                     sol["matching_pairs"], sol["paths_between"], args.formatos)
+        print("\n[OK] Processo concluido com sucesso.")
+        return
     
-    # Lê o grafo UMA VEZ e o armazena na variável global
-    # para que 'save_outputs' possa consultar os pesos
+    # Lê o grafo UMA VEZ ('save_outputs' recebe G para os pesos das arestas)
     print("1. Lendo o grafo...")
-    G, nodes = read_adjacency_csv(path)
-    global GLOBAL_G
-    GLOBAL_G = G
+    G, nodes = read_graph(path)
+    
+    contracao = None
+    if not args.sem_contracao and G:
+        from contracao_cadeias import ContracaoCadeias
+        contracao = ContracaoCadeias(G, manter=[args.inicio])
+        print(f"   -> Cadeias de grau 2 contraidas: {len(G)} -> {len(contracao.reduzido)} nos "
+              f"({len(contracao.expansao) // 2} super-arestas).")
+        G = contracao.reduzido
+    
+    ch = None
+    if args.ch is not None and G:
+        from hierarquia_contracao import HierarquiaContracao
+        # O CH do grafo reduzido não serve ao grafo completo (route2 --ch): arquivo próprio
+        nome_ch = "ch_reduzido" if contracao is not None else "ch"
+        arquivo_ch = args.ch or (os.path.join(path, nome_ch + ".pkl") if os.path.isdir(path)
+                                 else os.path.splitext(path)[0] + f".{nome_ch}.pkl")
+        ch = HierarquiaContracao.carregar_ou_construir(G, arquivo_ch)
+    
+    cache = None
+    tabelas = None
+    if ch is None and args.emparelhamento == "denso" and G and os.path.isdir(path) and _tem_scipy():
+        # Snapshot: Dijkstra dos ímpares direto nos arrays CSR (memory-map), em C
+        from busca_caminhos import TabelasCSR
+        from snapshot_grafo import carregar_snapshot
+        tabelas = TabelasCSR(carregar_snapshot(path), vertices=set(G))
+        print("   -> Distancias dos nos impares calculadas sobre o CSR do snapshot.")
+    elif ch is None and args.emparelhamento == "denso" and not args.sem_cache and G:
+        from cache_distancias import CacheDistancias
+        cache = tabelas = CacheDistancias(G, args.cache_distancias, int(args.cache_limite_mb * 1024 * 1024))
     
     print("\n2. Iniciando a solução do CPP...")
     # Passa G, nodes e OUT_DIR para a função principal
-    solve_cpp_puro(G, nodes, OUT_DIR)
+    solve_cpp_puro(G, nodes, OUT_DIR, tabelas, ch, args.emparelhamento, args.vizinhos_k, args.limite_exato,
+                   args.formatos, args.inicio, args.processos, contracao, args.orcamento_tempo)
+    
+    if cache is not None:
+        removidos = cache.despejados + cache.despejar()
+        print(f"Cache de distancias: {cache.acertos} reaproveitadas, {cache.faltas} calculadas, {removidos} despejadas.")
     
     print("\n[OK] Processo concluido com sucesso.")
 
@@ -0,0 +1,284 @@
+"""
+SAÍDAS DO TOUR EM FORMATO COLUNAR (NPZ / PARQUET) E EXPORTAÇÃO CSV
+
+Gravação e leitura das saídas do resolver_cpp.py a partir de arrays, em
+lote, em vez de uma chamada de csv.writer por linha:
+
+- npz (padrão): um único 'tour.npz' com as colunas
+    vertex                        sequência de vértices do tour
+    u, v, weight, cumulative_cost arestas do circuito (tour detalhado)
+    servico                       (opcional) 1 = atendimento, 0 = deslocamento
+    matching_u, matching_v        pares do emparelhamento
+    matching_offsets,             caminhos dos pares em formato CSR:
+    matching_vertices             vertices[offsets[i]:offsets[i+1]]
+- parquet (requer pyarrow): tour.parquet, tour_detalhado.parquet e
+  matching_paths.parquet (caminho como lista de inteiros);
+- csv (opcional): os mesmos tour.csv / tour_detalhado.csv /
+  matching_paths.csv de antes, para inspeção manual.
+
+'tour_cost.txt' é sempre gravado. Os leitores (ler_tour,
+ler_tour_detalhado, ler_matching) aceitam qualquer um dos formatos, com
+preferência npz > parquet > csv, e são usados por route2.py, main.py e
+pelos scripts de visualização. Por isso salvar_tour apaga da pasta os
+arquivos de tour que não foram regravados (ex.: um tour.npz antigo ao
+salvar só em csv), para que nenhum leitor pegue um tour desatualizado.
+
+Cada arquivo é gravado em um temporário na mesma pasta e renomeado no fim
+(gravacao_atomica), para que um leitor concorrente nunca veja um tour pela metade.
+"""
+
+import contextlib
+import json
+import os
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+FORMATOS = ("npz", "parquet", "csv")
+FORMATOS_PADRAO = ("npz",)
+
+ARQUIVO_NPZ = "tour.npz"
+ARQUIVO_CUSTO = "tour_cost.txt"
+ARQUIVOS_PARQUET = ("tour.parquet", "tour_detalhado.parquet", "matching_paths.parquet")
+ARQUIVOS_CSV = ("tour.csv", "tour_detalhado.csv", "matching_paths.csv")
+
+# Todos os arquivos que podem compor a saída de um tour
+ARQUIVOS_TOUR = (ARQUIVO_NPZ, ARQUIVO_CUSTO) + ARQUIVOS_PARQUET + ARQUIVOS_CSV
+
+# Resumo do grafo desconexo (um tour por componente, em componente_K/)
+ARQUIVO_COMPONENTES = "componentes.csv"
+
+def parse_formatos(texto: str) -> Tuple[str, ...]:
+    """Converte 'npz,csv' em ('npz', 'csv'), validando os nomes."""
+    formatos = tuple(f.strip().lower() for f in texto.split(",") if f.strip())
+    invalidos = [f for f in formatos if f not in FORMATOS]
+    if invalidos or not formatos:
+        raise ValueError(f"Formato(s) inválido(s): {texto!r}. Use: {', '.join(FORMATOS)}")
+    return formatos
+
+@contextlib.contextmanager
+def gravacao_atomica(caminho: str):
+    """
+    Fornece um caminho temporário na mesma pasta de 'caminho'; se o bloco
+    terminar sem erro, o temporário substitui 'caminho' com os.replace
+    (atômico), senão é apagado.
+    """
+    pasta, nome = os.path.split(os.path.abspath(caminho))
+    raiz, ext = os.path.splitext(nome)
+    # pid + thread: execuções paralelas e threads do mesmo processo não dividem o temporário
+    tmp = os.path.join(pasta, f".{raiz}.{os.getpid()}.{threading.get_ident()}.tmp{ext}")
+    try:
+        yield tmp
+        os.replace(tmp, caminho)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        return None
+
+# =====================================
+# GRAVAÇÃO
+# =====================================
+
+def montar_colunas(G: Dict[int, Dict[int, float]], tour_vertices: Sequence[int],
+                   euler_edges: Sequence[Tuple[int, int]], matching_pairs, paths_between,
+                   pesos=None, servico=None) -> Dict[str, np.ndarray]:
+    """
+    Monta as colunas do tour como arrays NumPy. 'pesos' (opcional) substitui
+    G[u][v] aresta a aresta, e 'servico' marca as travessias de atendimento
+    (modo carteiro rural, onde a mesma rua custa menos quando só é percorrida).
+    """
+    n = len(euler_edges)
+    arestas = np.array(euler_edges, dtype=np.int64).reshape(n, 2)
+    if pesos is not None:
+        pesos = np.asarray(pesos, dtype=np.float64)
+    else:
+        # Toda aresta do circuito é uma aresta de G (os caminhos do emparelhamento
+        # são expandidos em arestas originais); 1.0 só cobre entradas inesperadas.
+        pesos = np.fromiter((G.get(u, {}).get(v, 1.0) for u, v in euler_edges), dtype=np.float64, count=n)
+
+    pares = list(matching_pairs or [])
+    caminhos = [paths_between.get((u, v)) or [] for u, v in pares]
+    offsets = np.zeros(len(pares) + 1, dtype=np.int64)
+    np.cumsum([len(p) for p in caminhos], out=offsets[1:])
+    colunas = {
+        "vertex": np.asarray(tour_vertices, dtype=np.int64),
+        "u": arestas[:, 0],
+        "v": arestas[:, 1],
+        "weight": pesos,
+        "cumulative_cost": np.cumsum(pesos),
+        "matching_u": np.array([u for u, _ in pares], dtype=np.int64),
+        "matching_v": np.array([v for _, v in pares], dtype=np.int64),
+        "matching_offsets": offsets,
+        "matching_vertices": np.fromiter((x for p in caminhos for x in p), dtype=np.int64, count=int(offsets[-1])),
+    }
+    if servico is not None:
+        colunas["servico"] = np.asarray(servico, dtype=np.int8)
+    return colunas
+
+def _colunas_detalhadas(col) -> Dict[str, np.ndarray]:
+    tabela = {"order": np.arange(len(col["u"])), "u": col["u"], "v": col["v"],
+              "weight": col["weight"], "cumulative_cost": col["cumulative_cost"]}
+    if "servico" in col:
+        tabela["servico"] = col["servico"]
+    return tabela
+
+def _caminhos_matching(col) -> List[List[int]]:
+    vertices = col["matching_vertices"].tolist()
+    offsets = col["matching_offsets"].tolist()
+    return [vertices[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+
+def _salvar_npz(out_dir: str, col) -> List[str]:
+    with gravacao_atomica(os.path.join(out_dir, ARQUIVO_NPZ)) as tmp:
+        np.savez(tmp, **col)
+    return [ARQUIVO_NPZ]
+
+def _salvar_parquet(out_dir: str, col) -> List[str]:
+    pa = _pyarrow()
+    pq = pa.parquet
+    tabelas = []
+    if len(col["vertex"]):
+        tabelas.append((0, pa.table({"order": np.arange(len(col["vertex"])), "vertex": col["vertex"]})))
+    if len(col["u"]):
+        tabelas.append((1, pa.table(_colunas_detalhadas(col))))
+    if len(col["matching_u"]):
+        caminhos = pa.ListArray.from_arrays(pa.array(col["matching_offsets"], pa.int32()),
+                                            pa.array(col["matching_vertices"]))
+        tabelas.append((2, pa.table({"u": col["matching_u"], "v": col["matching_v"], "path_vertices": caminhos})))
+    for indice, tabela in tabelas:
+        with gravacao_atomica(os.path.join(out_dir, ARQUIVOS_PARQUET[indice])) as tmp:
+            pq.write_table(tabela, tmp)
+    return [ARQUIVOS_PARQUET[indice] for indice, _ in tabelas]
+
+def _salvar_csv(out_dir: str, col) -> List[str]:
+    import pandas as pd
+
+    tabelas = []
+    if len(col["vertex"]):
+        tabelas.append((0, pd.DataFrame({"order": np.arange(len(col["vertex"])), "vertex": col["vertex"]})))
+    if len(col["u"]):
+        tabelas.append((1, pd.DataFrame(_colunas_detalhadas(col))))
+    if len(col["matching_u"]):
+        caminhos = _caminhos_matching(col)
+        tabelas.append((2, pd.DataFrame({
+            "u": col["matching_u"],
+            "v": col["matching_v"],
+            "path_vertices": [json.dumps(p) for p in caminhos],
+            "path_edges": [";".join(f"{a}-{b}" for a, b in zip(p[:-1], p[1:])) for p in caminhos],
+        })))
+    for indice, tabela in tabelas:
+        with gravacao_atomica(os.path.join(out_dir, ARQUIVOS_CSV[indice])) as tmp:
+            tabela.to_csv(tmp, index=False)
+    return [ARQUIVOS_CSV[indice] for indice, _ in tabelas]
+
+def salvar_tour(out_dir: str, G: Dict[int, Dict[int, float]], tour_vertices, euler_edges, total_cost,
+                matching_pairs, paths_between, formatos: Sequence[str] = FORMATOS_PADRAO,
+                pesos=None, servico=None) -> List[str]:
+    """
+    Grava o tour em 'out_dir' nos formatos pedidos (ver FORMATOS).
+    Parquet sem pyarrow instalado cai para npz. Retorna os formatos gravados.
+    'pesos' e 'servico' seguem montar_colunas. Os demais arquivos de tour da
+    pasta (de outros formatos ou de execuções anteriores) são apagados.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    formatos = list(dict.fromkeys(formatos))
+    if "parquet" in formatos and _pyarrow() is None:
+        print("Aviso: pyarrow não instalado; gravando npz no lugar de parquet.")
+        formatos = [f for f in formatos if f != "parquet"]
+        if "npz" not in formatos:
+            formatos.append("npz")
+
+    col = montar_colunas(G, tour_vertices, euler_edges, matching_pairs, paths_between, pesos, servico)
+    gravadores = {"npz": _salvar_npz, "parquet": _salvar_parquet, "csv": _salvar_csv}
+    gravados = {ARQUIVO_CUSTO}
+    for formato in formatos:
+        gravados.update(gravadores[formato](out_dir, col))
+
+    with gravacao_atomica(os.path.join(out_dir, ARQUIVO_CUSTO)) as tmp:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(str(total_cost))
+
+    for nome in set(ARQUIVOS_TOUR) - gravados:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(out_dir, nome))
+    return formatos
+
+# =====================================
+# LEITURA
+# =====================================
+
+def _origem(dir_tour: str, indice: int):
+    """Escolhe o arquivo a ler: ('npz'|'parquet'|'csv', caminho) ou (None, None)."""
+    npz = os.path.join(dir_tour, ARQUIVO_NPZ)
+    if os.path.exists(npz):
+        return "npz", npz
+    parquet = os.path.join(dir_tour, ARQUIVOS_PARQUET[indice])
+    if os.path.exists(parquet) and _pyarrow() is not None:
+        return "parquet", parquet
+    csv = os.path.join(dir_tour, ARQUIVOS_CSV[indice])
+    if os.path.exists(csv):
+        return "csv", csv
+    return None, None
+
+def existe_tour(dir_tour: str) -> bool:
+    return _origem(dir_tour, 0)[0] is not None
+
+def ler_colunas(dir_tour: str) -> Dict[str, np.ndarray]:
+    """Carrega o tour.npz inteiro como {coluna: array}."""
+    with np.load(os.path.join(dir_tour, ARQUIVO_NPZ)) as dados:
+        return {k: dados[k] for k in dados.files}
+
+def _ler_tabela(dir_tour: str, indice: int, colunas: Sequence[str]):
+    import pandas as pd
+
+    formato, caminho = _origem(dir_tour, indice)
+    if formato is None:
+        raise FileNotFoundError(f"Nenhuma saída de tour encontrada em {dir_tour}")
+    if formato == "npz":
+        with np.load(caminho) as dados:
+            campos = [c for c in colunas if c != "order"]
+            n = len(dados[campos[0]])
+            return pd.DataFrame({"order": np.arange(n), **{c: dados[c] for c in campos}})
+    if formato == "parquet":
+        return _pyarrow().parquet.read_table(caminho, columns=list(colunas)).to_pandas()
+    df = pd.read_csv(caminho)
+    df.columns = df.columns.str.strip()
+    return df[list(colunas)]
+
+def ler_tour(dir_tour: str):
+    """DataFrame (order, vertex) com a sequência de vértices do tour."""
+    return _ler_tabela(dir_tour, 0, ("order", "vertex"))
+
+def ler_tour_detalhado(caminho: str):
+    """
+    DataFrame (order, u, v, weight, cumulative_cost) com as arestas do tour.
+    'caminho' pode ser a pasta do tour ou um tour_detalhado.csv antigo.
+    """
+    if os.path.isfile(caminho):
+        import pandas as pd
+        df = pd.read_csv(caminho)
+        df.columns = df.columns.str.strip()
+        return df
+    return _ler_tabela(caminho, 1, ("order", "u", "v", "weight", "cumulative_cost"))
+
+def ler_matching(dir_tour: str) -> List[Tuple[int, int, List[int]]]:
+    """Lista de (u, v, caminho) do emparelhamento."""
+    formato, caminho = _origem(dir_tour, 2)
+    if formato == "npz":
+        col = ler_colunas(dir_tour)
+        return list(zip(col["matching_u"].tolist(), col["matching_v"].tolist(), _caminhos_matching(col)))
+    if formato == "parquet":
+        t = _pyarrow().parquet.read_table(caminho).to_pydict()
+        return list(zip(t["u"], t["v"], t["path_vertices"]))
+    if formato == "csv":
+        import pandas as pd
+        df = pd.read_csv(caminho)
+        return [(int(u), int(v), json.loads(p)) for u, v, p in zip(df["u"], df["v"], df["path_vertices"])]
+    return []
@@ -0,0 +1,141 @@
+"""
+BENCHMARK: DIJKSTRA vs A* (HAVERSINE) vs ALT (LANDMARKS)
+
+Compara, para consultas ponto-a-ponto aleatórias, o número de nós
+assentados e o tempo de cada variante da busca do módulo busca_caminhos,
+conferindo que todas devolvem o mesmo custo.
+
+Grafos usados:
+- o grafo real (snapshot em dados_processados/), se existir;
+- malhas sintéticas "tipo cidade" de tamanho crescente, com coordenadas
+  lat/lon reais e pesos no mesmo modelo do projeto (distância/VELOCIDADE
+  + casas * TEMPO_POR_CASA).
+
+Uso:
+    python codigo_fonte/benchmarks/benchmark_caminhos.py [--consultas 200] [--landmarks 8]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.join(ROOT, "codigo_fonte", "algoritmo_cpp"))
+sys.path.insert(0, os.path.join(ROOT, "codigo_fonte", "setup_grafo"))
+
+from busca_caminhos import BuscaDirecionada, VELOCIDADE, haversine_m
+
+TEMPO_POR_CASA = 20
+LAT0, LON0 = -21.6097, -45.5672  # Elói Mendes/MG
+ESPACAMENTO_M = 80.0
+
+def gerar_malha(lado: int, semente: int = 0):
+    """Malha lado×lado com ~10% das ruas removidas e casas aleatórias por rua."""
+    rnd = random.Random(semente)
+    dlat = ESPACAMENTO_M / 111_320.0
+    coords = {}
+    for i in range(lado):
+        for j in range(lado):
+            # Pequena perturbação para não ser uma grade perfeita
+            coords[i * lado + j] = (LAT0 + (i + rnd.uniform(-0.2, 0.2)) * dlat,
+                                    LON0 + (j + rnd.uniform(-0.2, 0.2)) * dlat)
+    G = {u: {} for u in coords}
+    for i in range(lado):
+        for j in range(lado):
+            u = i * lado + j
+            for v in ((u + 1) if j + 1 < lado else None, (u + lado) if i + 1 < lado else None):
+                if v is None or rnd.random() < 0.1:
+                    continue
+                dist = haversine_m(*coords[u], *coords[v]) * rnd.uniform(1.0, 1.3)
+                w = dist / VELOCIDADE + rnd.randint(0, 15) * TEMPO_POR_CASA
+                G[u][v] = w
+                G[v][u] = w
+    return G, coords
+
+def carregar_grafo_real():
+    from snapshot_grafo import carregar_snapshot, eh_snapshot, snapshot_para_dict
+    snap_dir = os.path.join(ROOT, "dados_processados", "snapshot_grafo")
+    if not eh_snapshot(snap_dir):
+        return None
+    snap = carregar_snapshot(snap_dir)
+    G, ids = snapshot_para_dict(snap)
+    coords = {u: (float(la), float(lo)) for u, (la, lo) in zip(ids, snap.coords.tolist())}
+    return G, coords
+
+def maior_componente(G):
+    vistos, melhor = set(), []
+    for s in G:
+        if s in vistos or not G[s]:
+            continue
+        comp, pilha = [], [s]
+        vistos.add(s)
+        while pilha:
+            x = pilha.pop()
+            comp.append(x)
+            for y in G[x]:
+                if y not in vistos:
+                    vistos.add(y)
+                    pilha.append(y)
+        if len(comp) > len(melhor):
+            melhor = comp
+    return melhor
+
+def medir(nome_grafo, G, coords, n_consultas, n_landmarks, semente=1):
+    nos = maior_componente(G)
+    rnd = random.Random(semente)
+    consultas = [(rnd.choice(nos), rnd.choice(nos)) for _ in range(n_consultas)]
+
+    t0 = time.perf_counter()
+    alt = BuscaDirecionada(G, None, n_landmarks, velocidade=None)
+    t_pre = time.perf_counter() - t0
+
+    variantes = [
+        ("Dijkstra", BuscaDirecionada(G, None, 0, velocidade=None)),
+        ("A* haversine", BuscaDirecionada(G, coords, 0)),
+        (f"ALT ({n_landmarks} marcos)", alt),
+        ("A* + ALT", BuscaDirecionada(G, coords, n_landmarks)),
+    ]
+
+    print(f"\n=== {nome_grafo}: {len(G)} nós, {sum(len(v) for v in G.values()) // 2} arestas, "
+          f"{n_consultas} consultas (pré-processamento ALT: {t_pre * 1000:.1f} ms) ===")
+    print(f"{'variante':<22}{'assentados/consulta':>22}{'reducao':>10}{'tempo/consulta':>18}")
+
+    referencia = None
+    base_assentados = None
+    for nome, busca in variantes:
+        total_assentados = 0
+        custos = []
+        t0 = time.perf_counter()
+        for s, t in consultas:
+            _, custo, assentados = busca.caminho(s, t)
+            total_assentados += assentados
+            custos.append(custo)
+        dt = (time.perf_counter() - t0) / n_consultas
+        if referencia is None:
+            referencia = custos
+            base_assentados = total_assentados
+        else:
+            erro = max(abs(a - b) for a, b in zip(custos, referencia))
+            assert erro < 1e-6, f"{nome}: custo divergente de Dijkstra ({erro})"
+        reducao = 100.0 * (1 - total_assentados / base_assentados) if base_assentados else 0.0
+        print(f"{nome:<22}{total_assentados / n_consultas:>22.1f}{reducao:>9.1f}%{dt * 1000:>15.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de buscas ponto-a-ponto")
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--landmarks", type=int, default=8)
+    parser.add_argument("--lados", default="30,60,120", help="Lados das malhas sintéticas")
+    args = parser.parse_args()
+
+    real = carregar_grafo_real()
+    if real is not None:
+        medir("Grafo real", real[0], real[1], args.consultas, args.landmarks)
+
+    for lado in (int(x) for x in args.lados.split(",")):
+        G, coords = gerar_malha(lado)
+        medir(f"Malha {lado}x{lado}", G, coords, args.consultas, args.landmarks)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+BENCHMARK: ALCANCE DO EMPARELHAMENTO EXATO (DP EM BITMASK)
+
+Mede tempo e pico de memória do DP exato de resolver_cpp
+(emparelhamento_exato_dp) para m = 2, 4, 6, ... nós ímpares, sobre
+instâncias aleatórias com distâncias euclidianas, e para quando o
+orçamento de tempo ou de memória é estourado. Para m pequeno o custo é
+conferido contra o Blossom do networkx.
+
+Ao final indica o maior m que coube no orçamento, que pode ser usado como
+'--limite-exato' do resolver_cpp.py.
+
+Uso:
+    python codigo_fonte/benchmarks/benchmark_emparelhamento_exato.py [--tempo 5] [--memoria-mb 1024]
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy  # noqa: F401  (importado antes para não contar no tempo de m=2)
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.join(ROOT, "codigo_fonte", "algoritmo_cpp"))
+
+from resolver_cpp import emparelhamento_exato_dp
+
+# Acima disso a conferência com o networkx deixa de valer o tempo gasto
+M_CONFERENCIA = 16
+
+def gerar_instancia(m: int, semente: int):
+    rnd = random.Random(semente)
+    pts = [(rnd.random() * 1000, rnd.random() * 1000) for _ in range(m)]
+    return [[math.dist(a, b) for b in pts] for a in pts]
+
+def custo_networkx(C) -> float:
+    import networkx as nx
+    H = nx.Graph()
+    m = len(C)
+    for i in range(m):
+        for j in range(i + 1, m):
+            H.add_edge(i, j, weight=C[i][j])
+    return sum(C[i][j] for i, j in nx.min_weight_matching(H, weight="weight"))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do emparelhamento exato por DP")
+    parser.add_argument("--tempo", type=float, default=5.0, help="Orçamento de tempo por instância (s)")
+    parser.add_argument("--memoria-mb", type=float, default=1024.0, help="Orçamento de memória (MB)")
+    parser.add_argument("--m-max", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"Orçamento: {args.tempo:.1f} s, {args.memoria_mb:.0f} MB")
+    print(f"{'m':>4}{'tempo (s)':>12}{'pico (MB)':>12}{'custo':>14}  conferência")
+
+    melhor_m = 0
+    for m in range(2, args.m_max + 1, 2):
+        # Estimativa grosseira antes de alocar: dp float64 + escolha int8 + popcount uint8
+        estimado_mb = (1 << m) * 10 / 2**20
+        if estimado_mb > args.memoria_mb:
+            print(f"{m:>4}  memória estimada ({estimado_mb:.0f} MB) acima do orçamento")
+            break
+
+        C = gerar_instancia(m, semente=m)
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        pares = emparelhamento_exato_dp(C)
+        dt = time.perf_counter() - t0
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        custo = sum(C[i][j] for i, j in pares)
+        conferencia = "-"
+        if m <= M_CONFERENCIA:
+            ref = custo_networkx(C)
+            assert abs(custo - ref) < 1e-6, f"m={m}: DP {custo} != Blossom {ref}"
+            conferencia = "ok"
+        pico_mb = pico / 2**20
+        print(f"{m:>4}{dt:>12.3f}{pico_mb:>12.1f}{custo:>14.2f}  {conferencia}")
+
+        if dt > args.tempo or pico_mb > args.memoria_mb:
+            print(f"{m:>4}  fora do orçamento")
+            break
+        melhor_m = m
+
+    print(f"\nMaior m dentro do orçamento: {melhor_m} (use --limite-exato {melhor_m})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+BENCHMARK: RESOLVER_CPP vs REFERÊNCIA NETWORKX
+
+Resolve o CPP das mesmas malhas sintéticas com o motor do projeto
+(resolver_cpp_memoria, o núcleo do solve_cpp_puro sem a gravação dos
+arquivos) e com uma referência montada só com networkx:
+    nós ímpares -> Dijkstra (networkx) -> min_weight_matching exato (Blossom)
+    -> multigrafo aumentado -> eulerian_circuit.
+
+Para cada classe de tamanho mostra tempo, pico de memória (tracemalloc, em
+uma segunda execução para não distorcer o tempo) e a diferença de custo em
+relação à referência, que é ótima. Acima de LIMITE_EXATO nós ímpares o
+emparelhamento denso do projeto é heurístico; a diferença mostra quanto
+ele perde. O circuito do projeto também é conferido (fechado, contíguo e
+cobrindo todas as arestas).
+
+Uso:
+    python codigo_fonte/benchmarks/benchmark_referencia_networkx.py [--lados 6,10,16,24] [--emparelhamentos denso,esparso]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.join(ROOT, "codigo_fonte", "algoritmo_cpp"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import networkx as nx
+
+from benchmark_caminhos import gerar_malha, maior_componente
+from resolver_cpp import LIMITE_EXATO, resolver_cpp_memoria
+
+# Acima disso o Blossom do networkx (O(m^3) em Python) fica lento demais
+M_MAX_REFERENCIA = 600
+
+def componente_principal(G):
+    """Subgrafo da maior componente (o resolver exige grafo conexo)."""
+    nos = set(maior_componente(G))
+    return {u: {v: w for v, w in G[u].items() if v in nos} for u in sorted(nos)}
+
+def cpp_networkx(G):
+    """CPP de referência: devolve (custo, lista de arestas do circuito)."""
+    H = nx.Graph()
+    for u in G:
+        for v, w in G[u].items():
+            if u < v:
+                H.add_edge(u, v, weight=w)
+    impares = [u for u, d in H.degree() if d % 2 == 1]
+
+    dist, caminhos = {}, {}
+    for u in impares:
+        dist[u], caminhos[u] = nx.single_source_dijkstra(H, u, weight="weight")
+    K = nx.Graph()
+    for i, u in enumerate(impares):
+        for v in impares[i + 1:]:
+            K.add_edge(u, v, weight=dist[u][v])
+    pares = nx.min_weight_matching(K, weight="weight")
+
+    M = nx.MultiGraph(H)
+    for u, v in pares:
+        p = caminhos[u][v]
+        for a, b in zip(p, p[1:]):
+            M.add_edge(a, b, weight=H[a][b]["weight"])
+    circuito = list(nx.eulerian_circuit(M))
+    custo = sum(H[a][b]["weight"] for a, b in circuito)
+    return custo, circuito, len(impares)
+
+def cpp_projeto(G, emparelhamento):
+    with contextlib.redirect_stdout(io.StringIO()):
+        sol = resolver_cpp_memoria(G, emparelhamento=emparelhamento)
+    return sol["total_cost"], sol["euler_edges"], len(sol["odd_nodes"])
+
+def conferir_circuito(G, arestas):
+    """Circuito fechado, contíguo e passando por todas as arestas de G."""
+    assert arestas and arestas[0][0] == arestas[-1][1], "circuito não fecha"
+    for (_, v), (u, _) in zip(arestas, arestas[1:]):
+        assert v == u, "circuito não é contíguo"
+    cobertas = {(min(u, v), max(u, v)) for u, v in arestas}
+    todas = {(u, v) for u in G for v in G[u] if u < v}
+    assert todas <= cobertas, f"{len(todas - cobertas)} aresta(s) fora do circuito"
+    for u, v in arestas:
+        assert v in G[u], f"({u}, {v}) não é aresta do grafo"
+
+def medir(funcao, *args):
+    """(resultado, tempo em s, pico de memória em MB); o pico vem de uma segunda execução."""
+    t0 = time.perf_counter()
+    resultado = funcao(*args)
+    dt = time.perf_counter() - t0
+    tracemalloc.start()
+    funcao(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, dt, pico / 2**20
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara o resolver_cpp com uma referência em networkx")
+    parser.add_argument("--lados", default="6,10,16,24", help="Lados das malhas sintéticas (classes de tamanho)")
+    parser.add_argument("--emparelhamentos", default="denso,esparso", help="Modos do resolver_cpp a medir")
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+    modos = [m.strip() for m in args.emparelhamentos.split(",") if m.strip()]
+
+    print(f"LIMITE_EXATO do resolver_cpp: {LIMITE_EXATO} nos impares (acima disso o modo denso e heuristico)")
+    print(f"{'malha':>8}{'nos':>7}{'arestas':>9}{'impares':>9}  {'motor':<22}"
+          f"{'tempo (s)':>11}{'pico (MB)':>11}{'custo':>14}{'gap':>9}")
+    print("-" * 100)
+
+    for lado in (int(x) for x in args.lados.split(",")):
+        G, _ = gerar_malha(lado, args.semente)
+        G = componente_principal(G)
+        n_arestas = sum(len(v) for v in G.values()) // 2
+        prefixo = f"{f'{lado}x{lado}':>8}{len(G):>7}{n_arestas:>9}"
+
+        linhas = []
+        for modo in modos:
+            (custo, arestas, m), dt, pico = medir(cpp_projeto, G, modo)
+            conferir_circuito(G, arestas)
+            linhas.append((f"resolver_cpp/{modo}", dt, pico, custo))
+
+        referencia = None
+        if m <= M_MAX_REFERENCIA:
+            (referencia, circuito, m_ref), dt, pico = medir(cpp_networkx, G)
+            assert m_ref == m
+            conferir_circuito(G, circuito)
+            linhas.insert(0, ("networkx (exato)", dt, pico, referencia))
+
+        for nome, dt, pico, custo in linhas:
+            gap = f"{round(100.0 * (custo - referencia) / referencia, 6) + 0.0:>8.3f}%" if referencia else f"{'-':>9}"
+            print(f"{prefixo}{m:>9}  {nome:<22}{dt:>11.3f}{pico:>11.1f}{custo:>14.2f}{gap}")
+            prefixo = " " * 24
+        if referencia is None:
+            print(f"{'':>35}(referencia omitida: mais de {M_MAX_REFERENCIA} nos impares)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+AGENDADOR DE ETAPAS EM GRAFO DE DEPENDÊNCIAS (DAG)
+
+Executa as etapas do pipeline assim que as dependências terminam, com até
+'max_workers' etapas ao mesmo tempo (threads; o trabalho pesado roda em
+subprocessos ou em bibliotecas que liberam o GIL). O tempo total tende ao
+caminho crítico em vez da soma das etapas.
+
+- Etapa comum que falha: as dependentes rodam mesmo assim (como no
+  pipeline sequencial, onde cada passo lida com a ausência dos arquivos).
+- Etapa crítica que falha: nada mais é iniciado e o resultado é marcado
+  como abortado.
+
+Uso (ver main.py):
+    etapas = [Etapa("pesos", f1, critica=True), Etapa("matriz", f2, ["pesos"], critica=True), ...]
+    resultado = executar_etapas(etapas, max_workers=4)
+"""
+
+import contextlib
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Sequence
+
+_LOCK_SAIDA = threading.RLock()
+
+def imprimir(*args, **kwargs):
+    """print protegido por lock, para as mensagens das etapas não se misturarem."""
+    with _LOCK_SAIDA:
+        print(*args, **kwargs, flush=True)
+
+@contextlib.contextmanager
+def saida_exclusiva():
+    """Bloco de vários prints seguidos (ex.: um relatório) sem intercalar outras etapas."""
+    with _LOCK_SAIDA:
+        yield
+
+class Etapa:
+    """Uma etapa do pipeline: 'funcao()' devolve True/None em caso de sucesso e False em falha."""
+
+    def __init__(self, nome: str, funcao: Callable[[], bool], depende: Sequence[str] = (),
+                 critica: bool = False, descricao: str = None):
+        self.nome = nome
+        self.funcao = funcao
+        self.depende = list(depende)
+        self.critica = critica
+        self.descricao = descricao or nome
+
+class ResultadoAgenda:
+    def __init__(self):
+        self.status: Dict[str, str] = {}      # nome -> ok | falha | nao_executada
+        self.duracao: Dict[str, float] = {}
+        self.abortado = False
+        self.tempo_total = 0.0
+        self.caminho_critico: List[str] = []
+        self.tempo_caminho_critico = 0.0
+
+def _validar(etapas: List[Etapa]) -> Dict[str, Etapa]:
+    por_nome = {}
+    for e in etapas:
+        if e.nome in por_nome:
+            raise ValueError(f"Etapa repetida: {e.nome}")
+        por_nome[e.nome] = e
+    for e in etapas:
+        faltando = [d for d in e.depende if d not in por_nome]
+        if faltando:
+            raise ValueError(f"Etapa {e.nome} depende de etapa(s) inexistente(s): {', '.join(faltando)}")
+    # Detecta ciclos (Kahn)
+    grau = {e.nome: len(e.depende) for e in etapas}
+    filhos = {e.nome: [] for e in etapas}
+    for e in etapas:
+        for d in e.depende:
+            filhos[d].append(e.nome)
+    fila = [n for n, g in grau.items() if g == 0]
+    vistos = 0
+    while fila:
+        n = fila.pop()
+        vistos += 1
+        for f in filhos[n]:
+            grau[f] -= 1
+            if grau[f] == 0:
+                fila.append(f)
+    if vistos != len(etapas):
+        raise ValueError("As dependências entre etapas formam um ciclo.")
+    return por_nome
+
+def _caminho_critico(depende: Dict[str, List[str]], duracao: Dict[str, float]):
+    """Maior soma de durações ao longo das dependências (etapas executadas)."""
+    fim, anterior = {}, {}
+
+    def calcular(n):
+        if n in fim:
+            return fim[n]
+        melhor, escolhido = 0.0, None
+        for d in depende[n]:
+            t = calcular(d)
+            if t > melhor:
+                melhor, escolhido = t, d
+        fim[n] = melhor + duracao.get(n, 0.0)
+        anterior[n] = escolhido
+        return fim[n]
+
+    if not depende:
+        return [], 0.0
+    ultimo = max(depende, key=calcular)
+    caminho = []
+    while ultimo is not None:
+        caminho.append(ultimo)
+        ultimo = anterior[ultimo]
+    return caminho[::-1], fim[caminho[0]]
+
+def executar_etapas(etapas: List[Etapa], max_workers: int = 4) -> ResultadoAgenda:
+    """Executa as etapas respeitando as dependências, com no máximo 'max_workers' simultâneas."""
+    por_nome = _validar(etapas)
+    res = ResultadoAgenda()
+    pendentes = {e.nome: set(e.depende) for e in etapas}
+    inicio_total = time.perf_counter()
+
+    def rodar(etapa: Etapa):
+        imprimir(f"\n[ETAPA] {etapa.descricao} - iniciada")
+        t0 = time.perf_counter()
+        try:
+            ok = etapa.funcao() is not False
+        except Exception as e:
+            imprimir(f"  [X] ERRO na etapa {etapa.nome}: {e}")
+            ok = False
+        return ok, time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        em_execucao = {}
+        while pendentes or em_execucao:
+            if not res.abortado:
+                prontas = [n for n, deps in pendentes.items() if not deps]
+                for n in prontas:
+                    del pendentes[n]
+                    em_execucao[pool.submit(rodar, por_nome[n])] = n
+            if not em_execucao:
+                break
+            feitos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+            for futuro in feitos:
+                n = em_execucao.pop(futuro)
+                ok, dt = futuro.result()
+                res.status[n] = "ok" if ok else "falha"
+                res.duracao[n] = dt
+                imprimir(f"[ETAPA] {por_nome[n].descricao} - {'concluida' if ok else 'FALHOU'} ({dt:.2f}s)")
+                if not ok and por_nome[n].critica:
+                    res.abortado = True
+                for deps in pendentes.values():
+                    deps.discard(n)
+
+    for n in pendentes:
+        res.status[n] = "nao_executada"
+    res.tempo_total = time.perf_counter() - inicio_total
+    depende = {n: [d for d in por_nome[n].depende if d in res.duracao] for n in res.duracao}
+    res.caminho_critico, res.tempo_caminho_critico = _caminho_critico(depende, res.duracao)
+    return res
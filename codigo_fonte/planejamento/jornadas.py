@@ -0,0 +1,173 @@
+"""
+JORNADAS DE TRABALHO: DIVISÃO DE CADA TOUR EM DIAS DE ATÉ 8 HORAS
+
+O main.py estimava os dias dividindo o tempo total por HORAS_TRABALHO_DIA,
+sem cortar a rota de fato. Aqui o circuito de cada agente é dividido em
+jornadas consecutivas que saem da base (DEPOT_NODE), executam um trecho do
+tour e voltam à base, cada uma com no máximo HORAS_TRABALHO_DIA horas
+contando a ida e a volta.
+
+Custo da jornada que cobre as arestas i..j do tour:
+    d(base, u_i) + (peso_i + ... + peso_j) + d(v_j, base)
+Como o tour é contíguo (v_i = u_{i+1}) e d() vem do mesmo grafo, esse custo
+só cresce ao estender o trecho; então, para cada j, os inícios viáveis
+formam um intervalo [L(j), j] com L(j) não-decrescente. A programação
+dinâmica "menos jornadas; no empate, menos deslocamento até a base" é
+resolvida em O(m) com uma janela deslizante (deque monotônica), depois de
+um único Dijkstra a partir da base — rápido o bastante para repetir a cada
+número de agentes de uma varredura.
+
+Uso:
+    python codigo_fonte/planejamento/jornadas.py <dir_tour> [--horas 8] [--base 0] [--grafo dados_processados/snapshot_grafo]
+Saída:
+    <dir_tour>/jornadas.csv
+"""
+
+import argparse
+import csv
+import os
+import sys
+from collections import deque
+from itertools import accumulate
+from typing import Dict, List, Sequence, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.join(ROOT, "codigo_fonte", "algoritmo_cpp"))
+
+from busca_caminhos import distancias_de
+from saida_tour import gravacao_atomica, ler_tour_detalhado
+
+# ============= CONFIGURAÇÕES =============
+HORAS_TRABALHO_DIA = 8
+DEPOT_NODE = 0
+ARQUIVO_JORNADAS = "jornadas.csv"
+COLUNAS = ["dia", "primeira_aresta", "ultima_aresta", "inicio", "fim",
+           "ida_s", "servico_s", "volta_s", "total_s", "excede_limite"]
+
+# ============= DIVISÃO =============
+
+def dividir_em_jornadas(arestas: Sequence[Tuple[int, int, float]], dist_base: Dict[int, float],
+                        limite_s: float) -> List[dict]:
+    """
+    Divide o circuito 'arestas' [(u, v, peso), ...] em jornadas base -> trecho -> base
+    de no máximo 'limite_s' segundos, minimizando o número de jornadas e, no
+    empate, o deslocamento total até a base.
+    Uma aresta que sozinha estoura o limite vira uma jornada marcada com 'excede_limite'.
+    """
+    m = len(arestas)
+    if m == 0:
+        return []
+    ida = [dist_base[u] for u, _, _ in arestas]      # base -> início da aresta
+    volta = [dist_base[v] for _, v, _ in arestas]    # fim da aresta -> base
+    S = [0.0] + list(accumulate(w for _, _, w in arestas))
+
+    def custo(i, j):
+        return ida[i] + (S[j + 1] - S[i]) + volta[j]
+
+    INF = (float('inf'), float('inf'))
+    melhor = [INF] * (m + 1)   # melhor[k]: (jornadas, deslocamento) cobrindo as k primeiras arestas
+    melhor[0] = (0, 0.0)
+    inicio_de = [0] * m
+
+    janela = deque()  # inícios candidatos i, com chave(i) crescente
+    def chave(i):
+        dias, desloc = melhor[i]
+        return (dias, desloc + ida[i])
+
+    L = 0
+    for j in range(m):
+        # Entra o início i = j
+        k = chave(j)
+        while janela and chave(janela[-1]) >= k:
+            janela.pop()
+        janela.append(j)
+        # Menor início viável para terminar em j (um trecho de uma aresta é sempre aceito)
+        while L < j and custo(L, j) > limite_s:
+            L += 1
+        while janela[0] < L:
+            janela.popleft()
+        i = janela[0]
+        dias, desloc = chave(i)
+        melhor[j + 1] = (dias + 1, desloc + volta[j])
+        inicio_de[j] = i
+
+    jornadas = []
+    j = m - 1
+    while j >= 0:
+        i = inicio_de[j]
+        jornadas.append((i, j))
+        j = i - 1
+    jornadas.reverse()
+
+    resultado = []
+    for dia, (i, j) in enumerate(jornadas):
+        total = custo(i, j)
+        resultado.append({
+            "dia": dia,
+            "primeira_aresta": i,
+            "ultima_aresta": j,
+            "inicio": arestas[i][0],
+            "fim": arestas[j][1],
+            "ida_s": ida[i],
+            "servico_s": S[j + 1] - S[i],
+            "volta_s": volta[j],
+            "total_s": total,
+            "excede_limite": int(total > limite_s),
+        })
+    return resultado
+
+def jornadas_do_tour(dir_tour: str, grafo: Dict[int, Dict[int, float]], base: int = DEPOT_NODE,
+                     horas: float = HORAS_TRABALHO_DIA, dist_base: Dict[int, float] = None) -> List[dict]:
+    """Lê o tour detalhado de 'dir_tour' e o divide em jornadas. 'dist_base' pode ser reaproveitado."""
+    df = ler_tour_detalhado(dir_tour)
+    arestas = list(zip(df["u"].astype(int).tolist(), df["v"].astype(int).tolist(),
+                       df["weight"].astype(float).tolist()))
+    if dist_base is None:
+        dist_base = distancias_de(grafo, base)
+    faltando = {x for u, v, _ in arestas for x in (u, v) if x not in dist_base}
+    if faltando:
+        raise ValueError(f"{len(faltando)} vértice(s) do tour sem caminho até a base {base}.")
+    return dividir_em_jornadas(arestas, dist_base, horas * 3600)
+
+def salvar_jornadas(dir_tour: str, jornadas: List[dict]) -> str:
+    caminho = os.path.join(dir_tour, ARQUIVO_JORNADAS)
+    with gravacao_atomica(caminho) as tmp:
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            wr = csv.DictWriter(f, fieldnames=COLUNAS)
+            wr.writeheader()
+            wr.writerows(jornadas)
+    return caminho
+
+def carregar_grafo(caminho: str = None):
+    """Grafo completo da malha (snapshot, se existir, ou matriz CSV)."""
+    from resolver_cpp import read_graph
+    if caminho is None:
+        snapshot = os.path.join("dados_processados", "snapshot_grafo")
+        caminho = snapshot if os.path.isdir(snapshot) else os.path.join("dados_processados", "matriz_adjacencia.csv")
+    G, _ = read_graph(caminho)
+    return G
+
+# ============= EXECUÇÃO =============
+
+def main():
+    parser = argparse.ArgumentParser(description="Divide o tour em jornadas de trabalho")
+    parser.add_argument("dir_tour", help="Pasta com as saídas do resolver_cpp.py")
+    parser.add_argument("--horas", type=float, default=HORAS_TRABALHO_DIA, help="Duração máxima da jornada (h)")
+    parser.add_argument("--base", type=int, default=DEPOT_NODE, help="Vértice da base")
+    parser.add_argument("--grafo", default=None, help="Snapshot ou matriz da malha completa (deslocamentos)")
+    args = parser.parse_args()
+
+    grafo = carregar_grafo(args.grafo)
+    jornadas = jornadas_do_tour(args.dir_tour, grafo, args.base, args.horas)
+    caminho = salvar_jornadas(args.dir_tour, jornadas)
+
+    print(f"{len(jornadas)} jornada(s) de ate {args.horas:g} h:")
+    for j in jornadas:
+        aviso = "  [excede o limite]" if j["excede_limite"] else ""
+        print(f"  Dia {j['dia'] + 1}: arestas {j['primeira_aresta']}-{j['ultima_aresta']}, "
+              f"{j['total_s'] / 3600:.2f} h (ida {j['ida_s'] / 60:.1f} min, "
+              f"volta {j['volta_s'] / 60:.1f} min){aviso}")
+    print(f"Jornadas salvas em: {caminho}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+LINHA DO TEMPO DOS TOURS: POSIÇÃO E PREVISÃO DE PASSAGEM POR BUSCA BINÁRIA
+
+Responde, para todos os agentes de uma execução de uma vez, perguntas como
+"onde o agente 2 deveria estar às 14:30 do dia 1?" e "quando a rua (u, v)
+será visitada?", a partir dos tours gravados pelo resolver_cpp.py e das
+jornadas gravadas por jornadas.py.
+
+Horário de cada aresta: a jornada 'dia' começa às HORA_INICIO daquele dia,
+o agente vai da base ao início do trecho (ida_s) e percorre as arestas em
+sequência (cumulative_cost). Sem jornadas.csv, o tour é contado como um
+único trecho contínuo a partir das HORA_INICIO do dia 1. Os instantes são
+segundos desde 00:00 do dia 1.
+
+Índices (gravados em <dir_resultados>/linha_tempo.npz):
+- por agente (formato CSR, 'offsets'): início/fim de cada aresta, em ordem;
+  a chave agente * ESCALA + início é crescente no vetor inteiro, então a
+  posição de todos os agentes num instante é um único np.searchsorted;
+- invertido por rua: visitas ordenadas por (rua, instante), onde
+  rua = min(u, v) * (maior_vertice + 1) + max(u, v); a próxima passagem por
+  várias ruas também sai de um searchsorted.
+
+Uso:
+    python codigo_fonte/planejamento/linha_tempo.py <dir_resultados> [--em "1 14:30"] [--rua 12,40] [--construir]
+"""
+
+import argparse
+import csv
+import os
+import sys
+from typing import List, Sequence
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.join(ROOT, "codigo_fonte", "algoritmo_cpp"))
+
+from saida_tour import existe_tour, gravacao_atomica, ler_tour_detalhado
+
+# ============= CONFIGURAÇÕES =============
+HORA_INICIO = 8
+ARQUIVO_LINHA_TEMPO = "linha_tempo.npz"
+SEGUNDOS_DIA = 24 * 3600
+
+# Situação do agente em um instante (ver LinhaTempo.posicoes)
+ANTES_DO_INICIO, NA_ARESTA, FORA_DO_TOUR, CONCLUIDO = 0, 1, 2, 3
+SITUACOES = ("antes do inicio", "na aresta", "deslocamento/base", "concluido")
+
+# ============= INSTANTES =============
+
+def instante(dia: int, hora: str) -> float:
+    """Segundos desde 00:00 do dia 1 para ('dia' 1-based, 'HH:MM')."""
+    h, m = (int(x) for x in hora.split(":"))
+    return (dia - 1) * SEGUNDOS_DIA + h * 3600 + m * 60
+
+def parse_instante(texto: str) -> float:
+    """'14:30' (dia 1) ou '2 14:30' -> segundos desde 00:00 do dia 1."""
+    partes = texto.split()
+    return instante(int(partes[0]), partes[1]) if len(partes) == 2 else instante(1, partes[0])
+
+def formatar_instante(t: float) -> str:
+    dia, resto = divmod(int(round(t)), SEGUNDOS_DIA)
+    return f"dia {dia + 1} {resto // 3600:02d}:{resto % 3600 // 60:02d}"
+
+# ============= CONSTRUÇÃO =============
+
+def ler_jornadas_csv(dir_tour: str):
+    caminho = os.path.join(dir_tour, "jornadas.csv")
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, newline="", encoding="utf-8") as f:
+        return [{"dia": int(r["dia"]), "primeira_aresta": int(r["primeira_aresta"]),
+                 "ultima_aresta": int(r["ultima_aresta"]), "ida_s": float(r["ida_s"])}
+                for r in csv.DictReader(f)]
+
+def horarios_do_tour(pesos: np.ndarray, jornadas=None, hora_inicio: float = HORA_INICIO):
+    """(início, fim) de cada aresta do tour, em segundos desde 00:00 do dia 1."""
+    acum = np.concatenate(([0.0], np.cumsum(pesos)))
+    inicio = hora_inicio * 3600 + acum[:-1]
+    if jornadas:
+        for j in jornadas:
+            a, b = j["primeira_aresta"], j["ultima_aresta"] + 1
+            # Cada jornada sai da base às hora_inicio do seu dia
+            inicio[a:b] = j["dia"] * SEGUNDOS_DIA + hora_inicio * 3600 + j["ida_s"] + (acum[a:b] - acum[a])
+    return inicio, inicio + pesos
+
+class LinhaTempo:
+    """Índices de tempo de todos os agentes (arrays numpy, ver docstring do módulo)."""
+
+    CAMPOS = ("offsets", "u", "v", "inicio", "fim", "chave", "escala",
+              "rua_chave", "rua_agente", "rua_aresta", "n_vertices")
+
+    def __init__(self, **arrays):
+        for campo in self.CAMPOS:
+            setattr(self, campo, arrays[campo])
+        self.escala = float(self.escala)
+        self.n_vertices = int(self.n_vertices)
+
+    @property
+    def n_agentes(self) -> int:
+        return len(self.offsets) - 1
+
+    @classmethod
+    def construir(cls, tours: Sequence, jornadas: Sequence = None, hora_inicio: float = HORA_INICIO):
+        """
+        'tours': por agente, (u, v, peso) como arrays na ordem do tour;
+        'jornadas': por agente, a lista lida de jornadas.csv (ou None).
+        """
+        jornadas = list(jornadas or [None] * len(tours))
+        us, vs, inis, fins = [], [], [], []
+        for (u, v, w), jor in zip(tours, jornadas):
+            ini, fim = horarios_do_tour(np.asarray(w, dtype=np.float64), jor, hora_inicio)
+            us.append(np.asarray(u, dtype=np.int64))
+            vs.append(np.asarray(v, dtype=np.int64))
+            inis.append(ini)
+            fins.append(fim)
+        offsets = np.zeros(len(tours) + 1, dtype=np.int64)
+        np.cumsum([len(x) for x in us], out=offsets[1:])
+        u, v = np.concatenate(us or [np.zeros(0, np.int64)]), np.concatenate(vs or [np.zeros(0, np.int64)])
+        inicio, fim = np.concatenate(inis or [np.zeros(0)]), np.concatenate(fins or [np.zeros(0)])
+        agente = np.repeat(np.arange(len(tours)), np.diff(offsets))
+
+        # Chave crescente no vetor inteiro: agente * escala + início
+        escala = float(np.ceil(fim.max() + SEGUNDOS_DIA)) if len(fim) else float(SEGUNDOS_DIA)
+        chave = agente * escala + inicio
+
+        # Índice invertido: visitas por rua, em ordem de instante
+        n_vertices = int(max(u.max(), v.max()) + 1) if len(u) else 0
+        rua = np.minimum(u, v) * n_vertices + np.maximum(u, v)
+        ordem = np.lexsort((inicio, rua))
+        return cls(offsets=offsets, u=u, v=v, inicio=inicio, fim=fim, chave=chave, escala=escala,
+                   rua_chave=rua[ordem], rua_agente=agente[ordem], rua_aresta=ordem, n_vertices=n_vertices)
+
+    # ------------- Consultas -------------
+
+    def posicoes(self, t, agentes=None) -> dict:
+        """
+        Posição de vários agentes em 't' (escalar ou um instante por agente).
+        Devolve arrays: agente, aresta (índice global, -1 se nenhuma), u, v,
+        fracao (0..1 percorrida) e situacao (ANTES_DO_INICIO, NA_ARESTA,
+        FORA_DO_TOUR = ida/volta/entre jornadas, CONCLUIDO).
+        """
+        agentes = np.arange(self.n_agentes) if agentes is None else np.asarray(agentes, dtype=np.int64)
+        # Depois de escala - 1 todos já terminaram; o limite evita cair na faixa do próximo agente
+        t = np.broadcast_to(np.minimum(np.asarray(t, dtype=np.float64), self.escala - 1), agentes.shape)
+        k = np.searchsorted(self.chave, agentes * self.escala + t, side="right") - 1
+        primeira, ultima = self.offsets[agentes], self.offsets[agentes + 1] - 1
+        antes = (k < primeira) | (primeira > ultima)
+        k = np.where(antes, -1, k)
+        kk = np.maximum(k, 0)
+        if len(self.u):
+            ini, fim = self.inicio[kk], self.fim[kk]
+            u, v = self.u[kk], self.v[kk]
+        else:
+            ini = fim = np.zeros(len(agentes))
+            u = v = np.full(len(agentes), -1)
+        dur = np.maximum(fim - ini, 1e-9)
+        na_aresta = ~antes & (t < fim)
+        situacao = np.where(antes, ANTES_DO_INICIO,
+                            np.where(na_aresta, NA_ARESTA,
+                                     np.where(k == ultima, CONCLUIDO, FORA_DO_TOUR)))
+        fracao = np.where(antes, 0.0, np.where(na_aresta, (t - ini) / dur, 1.0))
+        return {"agente": agentes, "aresta": k, "u": np.where(antes, -1, u), "v": np.where(antes, -1, v),
+                "fracao": fracao, "situacao": situacao}
+
+    def _ruas(self, u, v):
+        u, v = np.asarray(u, dtype=np.int64), np.asarray(v, dtype=np.int64)
+        fora = (np.minimum(u, v) < 0) | (np.maximum(u, v) >= self.n_vertices)
+        return np.where(fora, -1, np.minimum(u, v) * self.n_vertices + np.maximum(u, v))
+
+    def passagens(self, u: int, v: int) -> List[tuple]:
+        """Todas as passagens pela rua (u, v): [(agente, início, fim)], em ordem de instante."""
+        rua = int(self._ruas(u, v))
+        a, b = np.searchsorted(self.rua_chave, [rua, rua + 1])
+        arestas = self.rua_aresta[a:b]
+        return list(zip(self.rua_agente[a:b].tolist(), self.inicio[arestas].tolist(), self.fim[arestas].tolist()))
+
+    def proximas_passagens(self, u, v, depois: float = 0.0) -> dict:
+        """
+        Primeira passagem a partir de 'depois' por cada rua (u[i], v[i]).
+        Devolve arrays agente e inicio (-1 / inf se a rua não for mais visitada).
+        """
+        rua = self._ruas(u, v)
+        a = np.searchsorted(self.rua_chave, rua, side="left")
+        b = np.searchsorted(self.rua_chave, rua, side="right")
+        agente = np.full(rua.shape, -1, dtype=np.int64)
+        inicio = np.full(rua.shape, np.inf)
+        # Visitas de uma rua estão ordenadas por instante: basta achar a primeira >= depois
+        for i in np.flatnonzero(b > a):
+            tempos = self.inicio[self.rua_aresta[a[i]:b[i]]]
+            j = int(np.searchsorted(tempos, depois, side="left"))
+            if j < len(tempos):
+                agente[i] = self.rua_agente[a[i] + j]
+                inicio[i] = tempos[j]
+        return {"agente": agente, "inicio": inicio}
+
+    # ------------- Persistência -------------
+
+    def salvar(self, caminho: str) -> str:
+        with gravacao_atomica(caminho) as tmp:
+            np.savez(tmp, **{c: np.asarray(getattr(self, c)) for c in self.CAMPOS})
+        return caminho
+
+    @classmethod
+    def carregar(cls, caminho: str) -> "LinhaTempo":
+        with np.load(caminho) as dados:
+            return cls(**{c: dados[c] for c in cls.CAMPOS})
+
+# ============= PASTAS DE RESULTADOS =============
+
+def pastas_agentes(dir_resultados: str) -> List[str]:
+    """agente_0, agente_1, ... da execução; com um agente, relatorio_tour."""
+    pastas = []
+    while os.path.isdir(os.path.join(dir_resultados, f"agente_{len(pastas)}")):
+        pastas.append(os.path.join(dir_resultados, f"agente_{len(pastas)}"))
+    return pastas or [os.path.join(dir_resultados, "relatorio_tour")]
+
+def construir_de_pastas(dirs_tour: Sequence[str], hora_inicio: float = HORA_INICIO) -> LinhaTempo:
+    """Linha do tempo a partir das pastas dos tours (agente i = dirs_tour[i]); tour ausente = agente vazio."""
+    tours, jornadas = [], []
+    for d in dirs_tour:
+        if existe_tour(d):
+            df = ler_tour_detalhado(d)
+            tours.append((df["u"].to_numpy(), df["v"].to_numpy(), df["weight"].to_numpy()))
+        else:
+            tours.append((np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0)))
+        jornadas.append(ler_jornadas_csv(d))
+    return LinhaTempo.construir(tours, jornadas, hora_inicio)
+
+def gerar_linha_tempo(dir_resultados: str, dirs_tour: Sequence[str] = None,
+                      hora_inicio: float = HORA_INICIO) -> str:
+    """Constrói e grava <dir_resultados>/linha_tempo.npz; devolve o caminho."""
+    linha = construir_de_pastas(dirs_tour or pastas_agentes(dir_resultados), hora_inicio)
+    return linha.salvar(os.path.join(dir_resultados, ARQUIVO_LINHA_TEMPO))
+
+# ============= EXECUÇÃO =============
+
+def main():
+    parser = argparse.ArgumentParser(description="Posição e previsão de passagem dos agentes")
+    parser.add_argument("dir_resultados", help="Pasta da execução (ex.: resultados/grafo-3)")
+    parser.add_argument("--em", default=None, help="Instante 'HH:MM' ou 'DIA HH:MM' (dia 1 = primeiro)")
+    parser.add_argument("--rua", action="append", default=[], help="Rua 'U,V' (pode repetir)")
+    parser.add_argument("--construir", action="store_true", help="Refaz o índice mesmo se já existir")
+    parser.add_argument("--hora-inicio", type=float, default=HORA_INICIO, help="Início da jornada (h)")
+    args = parser.parse_args()
+
+    caminho = os.path.join(args.dir_resultados, ARQUIVO_LINHA_TEMPO)
+    if args.construir or not os.path.exists(caminho):
+        gerar_linha_tempo(args.dir_resultados, hora_inicio=args.hora_inicio)
+        print(f"Linha do tempo salva em: {caminho}")
+    linha = LinhaTempo.carregar(caminho)
+    print(f"{linha.n_agentes} agente(s), {len(linha.u)} travessia(s)")
+
+    if args.em:
+        t = parse_instante(args.em)
+        pos = linha.posicoes(t)
+        print(f"\nPosicoes em {formatar_instante(t)}:")
+        for a, u, v, fr, sit in zip(pos["agente"], pos["u"], pos["v"], pos["fracao"], pos["situacao"]):
+            onde = f"aresta {u} -> {v} ({fr * 100:.0f}%)" if sit == NA_ARESTA else \
+                f"{SITUACOES[sit]}" + (f" (ultima aresta {u} -> {v})" if u >= 0 else "")
+            print(f"  Agente {a}: {onde}")
+
+    if args.rua:
+        depois = parse_instante(args.em) if args.em else 0.0
+        ruas = [tuple(int(x) for x in r.split(",")) for r in args.rua]
+        prox = linha.proximas_passagens([u for u, _ in ruas], [v for _, v in ruas], depois)
+        print()
+        for (u, v), a, t in zip(ruas, prox["agente"], prox["inicio"]):
+            if a < 0:
+                print(f"  Rua {u}-{v}: sem passagem prevista a partir de {formatar_instante(depois)}")
+            else:
+                print(f"  Rua {u}-{v}: agente {a} em {formatar_instante(t)} "
+                      f"({len(linha.passagens(u, v))} passagem(ns) no plano)")
+
+if __name__ == "__main__":
+    main()
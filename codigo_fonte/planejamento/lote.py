@@ -0,0 +1,229 @@
+"""
+MODO LOTE: PLANEJAR VÁRIOS BAIRROS/CIDADES EM UMA ÚNICA EXECUÇÃO
+
+Lê um manifesto com um conjunto de dados por linha e resolve cada um em
+paralelo (pool de processos), usando as funções em memória do resolver_cpp,
+do route2 e das jornadas em vez de copiar arquivos para dados_processados/
+e rodar o main.py várias vezes. Cada conjunto grava suas saídas em uma
+pasta própria; ao final sai uma tabela única de custo/makespan.
+
+Manifesto CSV (ou JSON com uma lista de objetos com os mesmos campos):
+    nome,arestas,vertices,agentes,depositos
+    centro,bairros/centro/arestas.csv,bairros/centro/vertices.csv,3,0
+    vila,bairros/vila/arestas.csv,,2,0;45
+- arestas: CSV no formato de arestas_calc_com_casas.csv (obrigatório);
+- vertices: CSV id,lat,lon (opcional, só acelera as buscas com A*);
+- agentes: padrão 1; depositos: bases separadas por ';' (padrão 0); uma base fora
+  do grafo marca o conjunto como erro no resumo.
+Caminhos relativos são resolvidos a partir da pasta do manifesto.
+
+Uso:
+    python codigo_fonte/planejamento/lote.py manifesto.csv [--saida resultados/lote] [--processos 4]
+Saída:
+    <saida>/<nome>/agente_X/ (tour.npz, tour_cost.txt, jornadas.csv), <saida>/<nome>/log.txt
+    <saida>/resumo.csv
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "codigo_fonte", "algoritmo_cpp"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# ============= CONFIGURAÇÕES =============
+DEPOT_NODE = 0
+COLUNAS_RESUMO = ["nome", "status", "nos", "arestas", "agentes", "depositos", "custo_total_h",
+                  "makespan_h", "jornadas_seq", "jornadas_par", "custo_total_par", "tempo_execucao_s"]
+
+# ============= MANIFESTO =============
+
+def _nome_de_pasta(nome) -> str:
+    """Nome do conjunto usável como pasta dentro de --saida (sem separadores nem '..')."""
+    limpo = re.sub(r"[^\w.-]", "_", str(nome).strip()).strip(".")
+    if not limpo:
+        raise ValueError(f"Nome de conjunto inválido no manifesto: {nome!r}")
+    return limpo
+
+def ler_manifesto(caminho: str) -> list:
+    """Lista de conjuntos {nome, arestas, vertices, agentes, depositos} com caminhos absolutos."""
+    base = os.path.dirname(os.path.abspath(caminho))
+    with open(caminho, newline="", encoding="utf-8") as f:
+        linhas = json.load(f) if caminho.lower().endswith(".json") else list(csv.DictReader(f))
+
+    conjuntos = []
+    nomes = set()
+    for i, linha in enumerate(linhas):
+        if not linha.get("arestas"):
+            raise ValueError(f"Linha {i + 1} do manifesto sem 'arestas'.")
+        nome = _nome_de_pasta(linha.get("nome") or os.path.splitext(os.path.basename(linha["arestas"]))[0])
+        if nome in nomes:
+            raise ValueError(f"Nome repetido no manifesto: {nome}")
+        nomes.add(nome)
+        depositos = str(linha.get("depositos") or DEPOT_NODE).replace(",", ";")
+        vertices = linha.get("vertices")
+        conjuntos.append({
+            "nome": nome,
+            "arestas": os.path.join(base, linha["arestas"]),
+            "vertices": os.path.join(base, vertices) if vertices else None,
+            "agentes": int(linha.get("agentes") or 1),
+            "depositos": [int(d) for d in depositos.split(";") if d.strip()],
+        })
+    return conjuntos
+
+# ============= SOLUÇÃO DE UM CONJUNTO =============
+
+def ler_coordenadas(caminho: str) -> dict:
+    if not caminho or not os.path.exists(caminho):
+        return {}
+    with open(caminho, newline="", encoding="utf-8") as f:
+        return {int(r["id"]): (float(r["lat"]), float(r["lon"])) for r in csv.DictReader(f)}
+
+def _resolver_conjunto(conjunto: dict, dir_saida: str, formatos) -> dict:
+    import main as pipeline
+    import resolver_cpp
+    import route2
+    from busca_caminhos import distancias_de
+    from calcular_peso_com_casas import grafo_de_arestas
+    from jornadas import HORAS_TRABALHO_DIA, dividir_em_jornadas, salvar_jornadas
+
+    G = grafo_de_arestas(conjunto["arestas"])
+    if not G:
+        raise ValueError("Conjunto sem arestas com peso.")
+    fora = [d for d in conjunto["depositos"] if d not in G]
+    if fora or not conjunto["depositos"]:
+        raise ValueError(f"Bases fora do grafo: {fora or 'nenhuma base informada'}")
+    depositos = conjunto["depositos"]
+    agentes = max(conjunto["agentes"], 1)
+    print(f"Grafo: {len(G)} nos; bases: {depositos}; agentes: {agentes}")
+
+    sol = resolver_cpp.resolver_cpp_memoria(G, inicio=depositos[0])
+    if agentes == 1:
+        trabalhos = [(depositos[0], G, sol)]
+    else:
+        route2.configurar_busca(G, ler_coordenadas(conjunto["vertices"]))
+        arestas_tour = [(u, v, G[u][v]) for u, v in sol["euler_edges"]]
+        if len(depositos) > 1:
+            clusters = route2.dividir_por_depositos(arestas_tour, G, agentes, depositos)
+        else:
+            clusters = [(depositos[0], c) for c in route2.dividir_tour(arestas_tour, G, agentes, depositos[0])]
+        trabalhos = []
+        for base, cluster in clusters:
+            G_cluster = route2.grafo_do_cluster(cluster)
+            trabalhos.append((base, G_cluster, resolver_cpp.resolver_cpp_memoria(G_cluster, inicio=base)))
+
+    dist_base = {d: distancias_de(G, d) for d in {b for b, _, _ in trabalhos}}
+    custos, jornadas_agentes = [], []
+    for i, (base, G_agente, sol_agente) in enumerate(trabalhos):
+        dir_agente = os.path.join(dir_saida, f"agente_{i}")
+        resolver_cpp.save_outputs(dir_agente, G_agente, sol_agente["tour_vertices"], sol_agente["euler_edges"],
+                                  sol_agente["total_cost"], sol_agente["matching_pairs"],
+                                  sol_agente["paths_between"], formatos)
+        arestas = [(u, v, G_agente[u][v]) for u, v in sol_agente["euler_edges"]]
+        jornadas = dividir_em_jornadas(arestas, dist_base[base], HORAS_TRABALHO_DIA * 3600)
+        salvar_jornadas(dir_agente, jornadas)
+        custos.append(sol_agente["total_cost"])
+        jornadas_agentes.append(len(jornadas))
+
+    metricas = pipeline.resumir_metricas(custos, len(trabalhos), jornadas_agentes)
+    return {
+        "nos": len(G),
+        "arestas": sum(len(viz) for viz in G.values()) // 2,
+        "agentes": len(trabalhos),
+        "depositos": ";".join(map(str, depositos)),
+        "custo_total_h": metricas["tempo_total_seq_horas"],
+        "makespan_h": metricas["tempo_total_par_horas"],
+        "jornadas_seq": metricas["jornadas_seq"],
+        "jornadas_par": metricas["jornadas_par"],
+        "custo_total_par": metricas["custo_total_par"],
+    }
+
+def planejar_conjunto(conjunto: dict, dir_lote: str, formatos=("npz",)) -> dict:
+    """
+    Resolve um conjunto em sua própria pasta (<dir_lote>/<nome>) e devolve a
+    linha do resumo. Executado nos processos do pool; a saída de texto do
+    resolver vai para <dir_lote>/<nome>/log.txt.
+    """
+    dir_saida = os.path.join(dir_lote, conjunto["nome"])
+    os.makedirs(dir_saida, exist_ok=True)
+    linha = {"nome": conjunto["nome"], "agentes": conjunto["agentes"],
+             "depositos": ";".join(map(str, conjunto["depositos"]))}
+    inicio = time.perf_counter()
+    with open(os.path.join(dir_saida, "log.txt"), "w", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(log):
+        try:
+            linha.update(_resolver_conjunto(conjunto, dir_saida, formatos))
+            linha["status"] = "ok"
+        except Exception as e:
+            import traceback
+            traceback.print_exc(file=log)
+            linha["status"] = f"erro: {e}"
+    linha["tempo_execucao_s"] = time.perf_counter() - inicio
+    return linha
+
+# ============= RESUMO =============
+
+def salvar_resumo(caminho: str, linhas: list):
+    with open(caminho, "w", newline="", encoding="utf-8") as f:
+        wr = csv.DictWriter(f, fieldnames=COLUNAS_RESUMO, extrasaction="ignore")
+        wr.writeheader()
+        wr.writerows(linhas)
+
+def imprimir_resumo(linhas: list):
+    print("\n" + "=" * 80)
+    print(f"{'Conjunto':<20}{'Agentes':>8}{'Total (h)':>11}{'Makespan (h)':>14}{'Dias':>6}{'Tempo (s)':>11}  Status")
+    print("-" * 80)
+    for l in linhas:
+        if l["status"] == "ok":
+            print(f"{l['nome']:<20}{l['agentes']:>8}{l['custo_total_h']:>11.2f}{l['makespan_h']:>14.2f}"
+                  f"{l['jornadas_par']:>6}{l['tempo_execucao_s']:>11.2f}  ok")
+        else:
+            print(f"{l['nome']:<20}{l['agentes']:>8}{'-':>11}{'-':>14}{'-':>6}{l['tempo_execucao_s']:>11.2f}  {l['status']}")
+    print("=" * 80)
+
+# ============= EXECUÇÃO =============
+
+def main():
+    from saida_tour import FORMATOS_PADRAO, parse_formatos
+
+    parser = argparse.ArgumentParser(description="Planeja vários conjuntos de dados em paralelo")
+    parser.add_argument("manifesto", help="CSV/JSON com nome, arestas, vertices, agentes, depositos")
+    parser.add_argument("--saida", default=None,
+                        help="Pasta do lote (padrão: resultados/lote_<data_hora>)")
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 1, help="Tamanho do pool")
+    parser.add_argument("--formatos", type=parse_formatos, default=FORMATOS_PADRAO,
+                        help="Formatos das saídas do tour (npz, parquet, csv)")
+    args = parser.parse_args()
+
+    conjuntos = ler_manifesto(args.manifesto)
+    dir_lote = args.saida or os.path.join("resultados", f"lote_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    os.makedirs(dir_lote, exist_ok=True)
+    print(f"{len(conjuntos)} conjunto(s), {args.processos} processo(s). Saida: {dir_lote}")
+
+    inicio = time.perf_counter()
+    linhas = {}
+    with ProcessPoolExecutor(max_workers=max(1, min(args.processos, len(conjuntos)))) as pool:
+        futuros = {pool.submit(planejar_conjunto, c, dir_lote, args.formatos): c["nome"] for c in conjuntos}
+        for futuro in as_completed(futuros):
+            linha = futuro.result()
+            linhas[linha["nome"]] = linha
+            print(f"  [{linha['status']}] {linha['nome']} ({linha['tempo_execucao_s']:.2f}s)")
+
+    ordenadas = [linhas[c["nome"]] for c in conjuntos]
+    caminho = os.path.join(dir_lote, "resumo.csv")
+    salvar_resumo(caminho, ordenadas)
+    imprimir_resumo(ordenadas)
+    print(f"Tempo total: {time.perf_counter() - inicio:.2f}s")
+    print(f"Resumo salvo em: {caminho}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+REPLANEJAMENTO NO MEIO DO DIA A PARTIR DO PROGRESSO DOS AGENTES
+
+Quando os agentes atrasam, em vez de rodar o main.py de novo a partir da
+base, replaneja só o que falta: recebe o vértice atual de cada agente e as
+ruas já atendidas e resolve um carteiro rural (carteiro_rural.py) sobre as
+ruas com casas ainda pendentes.
+
+1. Cada rua pendente fica com o agente mais próximo (Dijkstra de múltiplas
+   origens a partir das posições atuais, pesos de deslocamento).
+2. Agentes no mesmo vértice dividem as ruas desse grupo: uma rota única do
+   grupo é cortada em trechos contíguos de carga parecida (como no route2.py).
+3. Cada agente recebe uma rota aberta: sai da posição atual, atende as suas
+   ruas e termina na sua base.
+
+As distâncias de deslocamento não dependem do número de casas, então as
+tabelas de Dijkstra ('tabelas') servem para todos os replanejamentos sobre
+a mesma malha; o serviço de planejamento as mantém em memória.
+
+Uso:
+    python codigo_fonte/planejamento/replanejar.py --agentes 12,40:0,7 [--servidas atendidas.csv]
+        [--arestas dados_processados/arestas_calc_com_casas.csv] [--saida resultados/replanejamento]
+--agentes: posição atual de cada agente, com a base opcional após ':' (padrão 0).
+--servidas: CSV com as ruas atendidas (colunas origem,destino ou u,v; ex.: a
+saída do indice_espacial.py).
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "codigo_fonte", "algoritmo_cpp"))
+
+from busca_caminhos import deposito_mais_proximo
+from carteiro_rural import ler_ruas, resolver_carteiro_rural
+from main import DEPOT_NODE
+
+# ============= CONFIGURAÇÕES =============
+ARQUIVO_ARESTAS = os.path.join("dados_processados", "arestas_calc_com_casas.csv")
+DIR_SAIDA = os.path.join("resultados", "replanejamento")
+
+# ============= DIVISÃO DAS RUAS PENDENTES =============
+
+def _chave(u: int, v: int) -> Tuple[int, int]:
+    return (min(u, v), max(u, v))
+
+def _rota(ruas, obrigatorias, inicio: int, fim: int, tabelas) -> dict:
+    """Carteiro rural aberto (inicio -> fim) atendendo só 'obrigatorias'."""
+    selecao = [(u, v, wa, wd, _chave(u, v) in obrigatorias) for u, v, wa, wd, _ in ruas]
+    with contextlib.redirect_stdout(io.StringIO()):
+        return resolver_carteiro_rural(selecao, inicio=inicio, fim=fim, tabelas=tabelas)
+
+def _cortar(sol: dict, partes: int) -> List[set]:
+    """Corta as ruas atendidas da rota em 'partes' trechos contíguos de carga parecida."""
+    atendidas = [(_chave(u, v), w) for (u, v), w, s in zip(sol["euler_edges"], sol["pesos"], sol["servico"]) if s]
+    meta = sum(w for _, w in atendidas) / partes
+    trechos, atual, carga = [], set(), 0.0
+    for chave, w in atendidas:
+        atual.add(chave)
+        carga += w
+        if carga >= meta and len(trechos) < partes - 1:
+            trechos.append(atual)
+            atual, carga = set(), 0.0
+    trechos.append(atual)
+    return trechos + [set() for _ in range(partes - len(trechos))]
+
+def dividir_pendentes(ruas, pendentes: set, posicoes: Sequence[int], tabelas=None,
+                      bases: Sequence[int] = ()) -> List[set]:
+    """Ruas pendentes de cada agente (mesma ordem de 'posicoes'); 'bases' só é validado."""
+    G_desloc = defaultdict(dict)
+    for u, v, _, w_desloc, _ in ruas:
+        G_desloc[u][v] = G_desloc[v][u] = w_desloc
+    faltando = [p for p in posicoes if p not in G_desloc]
+    if faltando:
+        raise ValueError(f"Posição fora da malha: {faltando}")
+    fora = sorted({b for b in bases if b not in G_desloc})
+    if fora:
+        raise ValueError(f"Bases fora do grafo: {fora}")
+
+    dist, dono = deposito_mais_proximo(G_desloc, set(posicoes))
+    por_vertice = defaultdict(set)
+    for a, b in pendentes:
+        if a not in dist and b not in dist:
+            raise ValueError(f"Rua {a}-{b} inalcançável a partir dos agentes.")
+        perto = a if dist.get(a, float("inf")) <= dist.get(b, float("inf")) else b
+        por_vertice[dono[perto]].add((a, b))
+
+    agentes_em = defaultdict(list)
+    for i, p in enumerate(posicoes):
+        agentes_em[p].append(i)
+    resultado = [set() for _ in posicoes]
+    for p, agentes in agentes_em.items():
+        ruas_grupo = por_vertice.get(p, set())
+        if len(agentes) == 1 or not ruas_grupo:
+            resultado[agentes[0]] = ruas_grupo
+            continue
+        sol = _rota(ruas, ruas_grupo, p, p, tabelas)
+        for i, trecho in zip(agentes, _cortar(sol, len(agentes))):
+            resultado[i] = trecho
+    return resultado
+
+# ============= REPLANEJAMENTO =============
+
+def replanejar(ruas, agentes: Sequence[Tuple[int, int]], servidas: Iterable[Tuple[int, int]] = (),
+               tabelas: Dict = None) -> List[dict]:
+    """
+    'ruas': lista de carteiro_rural.ler_ruas; 'agentes': [(posição atual, base)];
+    'servidas': ruas já atendidas (u, v). 'tabelas' (opcional) guarda o
+    Dijkstra de deslocamento entre chamadas.
+    Devolve, por agente, a solução do carteiro rural (tour_vertices,
+    euler_edges, pesos, servico, total_cost, ...) mais agente, inicio, fim e
+    ruas (quantidade de ruas atribuídas).
+    """
+    if tabelas is None:
+        tabelas = {}
+    feitas = {_chave(u, v) for u, v in servidas}
+    obrigatorias = {_chave(u, v) for u, v, _, _, obr in ruas if obr}
+    pendentes = obrigatorias - feitas
+    divisao = dividir_pendentes(ruas, pendentes, [p for p, _ in agentes], tabelas, [b for _, b in agentes])
+
+    rotas = []
+    for i, ((atual, base), minhas) in enumerate(zip(agentes, divisao)):
+        sol = _rota(ruas, minhas, atual, base, tabelas)
+        sol.update({"agente": i, "inicio": atual, "fim": base, "ruas": len(minhas)})
+        rotas.append(sol)
+    return rotas
+
+# ============= ENTRADAS =============
+
+def parse_agentes(texto: str) -> List[Tuple[int, int]]:
+    """'12,40:0,7' -> [(12, 0), (40, 0), (7, 0)] (posição atual, base)."""
+    agentes = []
+    for item in texto.split(","):
+        if item.strip():
+            atual, _, base = item.partition(":")
+            agentes.append((int(atual), int(base) if base.strip() else DEPOT_NODE))
+    return agentes
+
+def ler_servidas(caminho: str) -> List[Tuple[int, int]]:
+    """Ruas atendidas de um CSV (origem,destino ou u,v; linhas com -1 são ignoradas)."""
+    with open(caminho, newline="", encoding="utf-8") as f:
+        leitor = csv.DictReader(f)
+        cu, cv = ("origem", "destino") if "origem" in (leitor.fieldnames or []) else ("u", "v")
+        servidas = [(int(float(r[cu])), int(float(r[cv]))) for r in leitor]
+    return [(u, v) for u, v in servidas if u >= 0 and v >= 0]
+
+# ============= EXECUÇÃO =============
+
+def main():
+    from resolver_cpp import save_outputs
+    from saida_tour import FORMATOS_PADRAO, parse_formatos
+
+    parser = argparse.ArgumentParser(description="Replaneja as rotas a partir do progresso dos agentes")
+    parser.add_argument("--agentes", required=True, help="Posições atuais 'v[:base],...'")
+    parser.add_argument("--servidas", default=None, help="CSV das ruas já atendidas")
+    parser.add_argument("--arestas", default=ARQUIVO_ARESTAS)
+    parser.add_argument("--saida", default=DIR_SAIDA)
+    parser.add_argument("--formatos", type=parse_formatos, default=FORMATOS_PADRAO)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    ruas = ler_ruas(args.arestas)
+    agentes = parse_agentes(args.agentes)
+    servidas = ler_servidas(args.servidas) if args.servidas else []
+    try:
+        rotas = replanejar(ruas, agentes, servidas)
+    except ValueError as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+
+    for r in rotas:
+        dir_agente = os.path.join(args.saida, f"agente_{r['agente']}")
+        save_outputs(dir_agente, r["grafo"], r["tour_vertices"], r["euler_edges"], r["total_cost"],
+                     r["matching_pairs"], r["paths_between"], args.formatos,
+                     pesos=r["pesos"], servico=r["servico"])
+
+    pendentes = sum(r["ruas"] for r in rotas)
+    print(f"{len({_chave(u, v) for u, v in servidas})} rua(s) atendida(s), {pendentes} pendente(s)")
+    print(f"{'Agente':>7}{'Atual':>7}{'Base':>6}{'Ruas':>6}{'Custo (h)':>11}")
+    for r in rotas:
+        print(f"{r['agente']:>7}{r['inicio']:>7}{r['fim']:>6}{r['ruas']:>6}{r['total_cost'] / 3600:>11.2f}")
+    if rotas:
+        print(f"Makespan: {max(r['total_cost'] for r in rotas) / 3600:.2f} h")
+    print(f"Tempo total: {time.perf_counter() - inicio:.2f}s")
+    print(f"Rotas salvas em: {args.saida}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+ANÁLISE DE SENSIBILIDADE: VELOCIDADE, TEMPO POR CASA E CUSTO/HORA
+
+Avalia uma grade de cenários (velocidade de caminhada, tempo de atendimento
+por casa, custo por hora do agente e número de agentes) sem rodar o
+pipeline completo para cada combinação.
+
+O peso de cada aresta é linear nos parâmetros:
+    w = d / v + casas * t = (d + k * casas) / v,   com k = t * v (metros por casa)
+Multiplicar todos os pesos por 1/v não muda o tour ótimo, então o tour
+(emparelhamento dos nós ímpares) só depende de k. Para um tour fixo o
+custo é A + k * B (A = metros percorridos, B = casas atravessadas, contando
+as repetições) e o custo ótimo em função de k é côncavo e linear por
+partes. Assim, basta resolver o CPP nos extremos da faixa de k e bissectar
+só os intervalos em que a solução muda: se os extremos têm a mesma solução,
+ela vale para todo o intervalo. Isso só vale com tours ótimos, então aqui o
+emparelhamento é sempre exato (DP do resolver_cpp até LIMITE_EXATO nós
+ímpares, Blossom do networkx acima disso), nunca a heurística anytime.
+
+Com os (A, B) de cada k, a tabela inteira (custo total, makespan e custos
+em R$) é calculada de uma vez com numpy. O makespan com N agentes é
+estimado cortando o tour em N trechos contíguos de carga parecida (mesmo
+critério do route2.py), somando ida e volta à base.
+
+Uso:
+    python codigo_fonte/planejamento/sensibilidade.py [--velocidades 1.0,1.2,1.4] [--tempos-casa 15,20,30]
+        [--custos-hora 40,50] [--agentes 1,2,3] [--arestas dados_processados/arestas_calc_com_casas.csv]
+Saída:
+    resultados/sensibilidade.csv (ou --saida)
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "codigo_fonte", "algoritmo_cpp"))
+
+from busca_caminhos import dijkstra, distancias_de
+from calcular_peso_com_casas import TEMPO_POR_CASA, VELOCIDADE, ler_arestas_csv
+from main import CUSTO_HORA_AGENTE, DEPOT_NODE, HORAS_TRABALHO_DIA
+from resolver_cpp import LIMITE_EXATO, build_multigraph_with_counts, hierholzer_multigraph, resolver_cpp_memoria
+from saida_tour import gravacao_atomica
+
+# ============= CONFIGURAÇÕES =============
+ARQUIVO_ARESTAS = os.path.join("dados_processados", "arestas_calc_com_casas.csv")
+ARQUIVO_SAIDA = os.path.join("resultados", "sensibilidade.csv")
+COLUNAS = ["velocidade", "tempo_por_casa", "custo_hora", "agentes", "k_m_por_casa", "solucao",
+           "tempo_total_h", "makespan_h", "dias_par", "custo_total_seq", "custo_total_par"]
+
+# ============= DADOS =============
+
+def ler_arestas(caminho: str):
+    """{(u, v): (distancia_m, casas)} nos dois sentidos, com as mesmas exclusões do lote.py."""
+    arestas = {}
+    for u, v, r in ler_arestas_csv(caminho):
+        d, c = float(r["distancia_m"]), float(r["numero_de_casas"])
+        if d == 0.0 and c == 0.0:
+            continue
+        arestas[(u, v)] = arestas[(v, u)] = (d, c)
+    return arestas
+
+def grafo_para_k(arestas, k: float):
+    """Grafo {u: {v: d + k * casas}} (pesos em 'metros equivalentes', i.e. w * v)."""
+    G = {}
+    for (u, v), (d, c) in arestas.items():
+        G.setdefault(u, {})[v] = d + k * c
+    return {u: dict(sorted(G[u].items())) for u in sorted(G)}
+
+# ============= SOLUÇÕES POR k =============
+
+def tour_otimo(G, base: int):
+    """Circuito do CPP com emparelhamento exato para qualquer número de nós ímpares."""
+    impares = [u for u in G if len(G[u]) % 2 == 1]
+    if len(impares) <= LIMITE_EXATO:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return resolver_cpp_memoria(G, inicio=base)["euler_edges"]
+
+    import networkx as nx
+
+    tabelas = {u: dijkstra(G, u) for u in impares}
+    K = nx.Graph()
+    for i, a in enumerate(impares):
+        for b in impares[i + 1:]:
+            K.add_edge(a, b, weight=tabelas[a][0][b])
+    pares = [tuple(p) for p in nx.min_weight_matching(K)]
+    caminhos = {(a, b): tabelas[a][1][b] for a, b in pares}
+    return hierholzer_multigraph(build_multigraph_with_counts(G, pares, caminhos), base)
+
+class SolucaoK:
+    """Tour ótimo para um k: vetores de distância e casas das arestas, na ordem do tour."""
+
+    def __init__(self, arestas, k: float, base: int):
+        tour = tour_otimo(grafo_para_k(arestas, k), base)
+        self.u = np.array([a for a, _ in tour], dtype=np.int64)
+        self.v = np.array([b for _, b in tour], dtype=np.int64)
+        dc = np.array([arestas[e] for e in tour], dtype=np.float64).reshape(-1, 2)
+        self.d, self.c = dc[:, 0], dc[:, 1]
+        self.A = float(self.d.sum())
+        self.B = float(self.c.sum())
+
+    def mesma_que(self, outra: "SolucaoK") -> bool:
+        return np.isclose(self.A, outra.A) and np.isclose(self.B, outra.B)
+
+def solucoes_por_k(arestas, ks, base: int):
+    """
+    Para cada k (ordenado) devolve a solução ótima, resolvendo o CPP só nos
+    extremos e nos pontos médios dos intervalos em que a solução muda.
+    Exige soluções ótimas (tour_otimo): com uma heurística, extremos iguais
+    não garantem a mesma solução no meio do intervalo.
+    Devolve também quantos CPPs foram de fato resolvidos.
+    """
+    sol = [None] * len(ks)
+
+    def resolver(i):
+        if sol[i] is None:
+            sol[i] = SolucaoK(arestas, ks[i], base)
+        return sol[i]
+
+    def refinar(i, j):
+        a, b = resolver(i), resolver(j)
+        if j - i <= 1:
+            return
+        if a.mesma_que(b):
+            for x in range(i + 1, j):
+                sol[x] = a
+            return
+        meio = (i + j) // 2
+        refinar(i, meio)
+        refinar(meio, j)
+
+    if ks:
+        refinar(0, len(ks) - 1)
+    return sol, len({id(s) for s in sol})
+
+def maior_trecho(sol: SolucaoK, k: float, n_agentes: int, dist_base) -> float:
+    """Carga (metros equivalentes) do maior trecho ao cortar o tour em n_agentes, com ida/volta à base."""
+    w = sol.d + k * sol.c
+    acum = np.cumsum(w)
+    meta = acum[-1] / n_agentes
+    ida = dist_base[sol.u]
+    volta = dist_base[sol.v]
+    maior, inicio, antes = 0.0, 0, 0.0
+    for agente in range(n_agentes):
+        if agente == n_agentes - 1:
+            fim = len(w) - 1
+        else:
+            # Primeira aresta em que a carga do agente atinge a meta (critério do route2.py)
+            fim = min(int(np.searchsorted(acum, antes + meta, side="left")), len(w) - 2)
+        if fim < inicio:
+            break
+        maior = max(maior, ida[inicio] + (acum[fim] - antes) + volta[fim])
+        antes = acum[fim]
+        inicio = fim + 1
+        if inicio >= len(w):
+            break
+    return maior
+
+# ============= VARREDURA =============
+
+def varrer(arestas, velocidades, tempos_casa, custos_hora, agentes, base: int = DEPOT_NODE) -> dict:
+    """
+    Avalia todas as combinações da grade. Devolve um dicionário de colunas
+    (arrays numpy, uma linha por combinação) e o número de CPPs resolvidos.
+    """
+    V, T, R, N = (a.ravel() for a in np.meshgrid(np.asarray(velocidades, float), np.asarray(tempos_casa, float),
+                                                  np.asarray(custos_hora, float), np.asarray(agentes, int),
+                                                  indexing="ij"))
+    K = T * V
+    ks = np.unique(K)
+    sol, n_resolvidos = solucoes_por_k(arestas, ks.tolist(), base)
+
+    # Carga do tour e do maior trecho por (k, agentes), em metros equivalentes
+    ns = np.unique(N)
+    carga = np.array([s.A + k * s.B for s, k in zip(sol, ks)])
+    trecho = np.zeros((len(ks), len(ns)))
+    for i, (s, k) in enumerate(zip(sol, ks)):
+        G = grafo_para_k(arestas, k)
+        dist = distancias_de(G, base)
+        dist_base = np.zeros(max(G) + 1)
+        dist_base[list(dist)] = list(dist.values())
+        for j, n in enumerate(ns):
+            trecho[i, j] = carga[i] if n == 1 else maior_trecho(s, k, int(n), dist_base)
+
+    ik = np.searchsorted(ks, K)
+    jn = np.searchsorted(ns, N)
+    # Mesmo rótulo para k's com a mesma solução (mesmos A e B)
+    rotulo, por_k = [], []
+    for s in sol:
+        x = next((x for x, r in enumerate(rotulo) if s.mesma_que(r)), None)
+        if x is None:
+            x = len(rotulo)
+            rotulo.append(s)
+        por_k.append(x)
+    solucao = np.array(por_k)[ik]
+
+    tempo_total_h = carga[ik] / V / 3600
+    makespan_h = trecho[ik, jn] / V / 3600
+    return {
+        "velocidade": V,
+        "tempo_por_casa": T,
+        "custo_hora": R,
+        "agentes": N,
+        "k_m_por_casa": K,
+        "solucao": solucao,
+        "tempo_total_h": tempo_total_h,
+        "makespan_h": makespan_h,
+        "dias_par": makespan_h / HORAS_TRABALHO_DIA,
+        "custo_total_seq": tempo_total_h * R,
+        "custo_total_par": makespan_h * R * N,
+    }, n_resolvidos
+
+def salvar_tabela(caminho: str, tabela: dict):
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    with gravacao_atomica(caminho) as tmp:
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            wr = csv.writer(f)
+            wr.writerow(COLUNAS)
+            wr.writerows(zip(*(tabela[c].tolist() for c in COLUNAS)))
+
+def imprimir_tabela(tabela: dict):
+    print("\n" + "=" * 96)
+    print(f"{'v (m/s)':>8}{'t/casa (s)':>11}{'R$/h':>7}{'agentes':>8}{'sol.':>6}"
+          f"{'total (h)':>11}{'makespan (h)':>14}{'dias':>7}{'R$ seq':>11}{'R$ par':>11}")
+    print("-" * 96)
+    for i in range(len(tabela["velocidade"])):
+        print(f"{tabela['velocidade'][i]:>8.2f}{tabela['tempo_por_casa'][i]:>11.1f}{tabela['custo_hora'][i]:>7.0f}"
+              f"{tabela['agentes'][i]:>8}{tabela['solucao'][i]:>6}{tabela['tempo_total_h'][i]:>11.2f}"
+              f"{tabela['makespan_h'][i]:>14.2f}{tabela['dias_par'][i]:>7.2f}"
+              f"{tabela['custo_total_seq'][i]:>11.2f}{tabela['custo_total_par'][i]:>11.2f}")
+    print("=" * 96)
+
+# ============= EXECUÇÃO =============
+
+def lista(tipo):
+    return lambda texto: [tipo(x) for x in texto.split(",") if x.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Varredura de velocidade, tempo por casa e custo/hora")
+    parser.add_argument("--velocidades", type=lista(float), default=[VELOCIDADE], help="m/s, separadas por virgula")
+    parser.add_argument("--tempos-casa", type=lista(float), default=[TEMPO_POR_CASA], help="s por casa")
+    parser.add_argument("--custos-hora", type=lista(float), default=[CUSTO_HORA_AGENTE], help="R$ por hora/agente")
+    parser.add_argument("--agentes", type=lista(int), default=[1], help="Números de agentes")
+    parser.add_argument("--base", type=int, default=DEPOT_NODE)
+    parser.add_argument("--arestas", default=ARQUIVO_ARESTAS, help="CSV origem,destino,distancia_m,numero_de_casas")
+    parser.add_argument("--saida", default=ARQUIVO_SAIDA)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    arestas = ler_arestas(args.arestas)
+    tabela, n_resolvidos = varrer(arestas, args.velocidades, args.tempos_casa, args.custos_hora,
+                                  args.agentes, args.base)
+    n_k = len(np.unique(tabela["k_m_por_casa"]))
+    imprimir_tabela(tabela)
+    salvar_tabela(args.saida, tabela)
+    print(f"{len(tabela['velocidade'])} cenario(s), {n_k} valor(es) de k, "
+          f"{n_resolvidos} CPP(s) resolvido(s), {tabela['solucao'].max() + 1} solucao(oes) distinta(s)")
+    print(f"Tempo total: {time.perf_counter() - inicio:.2f}s")
+    print(f"Tabela salva em: {args.saida}")
+
+if __name__ == "__main__":
+    main()
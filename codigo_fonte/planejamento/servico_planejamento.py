@@ -0,0 +1,292 @@
+"""
+SERVIÇO DE PLANEJAMENTO (HTTP/JSON) COM GRAFO EM MEMÓRIA
+
+Mantém o grafo, as tabelas de distância dos nós ímpares e as últimas
+soluções do CPP em memória, respondendo consultas sem reexecutar o
+pipeline completo (main.py).
+
+Uso:
+    python codigo_fonte/planejamento/servico_planejamento.py [--host 127.0.0.1] [--porta 8765]
+
+Rotas:
+    GET  /saude      -> estado do serviço
+    POST /resolver   -> {"casas": [...], "incluir_tour": false}
+    POST /dividir    -> {"agentes": 2, "casas": [...]}
+    POST /metricas   -> {"agentes": 2, "casas": [...]}
+    POST /replanejar -> {"agentes": [{"atual": 12, "base": 0}, ...], "servidas": [[0, 71], ...],
+                         "casas": [...], "incluir_tour": false}
+
+"casas" (opcional) simula alterações no número de casas de algumas ruas:
+    [{"origem": 0, "destino": 71, "numero_de_casas": 34}, ...]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "codigo_fonte", "algoritmo_cpp"))
+
+import resolver_cpp
+import route2
+import main as pipeline
+from calcular_peso_com_casas import calcular_peso, ler_arestas_csv
+from replanejar import replanejar
+
+# ============= CONFIGURAÇÕES =============
+PATH_ARESTAS = os.path.join(ROOT, "dados_processados", "arestas_calc_com_casas.csv")
+MAX_SOLUCOES_CACHE = 32
+
+# ============= ESTADO EM MEMÓRIA =============
+
+class ServicoPlanejamento:
+    """Grafo base, tabelas de Dijkstra e cache de soluções compartilhados entre requisições."""
+
+    def __init__(self, path_arestas: str = PATH_ARESTAS):
+        print(f"Lendo {path_arestas}...")
+        self.arestas = {}
+        # ler_arestas_csv descarta laços (ex.: 77,77), que quebrariam a paridade dos graus
+        for u, v, r in ler_arestas_csv(path_arestas):
+            self.arestas[(min(u, v), max(u, v))] = (float(r["distancia_m"]), float(r["numero_de_casas"]))
+
+        self.G = self._construir_grafo({})
+        self.tabelas_base = {}
+        # Dijkstra de deslocamento (sem casas): vale para qualquer cenário de "casas"
+        self.tabelas_desloc = {}
+        self.solucoes = OrderedDict()
+        self.divisoes = OrderedDict()
+        self.lock = threading.Lock()
+        print(f"Grafo em memória: {len(self.G)} nós, {len(self.arestas)} arestas.")
+
+    def _construir_grafo(self, casas: dict):
+        """Mesmo grafo (e mesma ordem de vizinhos) que resolver_cpp.read_adjacency_csv produziria."""
+        adj = {}
+        for (u, v), (dist, n_casas) in self.arestas.items():
+            w = calcular_peso(dist, casas.get((u, v), n_casas))
+            if w == 0.0:
+                continue
+            adj.setdefault(u, {})[v] = w
+            adj.setdefault(v, {})[u] = w
+        return {u: dict(sorted(adj[u].items())) for u in sorted(adj)}
+
+    def _normalizar_casas(self, casas_req) -> tuple:
+        """Converte a lista 'casas' da requisição em uma chave ordenada e imutável."""
+        casas = {}
+        for item in casas_req or []:
+            u, v = int(item["origem"]), int(item["destino"])
+            chave = (min(u, v), max(u, v))
+            if chave not in self.arestas:
+                raise ValueError(f"Aresta {u}-{v} não existe no grafo.")
+            casas[chave] = float(item["numero_de_casas"])
+        return tuple(sorted(casas.items()))
+
+    def _lembrar(self, cache: OrderedDict, chave, valor):
+        with self.lock:
+            cache[chave] = valor
+            cache.move_to_end(chave)
+            while len(cache) > MAX_SOLUCOES_CACHE:
+                cache.popitem(last=False)
+
+    def _consultar(self, cache: OrderedDict, chave):
+        with self.lock:
+            valor = cache.get(chave)
+            if valor is not None:
+                cache.move_to_end(chave)
+            return valor
+
+    def resolver(self, casas_req=None):
+        """Retorna (G, solução) do CPP completo para o cenário pedido."""
+        chave = self._normalizar_casas(casas_req)
+        em_cache = self._consultar(self.solucoes, chave)
+        if em_cache is not None:
+            return em_cache
+
+        if chave:
+            G = self._construir_grafo(dict(chave))
+            sol = resolver_cpp.resolver_cpp_memoria(G)
+        else:
+            # Cenário base: reaproveita (e alimenta) as tabelas de Dijkstra
+            G = self.G
+            with self.lock:
+                tabelas = dict(self.tabelas_base)
+            sol = resolver_cpp.resolver_cpp_memoria(G, tabelas)
+            with self.lock:
+                self.tabelas_base.update(tabelas)
+
+        self._lembrar(self.solucoes, chave, (G, sol))
+        return G, sol
+
+    @staticmethod
+    def _contar_travessias(euler_edges, ruas_servico) -> dict:
+        """Primeira passagem por cada rua de serviço = atendimento; as demais travessias = deslocamento."""
+        atendidas = {(min(u, v), max(u, v)) for u, v in euler_edges} & ruas_servico
+        return {"arestas_servico": len(atendidas), "arestas_deslocamento": len(euler_edges) - len(atendidas)}
+
+    def dividir(self, agentes: int, casas_req=None):
+        """Divide o tour entre os agentes e resolve o CPP de cada cluster."""
+        if agentes < 1:
+            raise ValueError("O número de agentes deve ser >= 1.")
+        chave = (self._normalizar_casas(casas_req), agentes)
+        em_cache = self._consultar(self.divisoes, chave)
+        if em_cache is not None:
+            return em_cache
+
+        G, sol = self.resolver(casas_req)
+        if agentes == 1:
+            ruas = {(min(u, v), max(u, v)) for u in G for v in G[u]}
+            resultado = [{
+                "agente": 0,
+                "custo_s": sol["total_cost"],
+                **self._contar_travessias(sol["euler_edges"], ruas),
+            }]
+        else:
+            arestas_tour = [(u, v, G[u][v]) for u, v in sol["euler_edges"]]
+            base = route2.DEPOT_NODE
+            resultado = []
+            for i, cluster in enumerate(route2.dividir_tour(arestas_tour, G, agentes, base)):
+                G_cluster = route2.grafo_do_cluster(cluster)
+                sol_agente = resolver_cpp.resolver_cpp_memoria(G_cluster, inicio=base if base in G_cluster else None)
+                ruas = {(min(a["u"], a["v"]), max(a["u"], a["v"])) for a in cluster if a.get("tipo") == "servico"}
+                resultado.append({
+                    "agente": i,
+                    "custo_s": sol_agente["total_cost"],
+                    **self._contar_travessias(sol_agente["euler_edges"], ruas),
+                })
+
+        self._lembrar(self.divisoes, chave, resultado)
+        return resultado
+
+    def replanejar(self, agentes_req, servidas_req=None, casas_req=None):
+        """Novas rotas a partir das posições atuais e das ruas já atendidas (ver replanejar.py)."""
+        if not agentes_req:
+            raise ValueError("Informe ao menos um agente.")
+        casas = dict(self._normalizar_casas(casas_req))
+        ruas = [(u, v, calcular_peso(d, casas.get((u, v), c)), calcular_peso(d, 0), casas.get((u, v), c) > 0)
+                for (u, v), (d, c) in self.arestas.items() if u != v]
+        agentes = [(int(a["atual"]), int(a.get("base", pipeline.DEPOT_NODE))) for a in agentes_req]
+        servidas = [(int(u), int(v)) for u, v in servidas_req or []]
+        with self.lock:
+            tabelas = dict(self.tabelas_desloc)
+        rotas = replanejar(ruas, agentes, servidas, tabelas)
+        with self.lock:
+            self.tabelas_desloc.update(tabelas)
+        return rotas
+
+# ============= SERVIDOR HTTP =============
+
+def criar_handler(servico: ServicoPlanejamento):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def _responder(self, status: int, corpo: dict):
+            dados = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def _ler_json(self) -> dict:
+            tamanho = int(self.headers.get("Content-Length") or 0)
+            if tamanho == 0:
+                return {}
+            req = json.loads(self.rfile.read(tamanho).decode("utf-8"))
+            if not isinstance(req, dict):
+                raise ValueError("O corpo da requisição deve ser um objeto JSON.")
+            return req
+
+        def do_GET(self):
+            if self.path == "/saude":
+                self._responder(200, {
+                    "status": "ok",
+                    "nos": len(servico.G),
+                    "arestas": len(servico.arestas),
+                    "tabelas_distancia": len(servico.tabelas_base),
+                    "solucoes_em_cache": len(servico.solucoes),
+                })
+            else:
+                self._responder(404, {"erro": f"Rota desconhecida: {self.path}"})
+
+        def do_POST(self):
+            inicio = time.perf_counter()
+            try:
+                req = self._ler_json()
+                if self.path == "/resolver":
+                    G, sol = servico.resolver(req.get("casas"))
+                    corpo = {
+                        "custo_total_s": sol["total_cost"],
+                        "custo_total_h": sol["total_cost"] / 3600,
+                        "nos_impares": len(sol["odd_nodes"]),
+                        "arestas_tour": len(sol["euler_edges"]),
+                    }
+                    if req.get("incluir_tour"):
+                        corpo["tour"] = sol["tour_vertices"]
+                elif self.path == "/dividir":
+                    agentes = servico.dividir(int(req.get("agentes", 1)), req.get("casas"))
+                    corpo = {
+                        "agentes": agentes,
+                        "makespan_h": max(a["custo_s"] for a in agentes) / 3600,
+                    }
+                elif self.path == "/metricas":
+                    num_agentes = int(req.get("agentes", 1))
+                    agentes = servico.dividir(num_agentes, req.get("casas"))
+                    corpo = pipeline.resumir_metricas([a["custo_s"] for a in agentes], num_agentes)
+                elif self.path == "/replanejar":
+                    rotas = servico.replanejar(req.get("agentes"), req.get("servidas"), req.get("casas"))
+                    corpo = {
+                        "agentes": [{
+                            "agente": r["agente"],
+                            "inicio": r["inicio"],
+                            "fim": r["fim"],
+                            "ruas": r["ruas"],
+                            "custo_s": r["total_cost"],
+                            **({"tour": r["tour_vertices"]} if req.get("incluir_tour") else {}),
+                        } for r in rotas],
+                        "makespan_h": max(r["total_cost"] for r in rotas) / 3600,
+                    }
+                else:
+                    self._responder(404, {"erro": f"Rota desconhecida: {self.path}"})
+                    return
+            except (ValueError, KeyError, TypeError, AssertionError, json.JSONDecodeError) as e:
+                self._responder(400, {"erro": str(e)})
+                return
+            except Exception as e:
+                # O serviço fica no ar: o cliente sempre recebe uma resposta
+                traceback.print_exc()
+                self._responder(500, {"erro": f"Erro interno: {e}"})
+                return
+            corpo["tempo_ms"] = (time.perf_counter() - inicio) * 1000
+            self._responder(200, corpo)
+
+    return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço de planejamento com grafo em memória")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--arestas", default=PATH_ARESTAS, help="CSV de arestas com distância e número de casas")
+    args = parser.parse_args()
+
+    servico = ServicoPlanejamento(args.arestas)
+
+    # Aquece o cache com o cenário base
+    servico.resolver()
+
+    servidor = ThreadingHTTPServer((args.host, args.porta), criar_handler(servico))
+    print(f"[OK] Servico ouvindo em http://{args.host}:{args.porta}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\nEncerrando servico...")
+    finally:
+        servidor.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -11,12 +11,18 @@
 # Entrada: dados_processados/vertices_reordenados.csv (para IDs)
 # Entrada: dados_processados/arestas_calc.csv (para pesos)
 # Saída:   dados_processados/matriz_adjacencia.csv
+# Saída:   dados_processados/snapshot_grafo/ (CSR binário, ver snapshot_grafo.py)
 # ----------------------------------------------------------------------
 
 
 import pandas as pd
 import numpy as np
 import os
+import sys
+from snapshot_grafo import gerar_snapshot
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "algoritmo_cpp"))
+from saida_tour import gravacao_atomica
 
 # =============================
 # 0. Definição de Caminhos
@@ -24,6 +30,7 @@ import os
 PATH_VERTICES = r"dados_processados/vertices_reordenados.csv"
 PATH_ARESTAS = r"dados_processados/arestas_com_peso_final.csv"
 PATH_SAIDA = r"dados_processados/matriz_adjacencia.csv"
+DIR_SNAPSHOT = r"dados_processados/snapshot_grafo"
 OUT_DIR = r"dados_processados"
 
 # =============================
@@ -70,6 +77,14 @@ print("4. Salvando matriz...")
 os.makedirs(OUT_DIR, exist_ok=True)
 
 df_mat = pd.DataFrame(mat, index=ids, columns=ids)
-df_mat.to_csv(PATH_SAIDA)
+# Grava em um temporário e renomeia: execuções paralelas nunca leem a matriz pela metade
+with gravacao_atomica(PATH_SAIDA) as tmp_saida:
+    df_mat.to_csv(tmp_saida)
+
+print(f"[OK] Matriz de adjacencia gerada com sucesso: {PATH_SAIDA}")
 
-print(f"[OK] Matriz de adjacencia gerada com sucesso: {PATH_SAIDA}")
\ No newline at end of file
+# =============================
+# 5. Gerar Snapshot Binário
+# =============================
+print("5. Gerando snapshot binário (CSR)...")
+gerar_snapshot(PATH_VERTICES, PATH_ARESTAS, DIR_SNAPSHOT)
@@ -0,0 +1,198 @@
+# ----------------------------------------------------------------------
+# ÍNDICE ESPACIAL DO GRAFO (VÉRTICES E ARESTAS)
+#
+# Liga pontos de GPS coletados em campo aos vértices e às ruas do grafo.
+# É construído uma vez por snapshot (ver snapshot_grafo.py) e guardado
+# em memória pelo hash do snapshot:
+#   - vértices: KD-tree (scipy.spatial.cKDTree; sem scipy, busca em
+#     blocos com NumPy);
+#   - arestas: STRtree do shapely sobre os segmentos retos entre os
+#     vértices (a única geometria que temos).
+# As coordenadas são projetadas em metros (equiretangular em torno da
+# latitude média), o que basta na escala de um bairro/cidade.
+#
+# As consultas recebem arrays de lat/lon e respondem todos os pontos de
+# uma vez (milhares de pontos por chamada).
+#
+# Entrada: dados_processados/snapshot_grafo/
+# Entrada: CSV de pontos com colunas lat, lon (demais colunas são mantidas)
+# Saída:   CSV com vertice, dist_vertice_m, aresta, u, v, fracao, dist_aresta_m
+# ----------------------------------------------------------------------
+
+import argparse
+import math
+import os
+import time
+
+import numpy as np
+
+from snapshot_grafo import DIR_SNAPSHOT, carregar_snapshot
+
+# Raio médio da Terra (m), o mesmo do haversine_m em busca_caminhos.py
+RAIO_TERRA_M = 6_371_000.0
+
+# Pontos por bloco na busca sem scipy (limita a matriz pontos × vértices)
+BLOCO_FORCA_BRUTA = 2048
+
+_INDICES = {}
+
+
+def _cKDTree():
+    try:
+        from scipy.spatial import cKDTree
+        return cKDTree
+    except ImportError:
+        return None
+
+
+class IndiceEspacial:
+    """KD-tree dos vértices + STRtree dos segmentos das arestas, em metros."""
+
+    def __init__(self, ids, coords, aresta_u, aresta_v):
+        """
+        ids: ID original de cada vértice (índice 0..n-1); coords: n×2 (lat, lon);
+        aresta_u/aresta_v: índices dos extremos de cada aresta (uma vez por aresta).
+        """
+        self.ids = np.asarray(ids, dtype=np.int64)
+        coords = np.asarray(coords, dtype=np.float64)
+        self.lat0 = float(coords[:, 0].mean()) if len(coords) else 0.0
+        self.xy = self.projetar(coords[:, 0], coords[:, 1])
+        self.aresta_u = np.asarray(aresta_u, dtype=np.int64)
+        self.aresta_v = np.asarray(aresta_v, dtype=np.int64)
+
+        cKDTree = _cKDTree()
+        self._kdtree = cKDTree(self.xy) if cKDTree is not None and len(self.xy) else None
+
+        import shapely
+        segmentos = np.stack([self.xy[self.aresta_u], self.xy[self.aresta_v]], axis=1)
+        self._arvore_arestas = shapely.STRtree(shapely.linestrings(segmentos)) if len(segmentos) else None
+
+    def projetar(self, lat, lon) -> np.ndarray:
+        """(lat, lon) em graus -> (x, y) em metros no plano local."""
+        lat = np.radians(np.asarray(lat, dtype=np.float64))
+        lon = np.radians(np.asarray(lon, dtype=np.float64))
+        x = RAIO_TERRA_M * lon * math.cos(math.radians(self.lat0))
+        y = RAIO_TERRA_M * lat
+        return np.column_stack([x, y])
+
+    # ------------- Vértices -------------
+
+    def vertices_proximos(self, lat, lon, raio_m: float = np.inf):
+        """
+        Vértice mais próximo de cada ponto. Devolve (ids, dist_m); pontos sem
+        vértice a até 'raio_m' recebem id -1.
+        """
+        p = self.projetar(lat, lon)
+        if self._kdtree is not None:
+            dist, idx = self._kdtree.query(p, k=1, distance_upper_bound=raio_m)
+            validos = np.isfinite(dist)
+            idx = np.where(validos, idx, 0)
+        else:
+            dist = np.full(len(p), np.inf)
+            idx = np.zeros(len(p), dtype=np.int64)
+            for a in range(0, len(p), BLOCO_FORCA_BRUTA):
+                bloco = p[a:a + BLOCO_FORCA_BRUTA]
+                d2 = ((bloco[:, None, :] - self.xy[None, :, :]) ** 2).sum(axis=2)
+                idx[a:a + len(bloco)] = d2.argmin(axis=1)
+                dist[a:a + len(bloco)] = np.sqrt(d2.min(axis=1))
+            validos = dist <= raio_m
+        ids = np.where(validos, self.ids[idx], -1)
+        return ids, np.where(validos, dist, np.inf)
+
+    # ------------- Arestas -------------
+
+    def arestas_proximas(self, lat, lon, raio_m: float = np.inf) -> dict:
+        """
+        Aresta mais próxima de cada ponto. Devolve arrays:
+        aresta (índice, -1 se nenhuma a até 'raio_m'), u, v (IDs originais),
+        fracao (posição da projeção no segmento, 0 = u, 1 = v) e dist_m.
+        """
+        import shapely
+
+        p = self.projetar(lat, lon)
+        n = len(p)
+        aresta = np.full(n, -1, dtype=np.int64)
+        if self._arvore_arestas is not None and n:
+            max_dist = None if np.isinf(raio_m) else raio_m
+            pares = self._arvore_arestas.query_nearest(shapely.points(p), max_distance=max_dist,
+                                                       all_matches=False)
+            aresta[pares[0]] = pares[1]
+
+        ok = aresta >= 0
+        e = np.where(ok, aresta, 0)
+        u, v = np.full(n, -1, dtype=np.int64), np.full(n, -1, dtype=np.int64)
+        fracao, dist = np.zeros(n), np.full(n, np.inf)
+        if len(self.aresta_u):
+            a, b = self.xy[self.aresta_u[e]], self.xy[self.aresta_v[e]]
+            ab = b - a
+            comp2 = np.maximum((ab ** 2).sum(axis=1), 1e-12)
+            t = np.clip(((p - a) * ab).sum(axis=1) / comp2, 0.0, 1.0)
+            proj = a + t[:, None] * ab
+            u = np.where(ok, self.ids[self.aresta_u[e]], -1)
+            v = np.where(ok, self.ids[self.aresta_v[e]], -1)
+            fracao = np.where(ok, t, 0.0)
+            dist = np.where(ok, np.sqrt(((p - proj) ** 2).sum(axis=1)), np.inf)
+        return {"aresta": aresta, "u": u, "v": v, "fracao": fracao, "dist_m": dist}
+
+    def ajustar(self, lat, lon, raio_m: float = np.inf) -> dict:
+        """Vértice e aresta mais próximos de cada ponto (ver os dois métodos acima)."""
+        vertice, dist_vertice = self.vertices_proximos(lat, lon, raio_m)
+        res = self.arestas_proximas(lat, lon, raio_m)
+        return {"vertice": vertice, "dist_vertice_m": dist_vertice,
+                "aresta": res["aresta"], "u": res["u"], "v": res["v"],
+                "fracao": res["fracao"], "dist_aresta_m": res["dist_m"]}
+
+
+def indice_do_snapshot(snap) -> IndiceEspacial:
+    """Índice espacial de um SnapshotGrafo, construído uma única vez por hash do snapshot."""
+    chave = snap.meta.get("hash")
+    if chave in _INDICES:
+        return _INDICES[chave]
+    linhas = np.repeat(np.arange(snap.n), np.diff(snap.indptr))
+    colunas = np.asarray(snap.indices, dtype=np.int64)
+    uma_vez = linhas < colunas
+    indice = IndiceEspacial(snap.ids, snap.coords, linhas[uma_vez], colunas[uma_vez])
+    if chave is not None:
+        _INDICES[chave] = indice
+    return indice
+
+
+def carregar_indice(dir_snapshot: str = DIR_SNAPSHOT) -> IndiceEspacial:
+    return indice_do_snapshot(carregar_snapshot(dir_snapshot))
+
+
+if __name__ == "__main__":
+    import sys
+
+    import pandas as pd
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "algoritmo_cpp"))
+    from saida_tour import gravacao_atomica
+
+    parser = argparse.ArgumentParser(description="Associa pontos de GPS aos vértices e arestas do grafo")
+    parser.add_argument("pontos", help="CSV com colunas lat, lon")
+    parser.add_argument("--snapshot", default=DIR_SNAPSHOT)
+    parser.add_argument("--raio", type=float, default=np.inf, help="Distância máxima (m)")
+    parser.add_argument("--saida", default=None, help="CSV de saída (padrão: <pontos>_ajustado.csv)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    indice = carregar_indice(args.snapshot)
+    t_indice = time.perf_counter() - t0
+
+    df = pd.read_csv(args.pontos)
+    t0 = time.perf_counter()
+    res = indice.ajustar(df["lat"].to_numpy(), df["lon"].to_numpy(), args.raio)
+    t_consulta = time.perf_counter() - t0
+    for coluna, valores in res.items():
+        df[coluna] = valores
+
+    saida = args.saida or f"{os.path.splitext(args.pontos)[0]}_ajustado.csv"
+    with gravacao_atomica(saida) as tmp:
+        df.to_csv(tmp, index=False)
+
+    sem_aresta = int((res["aresta"] < 0).sum())
+    print(f"Indice: {len(indice.ids)} vertices, {len(indice.aresta_u)} arestas ({t_indice * 1000:.1f} ms, "
+          f"KD-tree: {'scipy' if indice._kdtree is not None else 'numpy'})")
+    print(f"{len(df)} ponto(s) ajustados em {t_consulta * 1000:.1f} ms; {sem_aresta} sem aresta no raio")
+    print("Gerado:", saida)
@@ -0,0 +1,222 @@
+# ----------------------------------------------------------------------
+# SNAPSHOT BINÁRIO DO GRAFO (CSR + MEMORY-MAP)
+#
+# Compila a lista de arestas ponderadas e os vértices em arrays NumPy
+# no formato CSR (Compressed Sparse Row), gravados como arquivos .npy
+# individuais. Os consumidores abrem os arrays com mmap_mode="r": o
+# carregamento é praticamente instantâneo e vários processos passam a
+# compartilhar a mesma cópia física do grafo (page cache do SO).
+#
+# Os arrays de cada versão ficam em uma subpasta própria (v-<hash>) e o
+# meta.json, trocado de forma atômica por último, aponta para ela: um
+# leitor rodando junto com uma regeneração abre sempre os arrays de uma
+# única versão. A versão anterior é mantida até a regeneração seguinte.
+#
+# Entrada: dados_processados/vertices_reordenados.csv
+# Entrada: dados_processados/arestas_com_peso_final.csv
+# Saída:   dados_processados/snapshot_grafo/
+#          ├─ v-<hash>/
+#          │  ├─ indptr.npy   (int64, n+1)  início dos vizinhos de cada nó
+#          │  ├─ indices.npy  (int32, 2m)   índice do vizinho
+#          │  ├─ pesos.npy    (float64, 2m) peso da aresta
+#          │  ├─ ids.npy      (int64, n)    índice -> ID original do vértice
+#          │  └─ coords.npy   (float64, n×2) lat, lon
+#          └─ meta.json    (n, m, hash, versao)
+# ----------------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+
+# =============================
+# 0. Definição de Caminhos
+# =============================
+PATH_VERTICES = r"dados_processados/vertices_reordenados.csv"
+PATH_ARESTAS = r"dados_processados/arestas_com_peso_final.csv"
+DIR_SNAPSHOT = r"dados_processados/snapshot_grafo"
+
+ARQUIVOS = ("indptr", "indices", "pesos", "ids", "coords")
+
+
+class SnapshotGrafo:
+    """Arrays CSR do grafo (possivelmente memory-mapped) + metadados."""
+
+    def __init__(self, indptr, indices, pesos, ids, coords, meta):
+        self.indptr = indptr
+        self.indices = indices
+        self.pesos = pesos
+        self.ids = ids
+        self.coords = coords
+        self.meta = meta
+
+    @property
+    def n(self) -> int:
+        return len(self.ids)
+
+    def matriz_csr(self):
+        """scipy.sparse.csr_matrix sobre os próprios arrays (sem montar o grafo em dict)."""
+        from scipy.sparse import csr_matrix
+        return csr_matrix((self.pesos, self.indices, self.indptr), shape=(self.n, self.n))
+
+    def vizinhos(self, i: int):
+        """Índices e pesos dos vizinhos do nó de índice i."""
+        a, b = self.indptr[i], self.indptr[i + 1]
+        return self.indices[a:b], self.pesos[a:b]
+
+
+def _hash_arrays(*arrays) -> str:
+    h = hashlib.sha1()
+    for arr in arrays:
+        h.update(np.ascontiguousarray(arr).tobytes())
+    return h.hexdigest()
+
+
+def gerar_snapshot(path_vertices: str = PATH_VERTICES, path_arestas: str = PATH_ARESTAS,
+                   dir_saida: str = DIR_SNAPSHOT) -> SnapshotGrafo:
+    """
+    Constrói os arrays CSR (grafo simétrico, vizinhos ordenados por índice)
+    e grava o snapshot em 'dir_saida'.
+    """
+    import pandas as pd
+
+    vertices = pd.read_csv(path_vertices)
+    arestas = pd.read_csv(path_arestas)
+
+    ids = vertices["id"].to_numpy(dtype=np.int64)
+    coords = vertices[["lat", "lon"]].to_numpy(dtype=np.float64)
+    n = len(ids)
+
+    # Mapeia IDs -> índices (0..n-1) de forma vetorizada
+    ordem = np.argsort(ids, kind="stable")
+    ids_ordenados = ids[ordem]
+
+    def para_indice(valores):
+        pos = np.searchsorted(ids_ordenados, valores)
+        pos = np.clip(pos, 0, n - 1)
+        validos = ids_ordenados[pos] == valores
+        return ordem[pos], validos
+
+    o, ok_o = para_indice(arestas["origem"].to_numpy(dtype=np.int64))
+    d, ok_d = para_indice(arestas["destino"].to_numpy(dtype=np.int64))
+    w = arestas["peso"].to_numpy(dtype=np.float64)
+
+    if not (ok_o & ok_d).all():
+        print(f"Aviso: {(~(ok_o & ok_d)).sum()} aresta(s) com ID fora da lista de vértices. Pulando.")
+
+    # Mesma semântica da matriz de adjacência: peso 0 = sem aresta,
+    # a última ocorrência de um par prevalece e não há auto-laços.
+    manter = ok_o & ok_d & (o != d)
+    o, d, w = o[manter], d[manter], w[manter]
+    a, b = np.minimum(o, d), np.maximum(o, d)
+    chave = a.astype(np.int64) * n + b
+    _, ultima = np.unique(chave[::-1], return_index=True)
+    sel = len(chave) - 1 - ultima
+    a, b, w = a[sel], b[sel], w[sel]
+    com_aresta = np.isfinite(w) & (w != 0.0)
+    a, b, w = a[com_aresta], b[com_aresta], w[com_aresta]
+
+    # Arestas nos dois sentidos, ordenadas por (linha, coluna)
+    linhas = np.concatenate([a, b])
+    colunas = np.concatenate([b, a])
+    pesos = np.concatenate([w, w])
+    idx = np.lexsort((colunas, linhas))
+    linhas, colunas, pesos = linhas[idx], colunas[idx], pesos[idx]
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(linhas, minlength=n), out=indptr[1:])
+    indices = colunas.astype(np.int32)
+
+    hash_snapshot = _hash_arrays(indptr, indices, pesos, ids, coords)
+    meta = {
+        "n": int(n),
+        "m": int(len(w)),
+        "hash": hash_snapshot,
+        "versao": f"v-{hash_snapshot[:16]}",
+    }
+
+    # Arrays em uma pasta temporária renomeada para v-<hash>; depois o
+    # meta.json (os.replace é atômico) passa a apontar para a nova versão
+    os.makedirs(dir_saida, exist_ok=True)
+    anterior = _versao_atual(dir_saida)
+    dir_versao = os.path.join(dir_saida, meta["versao"])
+    if not os.path.isdir(dir_versao):
+        tmp_dir = os.path.join(dir_saida, f".{meta['versao']}.{os.getpid()}.tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        for nome, arr in zip(ARQUIVOS, (indptr, indices, pesos, ids, coords)):
+            np.save(os.path.join(tmp_dir, f"{nome}.npy"), arr)
+        try:
+            os.rename(tmp_dir, dir_versao)
+        except OSError:
+            # Outro processo publicou a mesma versão ao mesmo tempo
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp = os.path.join(dir_saida, f".meta.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, os.path.join(dir_saida, "meta.json"))
+    _limpar_versoes(dir_saida, manter={meta["versao"], anterior})
+
+    print(f"[OK] Snapshot gerado: {dir_saida} ({meta['n']} nós, {meta['m']} arestas)")
+    return SnapshotGrafo(indptr, indices, pesos, ids, coords, meta)
+
+
+def _versao_atual(dir_snapshot: str):
+    try:
+        with open(os.path.join(dir_snapshot, "meta.json"), encoding="utf-8") as f:
+            return json.load(f).get("versao")
+    except (OSError, ValueError):
+        return None
+
+
+def _limpar_versoes(dir_snapshot: str, manter):
+    """Apaga as versões antigas (e os arrays soltos do formato antigo), exceto as de 'manter'."""
+    for nome in os.listdir(dir_snapshot):
+        caminho = os.path.join(dir_snapshot, nome)
+        if nome.startswith("v-") and os.path.isdir(caminho) and nome not in manter:
+            shutil.rmtree(caminho, ignore_errors=True)
+        elif nome in {f"{a}.npy" for a in ARQUIVOS}:
+            os.remove(caminho)
+
+
+def eh_snapshot(caminho: str) -> bool:
+    return os.path.isdir(caminho) and os.path.exists(os.path.join(caminho, "meta.json"))
+
+
+def carregar_snapshot(dir_snapshot: str = DIR_SNAPSHOT, mmap: bool = True) -> SnapshotGrafo:
+    """
+    Abre o snapshot; com mmap=True os arrays são mapeados (somente leitura).
+    O meta.json é lido primeiro e indica a pasta da versão (todos os arrays
+    vêm dela); snapshots antigos, sem 'versao', têm os arrays na raiz.
+    """
+    if not eh_snapshot(dir_snapshot):
+        raise FileNotFoundError(f"Snapshot não encontrado: {dir_snapshot}")
+    with open(os.path.join(dir_snapshot, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    pasta = os.path.join(dir_snapshot, meta["versao"]) if meta.get("versao") else dir_snapshot
+    modo = "r" if mmap else None
+    arrays = [np.load(os.path.join(pasta, f"{nome}.npy"), mmap_mode=modo) for nome in ARQUIVOS]
+    return SnapshotGrafo(*arrays, meta)
+
+
+def snapshot_para_dict(snap: SnapshotGrafo):
+    """
+    Converte o snapshot no grafo dict-de-dicts usado por resolver_cpp e route2.
+    Saída: (G, nodes) com os IDs originais, como em read_adjacency_csv.
+    """
+    ids = snap.ids.tolist()
+    indptr = snap.indptr.tolist()
+    viz = snap.indices.tolist()
+    pesos = snap.pesos.tolist()
+    G = {}
+    for i, u in enumerate(ids):
+        a, b = indptr[i], indptr[i + 1]
+        G[u] = {ids[j]: w for j, w in zip(viz[a:b], pesos[a:b])}
+    return G, ids
+
+
+if __name__ == "__main__":
+    dir_saida = sys.argv[1] if len(sys.argv) > 1 else DIR_SNAPSHOT
+    gerar_snapshot(dir_saida=dir_saida)
@@ -19,6 +19,9 @@ import contextily as ctx
 import numpy as np
 from moviepy import VideoClip
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "algoritmo_cpp"))
+from saida_tour import existe_tour, ler_tour
+
 def mplfig_to_npimage(fig):
     fig.canvas.draw()
     w, h = fig.canvas.get_width_height()
@@ -32,7 +35,6 @@ def gerar_animacao_agente(agente_id: int, dir_tour: str, output_file: str):
     """Gera animacao para um agente especifico"""
     
     PATH_VERTICES = "dados_processados/vertices_reordenados.csv"
-    tour_file = os.path.join(dir_tour, "tour.csv")
     
     # Configuracoes
     FPS = 30
@@ -42,11 +44,11 @@ def gerar_animacao_agente(agente_id: int, dir_tour: str, output_file: str):
     # Carregar dados
     vdf = pd.read_csv(PATH_VERTICES)
     
-    if not os.path.exists(tour_file):
-        print(f"Erro: {tour_file} nao encontrado")
+    if not existe_tour(dir_tour):
+        print(f"Erro: tour nao encontrado em {dir_tour}")
         return False
     
-    tdf = pd.read_csv(tour_file)
+    tdf = ler_tour(dir_tour)
     
     coord = {
         int(r["id"]): (r["lon"], r["lat"])
@@ -10,9 +10,11 @@
 #
 # Entrada: 3_dados_processados/vertices_reordenados.csv
 # Entrada: 3_dados_processados/arestas_calc.csv
-# Saída:   4_resultados_finais/grafo_final.png
+# Saída:   4_resultados_finais/grafo_final.png (ou o caminho passado
+#          como argumento: visualizar_grafo_estatico.py <saida.png>)
 # ----------------------------------------------------------------------
 
+import sys
 import pandas as pd
 import geopandas as gpd
 import matplotlib.pyplot as plt
@@ -24,7 +26,7 @@ import os
 # =============================
 PATH_VERTICES = r"dados_processados/vertices_reordenados.csv"
 PATH_ARESTAS = r"dados_processados/arestas_calc.csv"
-PATH_SAIDA = r"resultados_finais/grafo_final.png"
+PATH_SAIDA = sys.argv[1] if len(sys.argv) > 1 else r"resultados_finais/grafo_final.png"
 
 # =============================
 # 1. Carregar dados
@@ -12,26 +12,28 @@ import folium
 from folium.plugins import BeautifyIcon
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "algoritmo_cpp"))
+from saida_tour import existe_tour, ler_tour
+
 def gerar_mapa_agente(agente_id: int, dir_tour: str, output_file: str):
     """Gera mapa interativo para um agente específico"""
     
     # Caminhos
     PATH_VERTICES = "dados_processados/vertices_reordenados.csv"
-    tour_file = os.path.join(dir_tour, "tour.csv")
     
     # Verificar se arquivos existem
     if not os.path.exists(PATH_VERTICES):
         print(f"Erro: {PATH_VERTICES} não encontrado")
         return False
     
-    if not os.path.exists(tour_file):
-        print(f"Erro: {tour_file} não encontrado")
+    if not existe_tour(dir_tour):
+        print(f"Erro: tour não encontrado em {dir_tour}")
         return False
     
     # Carregar dados
     print(f"Carregando dados do agente {agente_id}...")
     vdf = pd.read_csv(PATH_VERTICES)
-    tdf = pd.read_csv(tour_file)
+    tdf = ler_tour(dir_tour)
     
     # Criar dicionário de coordenadas
     coord = {
@@ -4,27 +4,52 @@ PIPELINE COMPLETO DE OTIMIZAÇÃO DE ROTAS PARA COLETA DE DADOS IMOBILIÁRIOS
 Este script orquestra todo o processo chamando os scripts existentes na ordem correta.
 
 Uso:
-    python main_pipeline_v2.py <num_agentes>
+    python main.py <num_agentes> [--depositos 0,512,...] [--only solve,split,metrics]
     
 Exemplo:
-    python main_pipeline_v2.py 2
+    python main.py 2
+    python main.py 4 --depositos 0,87   (duas bases; cada rua vai para a mais próxima)
+    python main.py 3 --only solve,split,metrics   (planejamento sem imagens, mapas e vídeos)
+
+As bibliotecas de visualização (pandas, folium, geopandas, moviepy...) só
+são carregadas pelas etapas que as usam.
 """
 
+import argparse
 import sys
 import os
 import time
 import subprocess
-import shutil
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "codigo_fonte", "algoritmo_cpp"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "codigo_fonte", "planejamento"))
+from agendador import Etapa, executar_etapas, imprimir, saida_exclusiva
+from saida_tour import ARQUIVO_COMPONENTES
+
 # ============= CONFIGURAÇÕES =============
 CUSTO_HORA_AGENTE = 50.0
 HORAS_TRABALHO_DIA = 8
+DEPOT_NODE = 0  # Base padrão (vértice 0)
+
+# Etapas do pipeline (--only escolhe um subconjunto)
+#   preparar  -> pesos, matriz e snapshot (passos 1-2)
+#   grafo     -> imagem estática do grafo (passo 3)
+#   solve     -> CPP do tour completo e de cada agente, com as jornadas
+#   split     -> divisão do tour entre os agentes (route2.py)
+#   mapas     -> mapas HTML
+#   metrics   -> relatório de métricas
+#   animacoes -> vídeos MP4
+ETAPAS = ("preparar", "grafo", "solve", "split", "mapas", "metrics", "animacoes")
+PASTA_SNAPSHOT = os.path.join("dados_processados", "snapshot_grafo")
 
 # ============= FUNÇÕES AUXILIARES =============
 
 def obter_proximo_numero_grafo():
-    """Retorna o próximo número sequencial para a pasta de resultados"""
+    """
+    Retorna o próximo número sequencial para a pasta de resultados
+    (considera também as execuções em andamento, grafo-N.parcial)
+    """
     base_dir = "resultados"
     if not os.path.exists(base_dir):
         os.makedirs(base_dir)
@@ -40,7 +65,7 @@ def obter_proximo_numero_grafo():
     numeros = []
     for pasta in pastas:
         try:
-            num = int(pasta.split("-")[1])
+            num = int(pasta.split("-")[1].split(".")[0])
             numeros.append(num)
         except:
             continue
@@ -50,20 +75,61 @@ def obter_proximo_numero_grafo():
     
     return max(numeros) + 1
 
+def reservar_pasta_resultados(base_dir: str = "resultados"):
+    """
+    Reserva atomicamente o número da execução: cria 'grafo-N.parcial'
+    (os.mkdir falha se outra execução já o criou) e tenta o próximo número
+    em caso de conflito. Retorna (num, pasta de trabalho, pasta final).
+    A pasta de trabalho só vira 'grafo-N' (rename atômico) no fim do pipeline.
+    """
+    os.makedirs(base_dir, exist_ok=True)
+    num = obter_proximo_numero_grafo()
+    while True:
+        final = os.path.join(base_dir, f"grafo-{num}")
+        parcial = final + ".parcial"
+        try:
+            os.mkdir(parcial)
+        except FileExistsError:
+            num += 1
+            continue
+        if os.path.exists(final):
+            # Outra execução terminou com este número entre a listagem e o mkdir
+            os.rmdir(parcial)
+            num += 1
+            continue
+        return num, parcial, final
+
+def parse_etapas(texto: str, num_agentes: int) -> set:
+    """
+    Converte '--only solve,split,metrics' no conjunto de etapas a executar,
+    acrescentando as dependências (ex.: metrics e mapas precisam de solve;
+    com vários agentes, solve precisa de split).
+    """
+    if texto is None:
+        return set(ETAPAS)
+    etapas = {e.strip().lower() for e in texto.split(",") if e.strip()}
+    invalidas = etapas - set(ETAPAS)
+    if invalidas or not etapas:
+        raise ValueError(f"Etapa(s) invalida(s): {', '.join(sorted(invalidas)) or texto!r}. Use: {', '.join(ETAPAS)}")
+    if etapas & {"split", "mapas", "metrics", "animacoes"}:
+        etapas.add("solve")
+    if "solve" in etapas and num_agentes > 1:
+        etapas.add("split")
+    if "solve" in etapas and not os.path.isdir(PASTA_SNAPSHOT):
+        etapas.add("preparar")
+    return etapas
+
 def print_header(texto: str):
     """Imprime um cabeçalho formatado"""
     print("\n" + "=" * 80)
     print(f"  {texto}")
     print("=" * 80)
 
-def print_step(numero: int, texto: str):
-    """Imprime um passo do pipeline"""
-    print(f"\n[PASSO {numero}] {texto}")
-    print("-" * 80)
-
 def executar_script(comando: list, descricao: str) -> bool:
-    """Executa um script Python e retorna True se bem-sucedido"""
-    print(f"  -> Executando: {descricao}")
+    """
+    Executa um script Python e retorna True se bem-sucedido.
+    A saída é impressa de uma vez (etapas podem rodar em paralelo).
+    """
     try:
         resultado = subprocess.run(
             comando,
@@ -73,14 +139,13 @@ def executar_script(comando: list, descricao: str) -> bool:
             encoding='utf-8',
             errors='replace'
         )
-        if resultado.stdout:
-            print(resultado.stdout)
+        imprimir(f"  -> Executado: {descricao}" + (f"\n{resultado.stdout}" if resultado.stdout else ""))
         return True
     except subprocess.CalledProcessError as e:
-        print(f"  [X] ERRO ao executar {descricao}")
-        print(f"      Codigo de saida: {e.returncode}")
+        mensagem = [f"  [X] ERRO ao executar {descricao}", f"      Codigo de saida: {e.returncode}"]
         if e.stderr:
-            print(f"      Erro: {e.stderr}")
+            mensagem.append(f"      Erro: {e.stderr}")
+        imprimir("\n".join(mensagem))
         return False
 
 def ler_custo_tour(caminho: str) -> float:
@@ -91,26 +156,83 @@ def ler_custo_tour(caminho: str) -> float:
     except:
         return 0.0
 
-def calcular_metricas(custos_agentes: list, num_agentes: int):
+def ler_depositos(caminho: str) -> dict:
+    """Base de cada agente gravada pelo route2.py ({agente: vértice})"""
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, 'r', encoding='utf-8') as f:
+        linhas = [l.strip().split(",") for l in f if l.strip()][1:]
+    return {int(a): int(d) for a, d in linhas}
+
+def ler_jornadas(dir_tour: str):
+    """Número de jornadas gravadas por jornadas.py (None se não houver)"""
+    caminho = os.path.join(dir_tour, "jornadas.csv")
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return max(sum(1 for linha in f if linha.strip()) - 1, 0)
+
+def resumir_metricas(custos_agentes: list, num_agentes: int, jornadas_agentes: list = None) -> dict:
+    """
+    Calcula as métricas de tempo e custo (sem imprimir nem salvar).
+    'jornadas_agentes' (opcional) traz o número de jornadas de cada agente,
+    já com ida e volta à base (ver codigo_fonte/planejamento/jornadas.py).
+    """
+    tempo_total_seq = sum(custos_agentes)
+    tempo_total_par = max(custos_agentes) if custos_agentes else 0
+    
+    tempo_total_seq_horas = tempo_total_seq / 3600
+    tempo_total_par_horas = tempo_total_par / 3600
+    
+    metricas = {
+        "num_agentes": num_agentes,
+        "custos_min": [c / 60 for c in custos_agentes],
+        "custos_horas": [c / 3600 for c in custos_agentes],
+        "tempo_total_seq": tempo_total_seq,
+        "tempo_total_seq_min": tempo_total_seq / 60,
+        "tempo_total_seq_horas": tempo_total_seq_horas,
+        "tempo_total_par": tempo_total_par,
+        "tempo_total_par_min": tempo_total_par / 60,
+        "tempo_total_par_horas": tempo_total_par_horas,
+        "dias_seq": tempo_total_seq_horas / HORAS_TRABALHO_DIA,
+        "dias_par": tempo_total_par_horas / HORAS_TRABALHO_DIA,
+        "custo_total_seq": tempo_total_seq_horas * CUSTO_HORA_AGENTE,
+        "custo_total_par": tempo_total_par_horas * CUSTO_HORA_AGENTE * num_agentes,
+        "economia_tempo": None,
+    }
+    if num_agentes > 1:
+        metricas["economia_tempo"] = (
+            ((tempo_total_seq - tempo_total_par) / tempo_total_seq) * 100 if tempo_total_seq > 0 else 0.0
+        )
+    jornadas = [j for j in (jornadas_agentes or []) if j is not None]
+    metricas["jornadas_agentes"] = list(jornadas_agentes) if jornadas_agentes else None
+    metricas["jornadas_seq"] = sum(jornadas) if jornadas else None
+    metricas["jornadas_par"] = max(jornadas) if jornadas else None
+    return metricas
+
+def calcular_metricas(custos_agentes: list, num_agentes: int, jornadas_agentes: list = None,
+                      relatorio_file: str = None):
     """Calcula e exibe métricas finais"""
     print_header("METRICAS FINAIS E ANALISE DE CUSTOS")
     
-    custos_min = [c / 60 for c in custos_agentes]
-    custos_horas = [c / 3600 for c in custos_agentes]
+    metricas = resumir_metricas(custos_agentes, num_agentes, jornadas_agentes)
+    custos_min = metricas["custos_min"]
+    custos_horas = metricas["custos_horas"]
     
-    tempo_total_seq = sum(custos_agentes)
-    tempo_total_seq_min = tempo_total_seq / 60
-    tempo_total_seq_horas = tempo_total_seq / 3600
+    tempo_total_seq = metricas["tempo_total_seq"]
+    tempo_total_seq_min = metricas["tempo_total_seq_min"]
+    tempo_total_seq_horas = metricas["tempo_total_seq_horas"]
     
-    tempo_total_par = max(custos_agentes) if custos_agentes else 0
-    tempo_total_par_min = tempo_total_par / 60
-    tempo_total_par_horas = tempo_total_par / 3600
+    tempo_total_par = metricas["tempo_total_par"]
+    tempo_total_par_min = metricas["tempo_total_par_min"]
+    tempo_total_par_horas = metricas["tempo_total_par_horas"]
     
-    dias_seq = tempo_total_seq_horas / HORAS_TRABALHO_DIA
-    dias_par = tempo_total_par_horas / HORAS_TRABALHO_DIA
+    dias_seq = metricas["dias_seq"]
+    dias_par = metricas["dias_par"]
     
-    custo_total_seq = tempo_total_seq_horas * CUSTO_HORA_AGENTE
-    custo_total_par = tempo_total_par_horas * CUSTO_HORA_AGENTE * num_agentes
+    custo_total_seq = metricas["custo_total_seq"]
+    custo_total_par = metricas["custo_total_par"]
+    jornadas_agentes = metricas["jornadas_agentes"] or [None] * len(custos_min)
     
     print(f"\n[DADOS] RESUMO POR AGENTE:")
     print("-" * 80)
@@ -118,6 +240,8 @@ def calcular_metricas(custos_agentes: list, num_agentes: int):
         print(f"  Agente {i}:")
         print(f"    * Tempo de trabalho: {custo_m:.2f} min ({custo_h:.2f} horas)")
         print(f"    * Custo operacional: R$ {custo_h * CUSTO_HORA_AGENTE:.2f}")
+        if jornadas_agentes[i] is not None:
+            print(f"    * Jornadas de {HORAS_TRABALHO_DIA} h (com ida e volta a base): {jornadas_agentes[i]}")
     
     print(f"\n[TEMPO] TEMPO TOTAL:")
     print("-" * 80)
@@ -125,14 +249,18 @@ def calcular_metricas(custos_agentes: list, num_agentes: int):
     print(f"    * {tempo_total_seq_min:.2f} minutos")
     print(f"    * {tempo_total_seq_horas:.2f} horas")
     print(f"    * {dias_seq:.2f} dias uteis")
+    if metricas["jornadas_seq"] is not None:
+        print(f"    * {metricas['jornadas_seq']} jornadas planejadas (soma dos agentes)")
     
     if num_agentes > 1:
         print(f"\n  Paralelo ({num_agentes} agentes simultaneos):")
         print(f"    * {tempo_total_par_min:.2f} minutos")
         print(f"    * {tempo_total_par_horas:.2f} horas")
         print(f"    * {dias_par:.2f} dias uteis")
+        if metricas["jornadas_par"] is not None:
+            print(f"    * {metricas['jornadas_par']} dias planejados (agente com mais jornadas)")
         
-        economia_tempo = ((tempo_total_seq - tempo_total_par) / tempo_total_seq) * 100
+        economia_tempo = metricas["economia_tempo"]
         print(f"\n  [DICA] Economia de tempo: {economia_tempo:.1f}%")
     
     print(f"\n[CUSTO] CUSTOS OPERACIONAIS:")
@@ -153,7 +281,8 @@ def calcular_metricas(custos_agentes: list, num_agentes: int):
             print(f"    * Economia: R$ {economia:.2f} (-{(economia/custo_total_seq)*100:.1f}%)")
     
     # Salvar relatório
-    relatorio_file = f"resultados_finais/relatorio_metricas_{num_agentes}_agentes.txt"
+    if relatorio_file is None:
+        relatorio_file = f"resultados_finais/relatorio_metricas_{num_agentes}_agentes.txt"
     with open(relatorio_file, 'w', encoding='utf-8') as f:
         f.write("=" * 80 + "\n")
         f.write("RELATORIO DE METRICAS E CUSTOS OPERACIONAIS\n")
@@ -164,7 +293,10 @@ def calcular_metricas(custos_agentes: list, num_agentes: int):
         f.write("RESUMO POR AGENTE:\n")
         f.write("-" * 80 + "\n")
         for i, (custo_m, custo_h) in enumerate(zip(custos_min, custos_horas)):
-            f.write(f"Agente {i}: {custo_m:.2f} min ({custo_h:.2f} h) - R$ {custo_h * CUSTO_HORA_AGENTE:.2f}\n")
+            f.write(f"Agente {i}: {custo_m:.2f} min ({custo_h:.2f} h) - R$ {custo_h * CUSTO_HORA_AGENTE:.2f}")
+            if jornadas_agentes[i] is not None:
+                f.write(f" - {jornadas_agentes[i]} jornada(s)")
+            f.write("\n")
         
         f.write(f"\nTEMPO TOTAL:\n")
         f.write("-" * 80 + "\n")
@@ -172,6 +304,11 @@ def calcular_metricas(custos_agentes: list, num_agentes: int):
         if num_agentes > 1:
             f.write(f"Paralelo: {tempo_total_par_horas:.2f} h ({dias_par:.2f} dias)\n")
             f.write(f"Economia: {economia_tempo:.1f}%\n")
+        if metricas["jornadas_seq"] is not None:
+            f.write(f"Jornadas planejadas de {HORAS_TRABALHO_DIA} h: {metricas['jornadas_seq']} no total")
+            if num_agentes > 1:
+                f.write(f", {metricas['jornadas_par']} dias em paralelo")
+            f.write("\n")
         
         f.write(f"\nCUSTOS OPERACIONAIS:\n")
         f.write("-" * 80 + "\n")
@@ -181,13 +318,153 @@ def calcular_metricas(custos_agentes: list, num_agentes: int):
     
     print(f"\n  [OK] Relatorio salvo: {relatorio_file}")
 
+# ============= VISUALIZAÇÕES (importações sob demanda) =============
+
+def gerar_mapa_consolidado(dir_resultados: str, dir_visualizacoes: str, num_agentes: int, depositos: list):
+    """Mapa HTML com as rotas de todos os agentes e as bases"""
+    import pandas as pd
+    import folium
+    from saida_tour import existe_tour, ler_tour
+    
+    output_consolidado = os.path.join(dir_visualizacoes, f"mapa_todos_{num_agentes}_agentes.html")
+    
+    PATH_VERTICES = "dados_processados/vertices_reordenados.csv"
+    vdf = pd.read_csv(PATH_VERTICES)
+    coord = {int(r["id"]): (r["lat"], r["lon"]) for _, r in vdf.iterrows()}
+    
+    cores = ["#FF0000", "#00FF00", "#0000FF", "#FFFF00", "#FF00FF", "#00FFFF"]
+    
+    lat_media = vdf["lat"].mean()
+    lon_media = vdf["lon"].mean()
+    m = folium.Map(location=[lat_media, lon_media], zoom_start=15, tiles=None)
+    
+    for agente_id in range(num_agentes):
+        dir_agente = os.path.join(dir_resultados, f"agente_{agente_id}")
+        if not existe_tour(dir_agente):
+            continue
+        
+        tdf = ler_tour(dir_agente)
+        tour = tdf["vertex"].tolist()
+        
+        if not tour:
+            continue
+        
+        cor = cores[agente_id % len(cores)]
+        fg = folium.FeatureGroup(name=f"Agente {agente_id}", show=True)
+        
+        polyline_coords = []
+        for v in tour:
+            if v in coord:
+                polyline_coords.append(coord[v])
+        
+        folium.PolyLine(
+            locations=polyline_coords,
+            weight=4,
+            color=cor,
+            tooltip=f"Agente {agente_id}",
+            opacity=0.8
+        ).add_to(fg)
+        
+        fg.add_to(m)
+    
+    # Adicionar marker de cada BASE
+    for base in depositos:
+        if base in coord:
+            folium.Marker(
+                location=coord[base],
+                popup=f"BASE - Ponto de Partida e Retorno (Vertice {base})",
+                icon=folium.Icon(color='blue', icon='home', prefix='fa'),
+                tooltip="Base dos Agentes"
+            ).add_to(m)
+    
+    esri_imagery_url = "https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}"
+    folium.TileLayer(tiles=esri_imagery_url, attr="Tiles © Esri", name="Esri WorldImagery", overlay=False, control=True).add_to(m)
+    
+    folium.LayerControl(position='topright', collapsed=False, autoZIndex=True).add_to(m)
+    
+    m.save(output_consolidado)
+    print(f"  [OK] Mapa consolidado salvo: {output_consolidado}")
+
+def gerar_mapa_unico(dir_tour: str, dir_visualizacoes: str, base: int):
+    """Mapa HTML do tour completo (modo de agente único)"""
+    import pandas as pd
+    import folium
+    from saida_tour import ler_tour
+    
+    output_mapa = os.path.join(dir_visualizacoes, "mapa_cpp.html")
+    
+    PATH_VERTICES = "dados_processados/vertices_reordenados.csv"
+    vdf = pd.read_csv(PATH_VERTICES)
+    tdf = ler_tour(dir_tour)
+    
+    coord = {int(r["id"]): (r["lat"], r["lon"]) for _, r in vdf.iterrows()}
+    tour = tdf["vertex"].tolist()
+    
+    if not tour:
+        return
+    
+    lat0, lon0 = coord[tour[0]]
+    m = folium.Map(location=[lat0, lon0], zoom_start=16, tiles=None)
+    
+    # Adicionar rota
+    polyline_coords = []
+    for v in tour:
+        if v in coord:
+            polyline_coords.append(coord[v])
+    
+    folium.PolyLine(
+        locations=polyline_coords,
+        weight=4,
+        color="#00A3FF",
+        tooltip="Caminho CPP"
+    ).add_to(m)
+    
+    # Adicionar marker da BASE
+    if base in coord:
+        folium.Marker(
+            location=coord[base],
+            popup=f"BASE - Ponto de Partida e Retorno (Vertice {base})",
+            icon=folium.Icon(color='blue', icon='home', prefix='fa'),
+            tooltip="Base do Agente"
+        ).add_to(m)
+    
+    # Adicionar camada de satélite
+    esri_imagery_url = "https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}"
+    folium.TileLayer(
+        tiles=esri_imagery_url,
+        attr="Tiles © Esri",
+        name="Esri WorldImagery",
+        overlay=False,
+        control=True,
+    ).add_to(m)
+    
+    folium.LayerControl().add_to(m)
+    
+    m.save(output_mapa)
+    print(f"  [OK] Mapa salvo: {output_mapa}")
+
 # ============= PIPELINE PRINCIPAL =============
 
 def main():
     """Função principal que executa todo o pipeline"""
     
+    parser = argparse.ArgumentParser(description="Pipeline de otimizacao de rotas")
+    parser.add_argument("num_agentes", nargs="?", help="Numero de agentes (sem ele, modo interativo)")
+    parser.add_argument("--depositos", default=str(DEPOT_NODE), metavar="V1,V2,...",
+                        help="Vertices das bases dos agentes (padrao: 0)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Maximo de etapas executadas ao mesmo tempo")
+    parser.add_argument("--only", default=None, metavar="ETAPAS",
+                        help=f"Executa so estas etapas, separadas por virgula ({', '.join(ETAPAS)}); "
+                             "ex.: solve,split,metrics para planejar sem visualizacoes")
+    args = parser.parse_args()
+    try:
+        depositos = [int(d) for d in args.depositos.split(",") if d.strip()] or [DEPOT_NODE]
+    except ValueError:
+        parser.error("--depositos deve ser uma lista de vertices, ex.: 0,87")
+    
     # Verificar argumentos
-    if len(sys.argv) < 2:
+    if args.num_agentes is None:
         print("=" * 80)
         print("PIPELINE DE OTIMIZACAO DE ROTAS")
         print("=" * 80)
@@ -208,12 +485,12 @@ def main():
             print("[ERRO] Entrada invalida ou operacao cancelada")
             print()
             print("[DICA] Voce tambem pode executar diretamente:")
-            print("   python main_pipeline_v2.py <num_agentes>")
-            print("   Exemplo: python main_pipeline_v2.py 2")
+            print("   python main.py <num_agentes>")
+            print("   Exemplo: python main.py 2")
             sys.exit(1)
     else:
         try:
-            num_agentes = int(sys.argv[1])
+            num_agentes = int(args.num_agentes)
             if num_agentes < 1:
                 raise ValueError("Numero de agentes deve ser >= 1")
         except ValueError as e:
@@ -221,347 +498,238 @@ def main():
             print("O numero de agentes deve ser um inteiro positivo")
             sys.exit(1)
     
+    try:
+        etapas = parse_etapas(args.only, num_agentes)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    if num_agentes > 1 and len(depositos) > num_agentes:
+        print(f"[X] {len(depositos)} bases para {num_agentes} agente(s): e preciso ao menos um agente por base")
+        sys.exit(1)
+    
     # Início
     inicio_total = time.time()
     
-    # Obter número sequencial e criar pasta de resultados
-    num_grafo = obter_proximo_numero_grafo()
-    DIR_RESULTADOS = f"resultados/grafo-{num_grafo}"
+    # Reservar o número da execução; tudo é gravado em grafo-N.parcial e
+    # renomeado para grafo-N no fim (execuções paralelas não se misturam)
+    num_grafo, DIR_RESULTADOS, DIR_FINAL = reservar_pasta_resultados()
     DIR_VISUALIZACOES = os.path.join(DIR_RESULTADOS, "visualizacoes")
     DIR_TOUR = os.path.join(DIR_RESULTADOS, "relatorio_tour")
+    DIR_CLUSTERS = os.path.join(DIR_RESULTADOS, "clusters")
     
     print_header(f"PIPELINE DE OTIMIZACAO DE ROTAS - {num_agentes} AGENTE(S)")
     print(f"Inicio: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
-    print(f"Pasta de resultados: {DIR_RESULTADOS}")
+    print(f"Execucao: grafo-{num_grafo} (em andamento: {DIR_RESULTADOS})")
+    print(f"Base(s): {', '.join(map(str, depositos))}")
+    if args.only is not None:
+        print(f"Etapas: {', '.join(e for e in ETAPAS if e in etapas)}")
     
     # Criar diretórios necessários
     os.makedirs(DIR_RESULTADOS, exist_ok=True)
-    os.makedirs(DIR_VISUALIZACOES, exist_ok=True)
+    if etapas & {"mapas", "animacoes"}:
+        os.makedirs(DIR_VISUALIZACOES, exist_ok=True)
     os.makedirs(DIR_TOUR, exist_ok=True)
     
-    # ===== PASSO 1: Calcular pesos com casas =====
-    print_step(1, "Calculando pesos das arestas (distancia + tempo de servico)")
-    if not executar_script(
-        ["python", "calcular_peso_com_casas.py"],
-        "calcular_peso_com_casas.py"
-    ):
-        print("[X] Falha no calculo de pesos")
-        sys.exit(1)
-    
-    # ===== PASSO 2: Gerar matriz de adjacência =====
-    print_step(2, "Gerando matriz de adjacencia")
-    if not executar_script(
-        ["python", "codigo_fonte/setup_grafo/gerar_matriz_adjacencia.py"],
-        "gerar_matriz_adjacencia.py"
-    ):
-        print("[X] Falha na geracao da matriz")
-        sys.exit(1)
-    
-    # ===== PASSO 3: Visualizar grafo estático =====
-    print_step(3, "Gerando visualizacao do grafo estatico")
-    executar_script(
-        ["python", "codigo_fonte/visualizacao/visualizar_grafo_estatico.py"],
-        "visualizar_grafo_estatico.py"
-    )
-    
-    # ===== PASSO 4: Resolver CPP inicial =====
-    print_step(4, "Resolvendo Problema do Carteiro Chines (CPP) - Tour completo")
-    
-    # Temporariamente mover para resultados_finais (o script resolver_cpp.py usa esse caminho fixo)
-    # Depois vamos mover para a pasta correta
-    if not executar_script(
-        ["python", "codigo_fonte/algoritmo_cpp/resolver_cpp.py", "dados_processados/matriz_adjacencia.csv"],
-        "resolver_cpp.py"
-    ):
-        print("[X] Falha na resolucao do CPP")
-        sys.exit(1)
-    
-    # Mover resultados para a pasta correta
-    if os.path.exists("resultados_finais/relatorio_tour"):
-        import shutil
-        for arquivo in os.listdir("resultados_finais/relatorio_tour"):
-            origem = os.path.join("resultados_finais/relatorio_tour", arquivo)
-            destino = os.path.join(DIR_TOUR, arquivo)
-            if os.path.isfile(origem):
-                shutil.copy2(origem, destino)
+    # ===== ETAPAS E DEPENDÊNCIAS =====
+    # Cada etapa roda assim que as suas dependências terminam (até --workers
+    # ao mesmo tempo). Ex.: a imagem estática do grafo não depende do CPP, e
+    # mapas/animações de um agente só dependem do tour desse agente.
+    custos = {}
+    jornadas = {}
+    base_agente = {}
+    dirs_agente = ([os.path.join(DIR_RESULTADOS, f"agente_{i}") for i in range(num_agentes)]
+                   if num_agentes > 1 else [DIR_TOUR])
+    
+    def etapa_pesos():
+        return executar_script(["python", "calcular_peso_com_casas.py"], "calcular_peso_com_casas.py")
+    
+    def etapa_matriz():
+        return executar_script(["python", "codigo_fonte/setup_grafo/gerar_matriz_adjacencia.py"],
+                               "gerar_matriz_adjacencia.py")
+    
+    def etapa_grafo_estatico():
+        return executar_script(
+            ["python", "codigo_fonte/visualizacao/visualizar_grafo_estatico.py",
+             os.path.join(DIR_RESULTADOS, "grafo_final.png")],
+            "visualizar_grafo_estatico.py"
+        )
     
-    custos_agentes = []
+    def etapa_cpp_completo():
+        if not executar_script(
+            ["python", "codigo_fonte/algoritmo_cpp/resolver_cpp.py", PASTA_SNAPSHOT,
+             "--inicio", str(depositos[0]), "--saida", DIR_TOUR],
+            "resolver_cpp.py"
+        ):
+            return False
+        if os.path.exists(os.path.join(DIR_TOUR, ARQUIVO_COMPONENTES)):
+            # Sem tour único: divisão, jornadas e mapas precisam de um percurso contíguo
+            imprimir(f"  [X] Grafo desconexo: um tour por componente em {DIR_TOUR} ({ARQUIVO_COMPONENTES})")
+            return False
+        return True
     
-    # ===== PASSO 5: Dividir em clusters (se múltiplos agentes) =====
-    if num_agentes > 1:
-        print_step(5, f"Dividindo tour em {num_agentes} clusters")
-        
-        # Modificar route2.py temporariamente
-        with open("route2.py", 'r', encoding='utf-8') as f:
-            conteudo_original = f.read()
-        
-        conteudo_modificado = conteudo_original.replace(
-            "NUM_AGENTES = 3",
-            f"NUM_AGENTES = {num_agentes}"
+    def etapa_divisao():
+        ok = executar_script(
+            ["python", "route2.py", "--agentes", str(num_agentes),
+             "--depositos", ",".join(map(str, depositos)),
+             "--tour", DIR_TOUR, "--saida", DIR_CLUSTERS],
+            "route2.py (divisao em clusters)"
         )
-        
-        with open("route2_temp.py", 'w', encoding='utf-8') as f:
-            f.write(conteudo_modificado)
-        
+        base_agente.update(ler_depositos(os.path.join(DIR_CLUSTERS, "depositos.csv")))
+        return ok
+    
+    def etapa_cpp_agente(i):
+        matriz_cluster = os.path.join(DIR_CLUSTERS, f"matriz_agente_{i}.csv")
+        if not os.path.exists(matriz_cluster):
+            imprimir(f"  [X] Matriz do cluster {i} nao encontrada")
+            return False
+        dir_agente = dirs_agente[i]
+        os.makedirs(dir_agente, exist_ok=True)
+        base = base_agente.get(i, depositos[0])
         if not executar_script(
-            ["python", "route2_temp.py"],
-            "route2.py (divisao em clusters)"
+            ["python", "codigo_fonte/algoritmo_cpp/resolver_cpp.py", matriz_cluster,
+             "--inicio", str(base), "--saida", dir_agente],
+            f"resolver_cpp.py (agente {i}, base {base})"
         ):
-            print("[X] Falha na divisao em clusters")
-            if os.path.exists("route2_temp.py"):
-                os.remove("route2_temp.py")
-            sys.exit(1)
-        
-        if os.path.exists("route2_temp.py"):
-            os.remove("route2_temp.py")
-        
-        # ===== PASSO 6: Resolver CPP para cada cluster =====
-        print_step(6, f"Resolvendo CPP para cada um dos {num_agentes} agentes")
-        
-        for i in range(num_agentes):
-            matriz_cluster = f"dados_processados/clusters_finais/matriz_agente_{i}.csv"
-            
-            if not os.path.exists(matriz_cluster):
-                print(f"  [X] Matriz do cluster {i} nao encontrada")
-                continue
-            
-            # Criar diretório para este agente
-            dir_agente = os.path.join(DIR_RESULTADOS, f"agente_{i}")
-            os.makedirs(dir_agente, exist_ok=True)
-            
-            print(f"\n  -> Resolvendo CPP para agente {i}...")
-            
-            # Executar resolver_cpp.py
-            if executar_script(
-                ["python", "codigo_fonte/algoritmo_cpp/resolver_cpp.py", matriz_cluster],
-                f"resolver_cpp.py (agente {i})"
-            ):
-                # Mover arquivos para o diretório do agente
-                arquivos_tour = ["tour.csv", "tour_cost.txt", "tour_detalhado.csv", "matching_paths.csv"]
-                for arquivo in arquivos_tour:
-                    origem = f"resultados_finais/relatorio_tour/{arquivo}"
-                    destino = f"{dir_agente}/{arquivo}"
-                    if os.path.exists(origem):
-                        shutil.move(origem, destino)
-                
-                # Ler custo
-                custo_file = f"{dir_agente}/tour_cost.txt"
-                custo = ler_custo_tour(custo_file)
-                custos_agentes.append(custo)
-                print(f"  [OK] Agente {i}: Custo = {custo:.2f}s ({custo/60:.2f} min)")
-        
-        # ===== PASSO 7: Gerar visualizações =====
-        print_step(7, "Gerando visualizacoes")
-        
-        # Mapa individual para cada agente
-        for i in range(num_agentes):
-            dir_agente = os.path.join(DIR_RESULTADOS, f"agente_{i}")
-            output_file = os.path.join(DIR_VISUALIZACOES, f"mapa_agente_{i}.html")
-            
-            executar_script(
-                ["python", "codigo_fonte/visualizacao/visualizar_mapa_agente.py", 
-                 str(i), dir_agente, output_file],
-                f"Mapa do agente {i}"
-            )
-        
-        # Mapa consolidado com todos os agentes
-        print(f"\n  -> Gerando mapa consolidado com todos os {num_agentes} agentes...")
-        
-        # Gerar mapa consolidado diretamente
-        output_consolidado = os.path.join(DIR_VISUALIZACOES, f"mapa_todos_{num_agentes}_agentes.html")
-        
-        # Criar script inline para gerar o mapa
-        import pandas as pd
-        import folium
-        
-        PATH_VERTICES = "dados_processados/vertices_reordenados.csv"
-        vdf = pd.read_csv(PATH_VERTICES)
-        coord = {int(r["id"]): (r["lat"], r["lon"]) for _, r in vdf.iterrows()}
-        
-        cores = ["#FF0000", "#00FF00", "#0000FF", "#FFFF00", "#FF00FF", "#00FFFF"]
-        
-        lat_media = vdf["lat"].mean()
-        lon_media = vdf["lon"].mean()
-        m = folium.Map(location=[lat_media, lon_media], zoom_start=15, tiles=None)
-        
-        # A BASE é sempre o vértice 0 (DEPOT_NODE)
-        DEPOT_NODE = 0
-        base_coord = coord.get(DEPOT_NODE)
-        
-        for agente_id in range(num_agentes):
-            dir_agente = os.path.join(DIR_RESULTADOS, f"agente_{agente_id}")
-            tour_file = os.path.join(dir_agente, "tour.csv")
-            
-            if not os.path.exists(tour_file):
-                continue
-            
-            tdf = pd.read_csv(tour_file)
-            tour = tdf["vertex"].tolist()
-            
-            if not tour:
-                continue
-            
-            cor = cores[agente_id % len(cores)]
-            fg = folium.FeatureGroup(name=f"Agente {agente_id}", show=True)
-            
-            polyline_coords = []
-            for v in tour:
-                if v in coord:
-                    polyline_coords.append(coord[v])
-            
-            folium.PolyLine(
-                locations=polyline_coords,
-                weight=4,
-                color=cor,
-                tooltip=f"Agente {agente_id}",
-                opacity=0.8
-            ).add_to(fg)
-            
-            fg.add_to(m)
-        
-        # Adicionar marker da BASE (vértice 0)
-        if base_coord:
-            folium.Marker(
-                location=base_coord,
-                popup="BASE - Ponto de Partida e Retorno (Vertice 0)",
-                icon=folium.Icon(color='blue', icon='home', prefix='fa'),
-                tooltip="Base dos Agentes"
-            ).add_to(m)
-        
-        esri_imagery_url = "https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}"
-        folium.TileLayer(tiles=esri_imagery_url, attr="Tiles © Esri", name="Esri WorldImagery", overlay=False, control=True).add_to(m)
-        
-        folium.LayerControl(position='topright', collapsed=False, autoZIndex=True).add_to(m)
-        
-        m.save(output_consolidado)
-        print(f"  [OK] Mapa consolidado salvo: {output_consolidado}")
+            return False
+        custos[i] = ler_custo_tour(os.path.join(dir_agente, "tour_cost.txt"))
+        imprimir(f"  [OK] Agente {i}: Custo = {custos[i]:.2f}s ({custos[i]/60:.2f} min)")
+        return True
     
-    else:
-        # Um único agente
-        print_step(5, "Modo de agente unico - usando tour completo")
-        
-        custo_file = os.path.join(DIR_TOUR, "tour_cost.txt")
-        custo = ler_custo_tour(custo_file)
-        custos_agentes.append(custo)
-        print(f"  [OK] Custo total: {custo:.2f}s ({custo/60:.2f} min)")
-        
-        # ===== PASSO 6: Gerar visualizações =====
-        print_step(6, "Gerando visualizacoes (mapas)")
-        
-        # Gerar mapa interativo diretamente
-        output_mapa = os.path.join(DIR_VISUALIZACOES, "mapa_cpp.html")
-        
-        import pandas as pd
-        import folium
-        
-        PATH_VERTICES = "dados_processados/vertices_reordenados.csv"
-        tour_file = os.path.join(DIR_TOUR, "tour.csv")
-        
-        vdf = pd.read_csv(PATH_VERTICES)
-        tdf = pd.read_csv(tour_file)
-        
-        coord = {int(r["id"]): (r["lat"], r["lon"]) for _, r in vdf.iterrows()}
-        tour = tdf["vertex"].tolist()
-        
-        if tour:
-            lat0, lon0 = coord[tour[0]]
-            m = folium.Map(location=[lat0, lon0], zoom_start=16, tiles=None)
-            
-            # Adicionar rota
-            polyline_coords = []
-            for v in tour:
-                if v in coord:
-                    polyline_coords.append(coord[v])
-            
-            folium.PolyLine(
-                locations=polyline_coords,
-                weight=4,
-                color="#00A3FF",
-                tooltip="Caminho CPP"
-            ).add_to(m)
-            
-            # Adicionar marker da BASE (vértice 0)
-            DEPOT_NODE = 0
-            if DEPOT_NODE in coord:
-                folium.Marker(
-                    location=coord[DEPOT_NODE],
-                    popup="BASE - Ponto de Partida e Retorno (Vertice 0)",
-                    icon=folium.Icon(color='blue', icon='home', prefix='fa'),
-                    tooltip="Base do Agente"
-                ).add_to(m)
-            
-            # Adicionar camada de satélite
-            esri_imagery_url = "https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}"
-            folium.TileLayer(
-                tiles=esri_imagery_url,
-                attr="Tiles © Esri",
-                name="Esri WorldImagery",
-                overlay=False,
-                control=True,
-            ).add_to(m)
-            
-            folium.LayerControl().add_to(m)
-            
-            m.save(output_mapa)
-            print(f"  [OK] Mapa salvo: {output_mapa}")
+    def etapa_custo_unico():
+        if len(depositos) > 1:
+            imprimir(f"  [!] Um agente: usando apenas a base {depositos[0]}")
+        custos[0] = ler_custo_tour(os.path.join(DIR_TOUR, "tour_cost.txt"))
+        imprimir(f"  [OK] Custo total: {custos[0]:.2f}s ({custos[0]/60:.2f} min)")
+        return True
     
-    # ===== PASSO 7/8: Calcular métricas finais =====
-    passo_metricas = 8 if num_agentes > 1 else 7
-    print_step(passo_metricas, "Calculando metricas finais e custos operacionais")
+    def etapa_jornadas(i):
+        # Dividir o tour em jornadas de HORAS_TRABALHO_DIA (ida e volta à base)
+        if i not in custos:
+            return False
+        base = base_agente.get(i, depositos[0])
+        ok = executar_script(
+            ["python", "codigo_fonte/planejamento/jornadas.py", dirs_agente[i],
+             "--horas", str(HORAS_TRABALHO_DIA), "--base", str(base)],
+            f"jornadas.py (agente {i})"
+        )
+        jornadas[i] = ler_jornadas(dirs_agente[i])
+        return ok
+    
+    def etapa_linha_tempo():
+        from linha_tempo import gerar_linha_tempo
+        caminho = gerar_linha_tempo(DIR_RESULTADOS, dirs_agente)
+        imprimir(f"  [OK] Linha do tempo dos agentes: {caminho}")
+    
+    def etapa_mapa_agente(i):
+        return executar_script(
+            ["python", "codigo_fonte/visualizacao/visualizar_mapa_agente.py",
+             str(i), dirs_agente[i], os.path.join(DIR_VISUALIZACOES, f"mapa_agente_{i}.html")],
+            f"Mapa do agente {i}"
+        )
     
-    # Salvar relatório na pasta correta
-    relatorio_file_original = f"resultados_finais/relatorio_metricas_{num_agentes}_agentes.txt"
-    relatorio_file = os.path.join(DIR_RESULTADOS, f"relatorio_metricas_{num_agentes}_agentes.txt")
+    def etapa_mapa_consolidado():
+        gerar_mapa_consolidado(DIR_RESULTADOS, DIR_VISUALIZACOES, num_agentes, depositos)
     
-    calcular_metricas(custos_agentes, num_agentes)
+    def etapa_mapa_unico():
+        gerar_mapa_unico(DIR_TOUR, DIR_VISUALIZACOES, depositos[0])
     
-    # Mover relatório para pasta correta
-    if os.path.exists(relatorio_file_original):
-        import shutil
-        shutil.move(relatorio_file_original, relatorio_file)
+    def etapa_metricas():
+        agentes = sorted(custos)
+        relatorio_file = os.path.join(DIR_RESULTADOS, f"relatorio_metricas_{num_agentes}_agentes.txt")
+        with saida_exclusiva():
+            calcular_metricas([custos[i] for i in agentes], num_agentes,
+                              [jornadas.get(i) for i in agentes], relatorio_file)
     
-    # ===== PASSO FINAL: Gerar animações =====
-    passo_animacao = passo_metricas + 1
-    print_step(passo_animacao, "Gerando animacoes (ULTIMO PASSO - pode demorar)")
+    def etapa_animacao(i):
+        nome = f"animacao_agente_{i}.mp4" if num_agentes > 1 else "animacao_cpp.mp4"
+        return executar_script(
+            ["python", "codigo_fonte/visualizacao/visualizar_animacao_agente.py",
+             str(i), dirs_agente[i], os.path.join(DIR_VISUALIZACOES, nome)],
+            f"Animacao do agente {i}"
+        )
     
+    # (nome, grupo do --only, função, dependências, crítica, descrição)
+    definicoes = [
+        ("pesos", "preparar", etapa_pesos, [], True, "Pesos das arestas (distancia + tempo de servico)"),
+        ("matriz", "preparar", etapa_matriz, ["pesos"], True, "Matriz de adjacencia e snapshot"),
+        ("grafo_estatico", "grafo", etapa_grafo_estatico, [], False, "Imagem estatica do grafo"),
+        ("cpp_completo", "solve", etapa_cpp_completo, ["matriz"], True, "CPP do tour completo"),
+    ]
     if num_agentes > 1:
-        # Animações para cada agente
+        definicoes.append(("divisao", "split", etapa_divisao, ["cpp_completo"], True,
+                           f"Divisao do tour em {num_agentes} clusters"))
+        tours = []
         for i in range(num_agentes):
-            dir_agente = os.path.join(DIR_RESULTADOS, f"agente_{i}")
-            output_file = os.path.join(DIR_VISUALIZACOES, f"animacao_agente_{i}.mp4")
-            
-            print(f"\n  -> Agente {i}...")
-            executar_script(
-                ["python", "codigo_fonte/visualizacao/visualizar_animacao_agente.py",
-                 str(i), dir_agente, output_file],
-                f"Animacao do agente {i}"
-            )
+            definicoes += [
+                (f"cpp_agente_{i}", "solve", lambda i=i: etapa_cpp_agente(i), ["divisao"], False,
+                 f"CPP do agente {i}"),
+                (f"jornadas_{i}", "solve", lambda i=i: etapa_jornadas(i), [f"cpp_agente_{i}"], False,
+                 f"Jornadas do agente {i}"),
+                (f"mapa_agente_{i}", "mapas", lambda i=i: etapa_mapa_agente(i), [f"cpp_agente_{i}"], False,
+                 f"Mapa do agente {i}"),
+                (f"animacao_{i}", "animacoes", lambda i=i: etapa_animacao(i), [f"cpp_agente_{i}"], False,
+                 f"Animacao do agente {i}"),
+            ]
+            tours.append(f"cpp_agente_{i}")
+        definicoes.append(("mapa_consolidado", "mapas", etapa_mapa_consolidado, tours, False,
+                           "Mapa consolidado"))
+        definicoes.append(("linha_tempo", "solve", etapa_linha_tempo, [f"jornadas_{i}" for i in range(num_agentes)],
+                           False, "Linha do tempo (posicao e previsao de passagem)"))
+        definicoes.append(("metricas", "metrics", etapa_metricas, [f"jornadas_{i}" for i in range(num_agentes)],
+                           False, "Metricas finais e custos operacionais"))
     else:
-        # Animação única
-        output_file = os.path.join(DIR_VISUALIZACOES, "animacao_cpp.mp4")
-        print(f"\n  -> Gerando animacao...")
-        executar_script(
-            ["python", "codigo_fonte/visualizacao/visualizar_animacao_agente.py",
-             "0", DIR_TOUR, output_file],
-            "Animacao da rota"
-        )
+        definicoes += [
+            ("custo_unico", "solve", etapa_custo_unico, ["cpp_completo"], False, "Custo do agente unico"),
+            ("jornadas_0", "solve", lambda: etapa_jornadas(0), ["custo_unico"], False, "Jornadas"),
+            ("linha_tempo", "solve", etapa_linha_tempo, ["jornadas_0"], False,
+             "Linha do tempo (posicao e previsao de passagem)"),
+            ("mapa_unico", "mapas", etapa_mapa_unico, ["cpp_completo"], False, "Mapa da rota"),
+            ("metricas", "metrics", etapa_metricas, ["jornadas_0"], False, "Metricas finais e custos operacionais"),
+            ("animacao_0", "animacoes", lambda: etapa_animacao(0), ["cpp_completo"], False, "Animacao da rota"),
+        ]
+    
+    # Só as etapas pedidas (--only); dependências fora da seleção são ignoradas
+    selecionadas = {nome for nome, grupo, *_ in definicoes if grupo in etapas}
+    plano = [
+        Etapa(nome, funcao, [d for d in deps if d in selecionadas], critica, descricao)
+        for nome, grupo, funcao, deps, critica, descricao in definicoes if nome in selecionadas
+    ]
+    
+    print_header(f"EXECUTANDO {len(plano)} ETAPAS (ate {args.workers} em paralelo)")
+    agenda = executar_etapas(plano, max_workers=args.workers)
+    
+    if agenda.abortado:
+        falhas = [n for n, st in agenda.status.items() if st == "falha"]
+        print(f"\n[X] Pipeline interrompido: falha em {', '.join(falhas)}")
+        print(f"    Resultados parciais em: {DIR_RESULTADOS}")
+        sys.exit(1)
     
     # ===== FINALIZAÇÃO =====
+    # Publica a execução: grafo-N.parcial -> grafo-N (rename atômico)
+    os.rename(DIR_RESULTADOS, DIR_FINAL)
+    DIR_RESULTADOS = DIR_FINAL
+    DIR_VISUALIZACOES = os.path.join(DIR_RESULTADOS, "visualizacoes")
     tempo_total = time.time() - inicio_total
     
     print_header("PIPELINE CONCLUIDO COM SUCESSO")
     print(f"Tempo total de execucao: {tempo_total:.2f}s ({tempo_total/60:.2f} min)")
+    print(f"Caminho critico: {agenda.tempo_caminho_critico:.2f}s ({' -> '.join(agenda.caminho_critico)})")
+    print(f"Soma das etapas: {sum(agenda.duracao.values()):.2f}s")
     print(f"Fim: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
     print(f"\n[ARQUIVOS] Todos os resultados foram salvos em:")
     print(f"  -> {DIR_RESULTADOS}/")
     print(f"\n[CONTEUDO]")
-    print(f"  * Grafos e imagens: {DIR_RESULTADOS}/")
-    print(f"  * Mapas interativos: {DIR_VISUALIZACOES}/")
-    print(f"  * Animacoes (MP4): {DIR_VISUALIZACOES}/")
-    print(f"  * Relatorio de metricas: {DIR_RESULTADOS}/relatorio_metricas_{num_agentes}_agentes.txt")
-    if num_agentes > 1:
+    if "grafo" in etapas:
+        print(f"  * Grafos e imagens: {DIR_RESULTADOS}/")
+    if "mapas" in etapas:
+        print(f"  * Mapas interativos: {DIR_VISUALIZACOES}/")
+    if "animacoes" in etapas:
+        print(f"  * Animacoes (MP4): {DIR_VISUALIZACOES}/")
+    if "metrics" in etapas:
+        print(f"  * Relatorio de metricas: {DIR_RESULTADOS}/relatorio_metricas_{num_agentes}_agentes.txt")
+    if num_agentes > 1 and "solve" in etapas:
         print(f"  * Tours por agente: {DIR_RESULTADOS}/agente_X/")
-        print(f"  * Clusters: dados_processados/clusters_finais/")
+        print(f"  * Clusters: {DIR_RESULTADOS}/clusters/")
     print()
 
 if __name__ == "__main__":
@@ -1,14 +1,30 @@
+import argparse
 import pandas as pd
 import os
-import heapq
+import sys
 import numpy as np
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'codigo_fonte', 'setup_grafo'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'codigo_fonte', 'algoritmo_cpp'))
+from snapshot_grafo import carregar_snapshot, eh_snapshot, snapshot_para_dict
+from busca_caminhos import BuscaDirecionada, deposito_mais_proximo
+from saida_tour import gravacao_atomica, ler_tour_detalhado
+
 # ================= CONFIGURAÇÕES =================
 ARQUIVO_MATRIZ = os.path.join('dados_processados', 'matriz_adjacencia.csv')
-ARQUIVO_TOUR_DETALHADO = os.path.join('resultados_finais', 'relatorio_tour', 'tour_detalhado.csv')
+PASTA_SNAPSHOT = os.path.join('dados_processados', 'snapshot_grafo')
+ARQUIVO_VERTICES = os.path.join('dados_processados', 'vertices_reordenados.csv')
+PASTA_TOUR = os.path.join('resultados_finais', 'relatorio_tour')
 PASTA_SAIDA = os.path.join('dados_processados', 'clusters_finais')
 NUM_AGENTES = 3
 DEPOT_NODE = 0  # Vértice da base (Depósito)
+ARQUIVO_DEPOSITOS = 'depositos.csv'  # agente -> base, gravado junto das matrizes
+# Marcos ALT (--landmarks): cada um custa um Dijkstra completo, que não compensa
+# as poucas ligações com a base de uma execução; desligados por padrão
+NUM_LANDMARKS = 0
+
+# Busca A* configurada para o grafo carregado (ver 'configurar_busca')
+BUSCA = None
 
 def carregar_dados_iniciais(caminho_matriz):
     """
@@ -55,13 +71,26 @@ def carregar_dados_iniciais(caminho_matriz):
     print(f"Grafo carregado: {len(grafo)} vértices conectados.")
     return grafo, labels
 
+def carregar_snapshot_inicial(pasta_snapshot):
+    """
+    Versão de 'carregar_dados_iniciais' que usa o snapshot binário (memory-map)
+    em vez de reinterpretar a matriz CSV.
+    Retorna: (Grafo Dict, Lista de Labels)
+    """
+    print("Carregando snapshot do grafo...")
+    grafo, labels = snapshot_para_dict(carregar_snapshot(pasta_snapshot))
+    print(f"Grafo carregado: {sum(1 for u in grafo if grafo[u])} vértices conectados.")
+    return grafo, labels
+
 def carregar_tour(caminho_tour):
-    """Lê o arquivo tour_detalhado.csv gerado pelo seu CPP."""
+    """
+    Lê o tour detalhado gerado pelo CPP: a pasta do tour (tour.npz, parquet
+    ou csv, ver saida_tour.py) ou diretamente um tour_detalhado.csv.
+    """
     if not os.path.exists(caminho_tour):
         raise FileNotFoundError(f"Arquivo {caminho_tour} não encontrado.")
         
-    df = pd.read_csv(caminho_tour)
-    df.columns = df.columns.str.strip()
+    df = ler_tour_detalhado(caminho_tour)
     
     # Mapeia colunas caso os nomes variem
     cols_map = {}
@@ -76,9 +105,35 @@ def carregar_tour(caminho_tour):
     df['v'] = df['v'].astype(int)
     return df
 
+def carregar_coordenadas():
+    """Lê {id: (lat, lon)} do snapshot ou do CSV de vértices (para a heurística do A*)."""
+    if eh_snapshot(PASTA_SNAPSHOT):
+        snap = carregar_snapshot(PASTA_SNAPSHOT)
+        return {int(i): (float(la), float(lo)) for i, (la, lo) in zip(snap.ids.tolist(), snap.coords.tolist())}
+    if os.path.exists(ARQUIVO_VERTICES):
+        vdf = pd.read_csv(ARQUIVO_VERTICES)
+        return {int(i): (float(la), float(lo)) for i, la, lo in zip(vdf['id'], vdf['lat'], vdf['lon'])}
+    return {}
+
+def configurar_busca(grafo, coords=None, n_landmarks=NUM_LANDMARKS, arquivo_ch=None):
+    """
+    Prepara a busca usada por 'dijkstra_puro': A* (haversine + landmarks, se
+    houver coords/marcos; senão Dijkstra) ou, se 'arquivo_ch' for dado, a
+    hierarquia de contração persistida nesse arquivo.
+    """
+    global BUSCA
+    if arquivo_ch:
+        from hierarquia_contracao import HierarquiaContracao
+        BUSCA = HierarquiaContracao.carregar_ou_construir(grafo, arquivo_ch)
+    else:
+        BUSCA = BuscaDirecionada(grafo, coords, n_landmarks)
+    return BUSCA
+
 def dijkstra_puro(grafo, origem, destino):
     """
     Calcula o menor caminho entre origem e destino.
+    Usa A* (módulo busca_caminhos) quando a busca foi configurada para este grafo;
+    caso contrário, a mesma busca sem heurística (Dijkstra).
     Retorna lista de arestas: [{'u':..., 'v':..., 'weight':...}, ...]
     """
     if origem == destino:
@@ -88,54 +143,32 @@ def dijkstra_puro(grafo, origem, destino):
         # Fallback silencioso se for nó isolado
         return [], 0.0
 
-    fila = [(0.0, origem)]
-    distancias = {origem: 0.0}
-    anteriores = {origem: None}
+    busca = BUSCA if BUSCA is not None and BUSCA.graph is grafo else BuscaDirecionada(grafo)
+    nos, custo_final, _ = busca.caminho(origem, destino)
     
-    encontrou = False
-    custo_final = 0.0
-
-    while fila:
-        d_atual, u = heapq.heappop(fila)
-        
-        if u == destino:
-            custo_final = d_atual
-            encontrou = True
-            break
-        
-        if d_atual > distancias.get(u, float('inf')):
-            continue
-        
-        for v, peso in grafo.get(u, {}).items():
-            nova_dist = d_atual + peso
-            if nova_dist < distancias.get(v, float('inf')):
-                distancias[v] = nova_dist
-                anteriores[v] = u
-                heapq.heappush(fila, (nova_dist, v))
-    
-    if not encontrou:
+    if not nos:
         print(f"  [Aviso] Sem caminho entre {origem} e {destino}.")
         return [], 0.0
     
-    # Reconstrução (Backtracking)
-    caminho = []
-    curr = destino
-    while curr != origem:
-        prev = anteriores[curr]
-        w = grafo[prev][curr]
-        caminho.append({'u': prev, 'v': curr, 'weight': w, 'tipo': 'deslocamento'})
-        curr = prev
-    
-    caminho.reverse()
+    caminho = [
+        {'u': a, 'v': b, 'weight': grafo[a][b], 'tipo': 'deslocamento'}
+        for a, b in zip(nos[:-1], nos[1:])
+    ]
     return caminho, custo_final
 
-def dividir_tour_e_gerar_matrizes(df_tour, grafo, labels, n_agentes):
-    print("\n=== Dividindo Tour e Gerando Matrizes de Cluster ===")
-    
-    custo_total = df_tour['weight'].sum()
+def dividir_tour(arestas_tour, grafo, n_agentes, deposito=DEPOT_NODE):
+    """
+    Divide a sequência de arestas do tour [(u, v, peso), ...] em n_agentes
+    clusters de carga aproximadamente igual, ligando cada um à base 'deposito'.
+    Se a sequência não for contígua (subconjunto do tour atribuído a uma base),
+    os saltos entre arestas consecutivas são ligados pelo caminho mínimo.
+    Retorna a lista de clusters (cada um é uma lista de dicts de arestas).
+    """
+    custo_total = sum(w for _, _, w in arestas_tour)
     meta = custo_total / n_agentes
     print(f"Meta por agente: ~{meta:.2f}")
     
+    clusters = []
     agente_id = 0
     custo_atual = 0.0
     
@@ -143,17 +176,20 @@ def dividir_tour_e_gerar_matrizes(df_tour, grafo, labels, n_agentes):
     # Cada item é dict: {'u': u, 'v': v, 'weight': w}
     arestas_cluster = []
     
-    total_linhas = len(df_tour)
+    total_linhas = len(arestas_tour)
     
-    for idx, row in df_tour.iterrows():
-        u, v = int(row['u']), int(row['v'])
-        w = float(row['weight'])
-        
+    ultimo_v = None
+    for idx, (u, v, w) in enumerate(arestas_tour):
         # 1. Conexão Inicial (Ida da Base)
         if len(arestas_cluster) == 0:
-            if u != DEPOT_NODE:
-                caminho_ida, _ = dijkstra_puro(grafo, DEPOT_NODE, u)
+            if u != deposito:
+                caminho_ida, _ = dijkstra_puro(grafo, deposito, u)
                 arestas_cluster.extend(caminho_ida)
+        elif u != ultimo_v:
+            # Salto entre trechos não contíguos do tour
+            caminho_salto, _ = dijkstra_puro(grafo, ultimo_v, u)
+            arestas_cluster.extend(caminho_salto)
+        ultimo_v = v
         
         # 2. Aresta de Serviço (do Tour)
         arestas_cluster.append({'u': u, 'v': v, 'weight': w, 'tipo': 'servico'})
@@ -166,12 +202,11 @@ def dividir_tour_e_gerar_matrizes(df_tour, grafo, labels, n_agentes):
             print(f"Agente {agente_id} finalizado em {v} (Carga: {custo_atual:.2f})")
             
             # Conexão Final (Volta para Base)
-            if v != DEPOT_NODE:
-                caminho_volta, _ = dijkstra_puro(grafo, v, DEPOT_NODE)
+            if v != deposito:
+                caminho_volta, _ = dijkstra_puro(grafo, v, deposito)
                 arestas_cluster.extend(caminho_volta)
             
-            # EXPORTAR IMEDIATAMENTE
-            salvar_matriz_cluster(agente_id, arestas_cluster, labels)
+            clusters.append(arestas_cluster)
             
             # Reseta para próximo agente
             agente_id += 1
@@ -180,14 +215,90 @@ def dividir_tour_e_gerar_matrizes(df_tour, grafo, labels, n_agentes):
             
     # 4. Finaliza Último Agente
     if arestas_cluster:
-        ultimo_v = int(df_tour.iloc[-1]['v'])
+        ultimo_v = arestas_tour[-1][1]
         print(f"Agente {agente_id} finalizado em {ultimo_v} (Restante)")
         
-        if ultimo_v != DEPOT_NODE:
-            caminho_volta, _ = dijkstra_puro(grafo, ultimo_v, DEPOT_NODE)
+        if ultimo_v != deposito:
+            caminho_volta, _ = dijkstra_puro(grafo, ultimo_v, deposito)
             arestas_cluster.extend(caminho_volta)
             
+        clusters.append(arestas_cluster)
+    
+    return clusters
+
+def repartir_agentes(cargas, n_agentes):
+    """
+    Distribui n_agentes entre as bases proporcionalmente à carga de cada uma
+    (maiores restos), com pelo menos um agente por base.
+    """
+    if n_agentes < len(cargas):
+        raise ValueError(f"{n_agentes} agente(s) para {len(cargas)} bases com ruas atribuídas.")
+    total = sum(cargas) or 1.0
+    extras = n_agentes - len(cargas)
+    cotas = [c / total * extras for c in cargas]
+    agentes = [1 + int(q) for q in cotas]
+    sobra = n_agentes - sum(agentes)
+    for i in sorted(range(len(cargas)), key=lambda i: int(cotas[i]) - cotas[i])[:sobra]:
+        agentes[i] += 1
+    return agentes
+
+def dividir_por_depositos(arestas_tour, grafo, n_agentes, depositos):
+    """
+    Várias bases: um único Dijkstra de múltiplas origens atribui cada aresta
+    do tour à base mais próxima (pela ponta mais próxima), os agentes são
+    repartidos entre as bases pela carga e o trecho de cada base é dividido
+    com 'dividir_tour'.
+    Retorna a lista de (base, cluster).
+    """
+    dist, dono = deposito_mais_proximo(grafo, depositos)
+    grupos = {d: [] for d in depositos}
+    for u, v, w in arestas_tour:
+        ponta = u if dist.get(u, float('inf')) <= dist.get(v, float('inf')) else v
+        grupos[dono.get(ponta, depositos[0])].append((u, v, w))
+    bases = [d for d in depositos if grupos[d]]
+    agentes = repartir_agentes([sum(w for _, _, w in grupos[d]) for d in bases], n_agentes)
+
+    resultado = []
+    for d, n in zip(bases, agentes):
+        print(f"Base {d}: {len(grupos[d])} arestas do tour, {n} agente(s)")
+        resultado.extend((d, cluster) for cluster in dividir_tour(grupos[d], grafo, n, d))
+    return resultado
+
+def grafo_do_cluster(lista_arestas):
+    """
+    Constrói o grafo (dict de dicts, simétrico) de um cluster, equivalente
+    à matriz exportada por 'salvar_matriz_cluster'.
+    """
+    grafo = {}
+    for aresta in lista_arestas:
+        u, v, w = aresta['u'], aresta['v'], aresta['weight']
+        grafo.setdefault(u, {})[v] = w
+        grafo.setdefault(v, {})[u] = w
+    return grafo
+
+def dividir_tour_e_gerar_matrizes(df_tour, grafo, labels, n_agentes, depositos=(DEPOT_NODE,)):
+    print("\n=== Dividindo Tour e Gerando Matrizes de Cluster ===")
+    
+    arestas_tour = [
+        (int(u), int(v), float(w))
+        for u, v, w in zip(df_tour['u'], df_tour['v'], df_tour['weight'])
+    ]
+    
+    if len(depositos) > 1:
+        clusters = dividir_por_depositos(arestas_tour, grafo, n_agentes, list(depositos))
+    else:
+        clusters = [(depositos[0], c) for c in dividir_tour(arestas_tour, grafo, n_agentes, depositos[0])]
+    
+    # EXPORTAR CADA CLUSTER
+    for agente_id, (_, arestas_cluster) in enumerate(clusters):
         salvar_matriz_cluster(agente_id, arestas_cluster, labels)
+    salvar_depositos([d for d, _ in clusters])
+
+def salvar_depositos(bases):
+    """Grava a base de cada agente (lida pelo main.py para o --inicio do resolver)."""
+    os.makedirs(PASTA_SAIDA, exist_ok=True)
+    with gravacao_atomica(os.path.join(PASTA_SAIDA, ARQUIVO_DEPOSITOS)) as tmp:
+        pd.DataFrame({'agente': range(len(bases)), 'deposito': bases}).to_csv(tmp, index=False)
 
 def salvar_matriz_cluster(agente_id, lista_arestas, labels):
     """
@@ -221,21 +332,49 @@ def salvar_matriz_cluster(agente_id, lista_arestas, labels):
                 
     nome_arquivo = f"matriz_agente_{agente_id}.csv"
     caminho = os.path.join(PASTA_SAIDA, nome_arquivo)
-    df_matriz.to_csv(caminho)
+    with gravacao_atomica(caminho) as tmp:
+        df_matriz.to_csv(tmp)
     
     print(f"  -> Exportado: {nome_arquivo}")
     print(f"     (Arestas Serviço: {count_servico} | Arestas Conexão/Dijkstra: {count_desloc})")
 
 def main():
+    global PASTA_SAIDA
+    parser = argparse.ArgumentParser(description="Divide o tour em clusters por agente")
+    parser.add_argument("--agentes", type=int, default=NUM_AGENTES, help="Número de agentes")
+    parser.add_argument("--depositos", default=str(DEPOT_NODE), metavar="V1,V2,...",
+                        help="Vértices das bases; com mais de uma, cada rua vai para a base mais próxima")
+    parser.add_argument("--tour", default=PASTA_TOUR, help="Pasta do tour completo (saída do resolver_cpp.py)")
+    parser.add_argument("--saida", default=PASTA_SAIDA, help="Pasta das matrizes por agente")
+    parser.add_argument("--ch", nargs="?", const="", default=None, metavar="ARQUIVO",
+                        help="Usa hierarquia de contração nas ligações com a base")
+    parser.add_argument("--landmarks", type=int, default=NUM_LANDMARKS, metavar="N",
+                        help="A* com heurística geográfica e N marcos ALT (padrão: Dijkstra simples)")
+    args = parser.parse_args()
+    PASTA_SAIDA = args.saida
+    depositos = [int(d) for d in args.depositos.split(",") if d.strip()]
+
     try:
-        # Carrega grafo e labels
-        grafo, labels = carregar_dados_iniciais(ARQUIVO_MATRIZ)
+        # Carrega grafo e labels (snapshot binário quando disponível)
+        if eh_snapshot(PASTA_SNAPSHOT):
+            grafo, labels = carregar_snapshot_inicial(PASTA_SNAPSHOT)
+            arquivo_ch = os.path.join(PASTA_SNAPSHOT, 'ch.pkl')
+        else:
+            grafo, labels = carregar_dados_iniciais(ARQUIVO_MATRIZ)
+            arquivo_ch = os.path.splitext(ARQUIVO_MATRIZ)[0] + '.ch.pkl'
+        if args.ch is not None:
+            arquivo_ch = args.ch or arquivo_ch
+            configurar_busca(grafo, arquivo_ch=arquivo_ch)
+        elif args.landmarks > 0:
+            configurar_busca(grafo, carregar_coordenadas(), args.landmarks)
+        else:
+            configurar_busca(grafo)
         
         # Carrega tour
-        df_tour = carregar_tour(ARQUIVO_TOUR_DETALHADO)
+        df_tour = carregar_tour(args.tour)
         
         # Processa e Salva
-        dividir_tour_e_gerar_matrizes(df_tour, grafo, labels, NUM_AGENTES)
+        dividir_tour_e_gerar_matrizes(df_tour, grafo, labels, args.agentes, depositos)
         
         print("\nConcluído. As matrizes geradas contêm os subgrafos conectados prontos para o CPP.")
         